@@ -1,6 +1,7 @@
 #---------------DESCRIPTION🤖-----------------------------
 # This is the main file where the AI News Chatbot is tested
 # It integrates the Azure OpenAI and News API functionalities
+# Batch mode replays prompts from a JSONL file for offline evaluation
 
 #---------------PRE-REQUISITES-----------------------------
 # 'cd backend' to navigate to the backend directory
@@ -11,15 +12,30 @@
 # 'py aibot.py' to start the chatbot
 # Input your queries such as "Get me the latest news in United States"
 # See the output in the console
+# Batch mode: 'py aibot.py --batch prompts.jsonl --output results.jsonl --workers 8'
+#  - one JSON object per line: {"id": "q1", "prompt": "..."} ("query" works too, so
+#    benchmarks/router_queries.jsonl can be replayed as is), or {"id": "q2", "turns": ["...", "..."]}
+#    to replay a conversation; lines without an id are numbered
+#  - every line is its own conversation, results are appended to --output as they finish
+#  - run the same command again after an interruption: ids already answered are skipped
+#    and failed ones are retried
 
 #---------------⚠️WARNING---------------------------------
 # A problem detected where the News API only return results from America so far.
 # Try use newsapitest.py📰 to test the News API functionality for different countries.
 # Keep in mind that NewsAPI can only except max 100 requests per day as per free version.
 # Therefore, try to minimize the number of requests to avoid hitting the limit.
+# Each location's headlines are cached for AIBOT_NEWS_TTL seconds for that reason,
+# and batch workers asking for the same location at once share one request.
 
 import os
+import sys
 import json
+import time
+import argparse
+import threading
+import statistics
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from openai import AzureOpenAI
 from newsapi import NewsApiClient
@@ -34,19 +50,48 @@ env_api_version = os.getenv("API_VERSION")
 env_base_model = os.getenv("MODEL_NAME")
 env_news_api_key = os.getenv("NEWS_API_KEY") # IMPORTANT: Ensure this is set in your .env file
 
+# Messages kept besides the system prompt; older turns are dropped
+max_history = int(os.getenv("AIBOT_MAX_HISTORY", "20"))
+# Seconds a location's headlines are reused before NewsAPI is asked again
+news_ttl = int(os.getenv("AIBOT_NEWS_TTL", "900"))
+
 # Initialize the News API client
 news_client = NewsApiClient(api_key=env_news_api_key)
 
-# Initialize the Azure OpenAI client
+# Initialize the Azure OpenAI client (thread-safe, shared by the batch workers)
 client = AzureOpenAI(
     azure_endpoint=env_endpoint,
     api_key=env_api_key,
     api_version=env_api_version,
 )
 
+# Headlines per location: location -> (expires_at, Future), shared by the batch worker threads
+news_cache = {}
+news_cache_lock = threading.Lock()
+
 # Define the function to get top news headlines
 def get_top_news(location):
-    """Get the top news headlines for a given location"""
+    """Get the top news headlines for a given location, cached for news_ttl seconds"""
+    with news_cache_lock:
+        entry = news_cache.get(location)
+        fetching = entry is None or entry[0] <= time.monotonic()
+        if fetching:
+            entry = (time.monotonic() + news_ttl, Future())
+            news_cache[location] = entry
+    if fetching:
+        try:
+            entry[1].set_result(fetch_top_news(location))
+        except Exception as e:
+            # Don't cache the failure, the next call tries again
+            with news_cache_lock:
+                if news_cache.get(location) is entry:
+                    del news_cache[location]
+            entry[1].set_exception(e)
+    # Threads asking while the first one fetches wait for its result
+    return entry[1].result()
+
+def fetch_top_news(location):
+    """One NewsAPI request for a location's headlines, as JSON for the model"""
 
     top_headlines = news_client.get_top_headlines(
         country=location,       # Must be 2-letter code, e.g., 'us', 'my'
@@ -54,7 +99,7 @@ def get_top_news(location):
     )
 
     articles = top_headlines.get("articles", [])
-    
+
     if not articles:
         return json.dumps([{
             "location": location,
@@ -94,22 +139,36 @@ tools = [
 ]
 
 # Provide how the assistant should behave
-messages = [
-    {
-        "role": "system",
-        "content": "Provide reply in point form.",
-    },
-]
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "Provide reply in point form.",
+}
 
-# Start conversation
-while True:
-    user_input = input("User: ")
-    if user_input.lower() in ["exit", "quit"]:
-        print("Exiting the conversation.")
-        break
+def trim_history(messages, limit=None):
+    """Keep the system prompt and the last `limit` messages, starting at a user message"""
+    limit = max_history if limit is None else limit
+    if len(messages) <= limit + 1:
+        return messages
+    tail = messages[-limit:]
+    # A tool result without the assistant message that asked for it is rejected by the API
+    while len(tail) > 1 and tail[0]["role"] != "user":
+        tail = tail[1:]
+    return messages[:1] + tail
 
+def add_usage(total, response):
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        total["prompt_tokens"] += usage.prompt_tokens
+        total["completion_tokens"] += usage.completion_tokens
+        total["total_tokens"] += usage.total_tokens
+
+def run_turn(messages, user_input):
+    """Answer one user message, appending the turn to `messages`; returns the reply, tool calls and token usage"""
     # Add user message
     messages.append({"role": "user", "content": user_input})
+    messages[:] = trim_history(messages)
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    locations = []
 
     # First assistant call (Function tool calling)
     response = client.chat.completions.create(
@@ -118,6 +177,7 @@ while True:
         tools=tools,
         tool_choice="auto",
     )
+    add_usage(usage, response)
 
     response_message = response.choices[0].message
 
@@ -133,7 +193,8 @@ while True:
         for tool_call in response_message.tool_calls:
             if tool_call.function.name == "get_top_news":
                 function_args = json.loads(tool_call.function.arguments)
-                
+                locations.append(function_args.get("location"))
+
                 # Call the actual function
                 news_response = get_top_news(
                     location=function_args.get("location")
@@ -152,18 +213,144 @@ while True:
             model=env_base_model,
             messages=messages,
         )
+        add_usage(usage, final_response)
+        response_message = final_response.choices[0].message
 
-        final_message = final_response.choices[0].message
-        print(f"\nAssistant: {final_message.content}\n")
-        messages.append({
-            "role": final_message.role,
-            "content": final_message.content
-        })
+    # With or without a tool call, this is the reply
+    messages.append({
+        "role": response_message.role,
+        "content": response_message.content
+    })
+    return {"reply": response_message.content, "locations": locations, "usage": usage}
+
+def chat_loop():
+    """Interactive conversation in the console"""
+    messages = [SYSTEM_MESSAGE]
+    while True:
+        user_input = input("User: ")
+        if user_input.lower() in ["exit", "quit"]:
+            print("Exiting the conversation.")
+            break
+
+        result = run_turn(messages, user_input)
+        print(f"\nAssistant: {result['reply']}\n")
 
+# ---------------- Batch mode ----------------
+def load_prompts(path):
+    """(id, turns) for every line of a JSONL prompts file"""
+    prompts = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            turns = row.get("turns") or [row.get("prompt") or row.get("query")]
+            prompts.append((str(row.get("id", number)), turns))
+    return prompts
+
+def finished_ids(path):
+    """Ids already answered without an error in an earlier run's output"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Cut off when the last run was interrupted
+            if row.get("error"):
+                done.discard(row.get("id"))
+            else:
+                done.add(row.get("id"))
+    return done
+
+def run_prompt(prompt_id, turns):
+    """Replay one conversation, returning the output row"""
+    messages = [SYSTEM_MESSAGE]
+    row = {"id": prompt_id, "turns": [], "latency_ms": 0.0,
+           "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}, "error": None}
+    started = time.perf_counter()
+    try:
+        for user_input in turns:
+            turn_started = time.perf_counter()
+            result = run_turn(messages, user_input)
+            row["turns"].append({
+                "prompt": user_input,
+                "reply": result["reply"],
+                "locations": result["locations"],
+                "latency_ms": round((time.perf_counter() - turn_started) * 1000, 1),
+                "usage": result["usage"],
+            })
+            for key, value in result["usage"].items():
+                row["usage"][key] += value
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return row
+
+def run_batch(batch_path, output_path, workers):
+    """Run every prompt of `batch_path` concurrently, appending results to `output_path`"""
+    prompts = load_prompts(batch_path)
+    done = finished_ids(output_path)
+    pending = [(prompt_id, turns) for prompt_id, turns in prompts if prompt_id not in done]
+    print(f"{len(prompts)} prompts, {len(prompts) - len(pending)} already answered, running {len(pending)} with {workers} workers")
+
+    # An interrupted run can leave half a line behind, start on a fresh one
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+        if needs_newline:
+            with open(output_path, "a", encoding="utf-8") as f:
+                f.write("\n")
+
+    latencies, errors = [], 0
+    tokens = 0
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        with open(output_path, "a", encoding="utf-8") as out:
+            futures = [executor.submit(run_prompt, prompt_id, turns) for prompt_id, turns in pending]
+            for count, future in enumerate(as_completed(futures), 1):
+                row = future.result()
+                # One line per finished prompt, flushed so a crash loses at most the ones still running
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                out.flush()
+                if row["error"]:
+                    errors += 1
+                    print(f"[{count}/{len(pending)}] {row['id']} failed: {row['error']}")
+                else:
+                    latencies.append(row["latency_ms"])
+                    tokens += row["usage"]["total_tokens"]
+                if count % 50 == 0:
+                    print(f"[{count}/{len(pending)}] done")
+    except KeyboardInterrupt:
+        print("Interrupted, run the same command again to continue")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise SystemExit(130)
+    executor.shutdown()
+
+    if latencies:
+        ordered = sorted(latencies)
+        p95 = ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)]
+        print(f"answered {len(latencies)}, failed {errors}; latency p50 {statistics.median(ordered):.0f} ms, "
+              f"p95 {p95:.0f} ms; {tokens} tokens")
     else:
-        # No tool call — normal reply
-        print(f"\nAssistant: {response_message.content}\n")
-        messages.append({
-            "role": response_message.role,
-            "content": response_message.content
-        })
+        print(f"answered 0, failed {errors}")
+    return 1 if errors else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="AI News Chatbot in the console, or over a file of prompts")
+    parser.add_argument("--batch", help="JSONL file of prompts to run instead of the interactive chat")
+    parser.add_argument("--output", help="JSONL results file (default: <batch>.results.jsonl)")
+    parser.add_argument("--workers", type=int, default=4, help="prompts running at once in batch mode")
+    args = parser.parse_args()
+
+    if not args.batch:
+        chat_loop()
+        return 0
+    output = args.output or os.path.splitext(args.batch)[0] + ".results.jsonl"
+    return run_batch(args.batch, output, max(args.workers, 1))
+
+if __name__ == "__main__":
+    sys.exit(main())
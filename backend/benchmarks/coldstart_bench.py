@@ -0,0 +1,160 @@
+#---------------DESCRIPTION🧊-----------------------------
+# Cold start and memory of the backend, now vs an older commit
+# For each tree it measures:
+#  - import: seconds to `import main` in a fresh interpreter (median of runs)
+#  - ready: seconds from launching uvicorn with N workers until /health answers
+#  - RSS per worker process after startup, and again after one chat and one
+#    summary request (which is when lazily created clients get built)
+# Upstreams are fake_upstreams.py on localhost, nothing real is called.
+# Linux only (memory comes from /proc).
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/coldstart_bench.py --workers 2'
+# Against an older commit too: 'py benchmarks/coldstart_bench.py --rev HEAD~1'
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+import stubs  # noqa: F401  (puts backend/ on sys.path)
+from loadtest import BENCH_DIR, BACKEND_DIR, free_port, wait_until_up
+
+
+def export_tree(rev, target):
+    """Copy backend/ as it was at `rev` into `target`"""
+    os.makedirs(target)
+    archive = subprocess.run(["git", "archive", rev, "."], cwd=BACKEND_DIR, check=True, capture_output=True).stdout
+    subprocess.run(["tar", "-x", "-C", target], input=archive, check=True)
+    return target
+
+
+def import_seconds(tree, env, runs):
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=tree, env=env, check=True, capture_output=True, text=True)
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def children(pid):
+    """Direct child process ids, read from /proc"""
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name can contain spaces, the fields after it can't
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            found.append(int(entry))
+    return found
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def worker_rss(master):
+    """RSS of each uvicorn worker (the master's children that serve requests)"""
+    pids = [pid for pid in children(master)
+            if "resource_tracker" not in open(f"/proc/{pid}/cmdline").read()]
+    return sorted(rss_mb(pid) for pid in pids) or [rss_mb(master)]
+
+
+def measure(tree, upstream_url, workers, import_runs):
+    env = {
+        **os.environ,
+        "ENDPOINT": upstream_url,
+        "SUBSCRIPTION_KEY": "coldstart",
+        "API_VERSION": "2024-06-01",
+        "MODEL_NAME": "fake",
+        "NEWS_API_KEY": "coldstart",
+        "NEWS_API_URL": f"{upstream_url}/v2",
+        "WEB_CONCURRENCY": str(workers),
+        "LOG_LEVEL": "WARNING",
+    }
+    result = {"import": import_seconds(tree, env, import_runs)}
+
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+                               "--workers", str(workers), "--log-level", "warning"], cwd=tree, env=env)
+    try:
+        url = f"http://127.0.0.1:{port}"
+        wait_until_up(f"{url}/health", server, timeout=60)
+        result["ready"] = time.perf_counter() - started
+        # Let every worker finish starting (and any background warm-up) before reading memory
+        time.sleep(3)
+        result["rss_idle"] = worker_rss(server.pid)
+
+        with httpx.Client(base_url=url, timeout=30) as client:
+            for _ in range(workers * 2):
+                client.post("/api/chat", json={"message": "Explain what a headline is"})
+                client.post("/api/summarize", json={"article": {"url": f"{upstream_url}/articles/1", "title": "t",
+                                                               "description": "d"}})
+        time.sleep(1)
+        result["rss_busy"] = worker_rss(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+    return result
+
+
+def print_results(results, workers):
+    print(f"\n{workers} worker(s)")
+    print(f"{'tree':<14} {'import s':>9} {'ready s':>8} {'RSS idle MB (per worker)':>26} {'RSS after requests MB':>24}")
+    for name, r in results.items():
+        idle = ", ".join(f"{mb:.0f}" for mb in r["rss_idle"])
+        busy = ", ".join(f"{mb:.0f}" for mb in r["rss_busy"])
+        print(f"{name:<14} {r['import']:>9.2f} {r['ready']:>8.2f} {idle:>26} {busy:>24}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start and per-worker memory")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rev", help="also measure this git revision, e.g. HEAD~1")
+    parser.add_argument("--import-runs", type=int, default=5)
+    args = parser.parse_args()
+
+    port = free_port()
+    upstream = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "fake_upstreams.py"), "--port", str(port)],
+                                cwd=BACKEND_DIR)
+    upstream_url = f"http://127.0.0.1:{port}"
+    results = {}
+    try:
+        wait_until_up(f"{upstream_url}/_stats", upstream)
+        with tempfile.TemporaryDirectory() as workdir:
+            trees = {}
+            if args.rev:
+                trees[args.rev] = export_tree(args.rev, os.path.join(workdir, "old"))
+            # The working tree without its caches, so both start from empty ones
+            trees["working tree"] = shutil.copytree(BACKEND_DIR, os.path.join(workdir, "new"), ignore=shutil.ignore_patterns(
+                "venv", "__pycache__", "*.db", "*.db-*", "news_index", "sessions", "*.whl"))
+            for name, tree in trees.items():
+                results[name] = measure(tree, upstream_url, args.workers, args.import_runs)
+    finally:
+        upstream.terminate()
+        upstream.wait()
+    print_results(results, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#---------------DESCRIPTION⏱️-----------------------------
+# Concurrency benchmark for /api/chat and /api/summarize
+# Replaces Azure OpenAI, News API and scraping with stubs that only sleep,
+# so throughput should grow with the number of in-flight requests.
+# A blocking call anywhere in the request path shows up as a flat line.
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/concurrency_bench.py'
+# Optional: --latency 0.2 --levels 1,2,4,8,16 --rounds 4
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+import httpx
+
+import stubs
+
+# Keep the benchmark's summaries out of the real cache files
+_scratch = tempfile.mkdtemp(prefix="concurrency_bench_")
+os.environ.setdefault("SUMMARY_CACHE_PATH", os.path.join(_scratch, "summaries.db"))
+os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(_scratch, "shared.db"))
+# Every chat is a new search; the stub has no quota, the NewsAPI rate limits would answer 429 instead
+os.environ.setdefault("NEWS_API_DAILY_QUOTA", "100000000")
+os.environ.setdefault("NEWS_API_BURST", "100000")
+# One log line per request would drown the table
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import main  # noqa: E402
+
+
+async def run_level(client, concurrency, rounds):
+    """Fire `concurrency * rounds` requests keeping `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        # A new search and a new page every time, or the caches and single-flight answer instead of the stubs
+        story = uuid.uuid4().hex[:12]
+        async with semaphore:
+            if i % 2 == 0:
+                r = await client.post("/api/chat", json={"message": f"news about {story}"})
+            else:
+                r = await client.post("/api/summarize", json={"article": {
+                    "title": f"Stub {story}", "description": "Stub", "url": f"https://news.example.com/{story}"}})
+            r.raise_for_status()
+
+    total = concurrency * rounds
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    return total, elapsed
+
+
+async def run(levels, rounds, latency):
+    # Only the network part of scraping is stubbed, fetch_article_content and the digest still run
+    async def fake_fetch(url, headers=None, timeout=None):
+        await asyncio.sleep(latency)
+        return " ".join(f"Sentence {i} of the stubbed article describes what happened in some detail." for i in range(40))
+
+    main.openai_client = stubs.StubAsyncOpenAI(latency=latency)
+    main.news_client = stubs.StubNewsClient(latency=latency / 2)
+    main.article_extractor.fetch = fake_fetch
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        baseline = None
+        print(f"{'in-flight':>10} {'requests':>9} {'seconds':>8} {'req/s':>8} {'speedup':>8}")
+        for level in levels:
+            total, elapsed = await run_level(client, level, rounds)
+            throughput = total / elapsed
+            baseline = baseline or throughput
+            print(f"{level:>10} {total:>9} {elapsed:>8.2f} {throughput:>8.1f} {throughput / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrency benchmark for the chat and summary endpoints")
+    parser.add_argument("--levels", default="1,2,4,8,16")
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per stubbed upstream call")
+    args = parser.parse_args()
+
+    asyncio.run(run([int(x) for x in args.levels.split(",")], args.rounds, args.latency))
@@ -0,0 +1,120 @@
+#---------------DESCRIPTION⏳-----------------------------
+# Tail latency of /api/summarize and /api/chat with and without deadlines
+# Scraping and the model are stubbed with heavy-tailed latencies: most calls
+# are quick, a few hang for --slow-seconds (a stuck news site, a stalled
+# completion). Each endpoint is run twice:
+#  - off: no deadlines and no hedged scrapes (the old behaviour)
+#  - on: CHAT_DEADLINE / SUMMARY_DEADLINE with hedged scrapes (deadlines.py)
+# and the script reports p50/p90/p99/max, the share of degraded responses
+# and why they were degraded.
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/deadline_bench.py'
+# Options: '--requests 200 --concurrency 20 --slow-share 0.05 --slow-seconds 20'
+
+import argparse
+import asyncio
+import collections
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+import httpx
+
+import stubs
+
+# Keep the benchmark's summaries out of the real cache files
+_scratch = tempfile.mkdtemp(prefix="deadline_bench_")
+os.environ.setdefault("SUMMARY_CACHE_PATH", os.path.join(_scratch, "summaries.db"))
+os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(_scratch, "shared.db"))
+
+import main  # noqa: E402
+
+ARTICLE_TEXT = " ".join(f"Sentence {i} of the stubbed article describes what happened in some detail." for i in range(40))
+
+
+def heavy_tail(rng, typical, slow_share, slow_seconds):
+    """Latency function: around `typical` seconds, `slow_seconds` for a `slow_share` of calls"""
+    def draw():
+        if rng.random() < slow_share:
+            return slow_seconds
+        return rng.lognormvariate(0, 0.5) * typical
+    return draw
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(int(p * len(ordered)), len(ordered) - 1)]
+
+
+async def run_endpoint(client, endpoint, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, reasons, degraded = [], collections.Counter(), 0
+
+    async def one(i):
+        nonlocal degraded
+        if endpoint == "/api/summarize":
+            body = {"article": {"title": f"Stub story {i}", "description": "A stubbed description of the story.",
+                                "url": f"https://news.example.com/{uuid.uuid4().hex}"}}
+        else:
+            body = {"message": "tech news in us", "include_full_message": True, "ack_mode": "llm"}
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(endpoint, json=body)
+            latencies.append(time.perf_counter() - start)
+        payload = response.json()
+        if payload.get("degraded"):
+            degraded += 1
+            reasons.update(payload["degraded"])
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, degraded, reasons
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+
+    async def fake_fetch(url, headers=None, timeout=None):
+        await stubs.pause(heavy_tail(rng, args.scrape_seconds, args.slow_share, args.slow_seconds))
+        return ARTICLE_TEXT
+
+    main.article_extractor.fetch = fake_fetch
+    main.openai_client = stubs.StubAsyncOpenAI(
+        latency=heavy_tail(rng, args.model_seconds, args.slow_share, args.slow_seconds), token_latency=0)
+    main.news_client = stubs.StubNewsClient(latency=0.05, articles=10)
+    configured = (main.chat_deadline, main.summary_deadline, main.scrape_hedge_enabled)
+
+    print(f"{args.requests} requests per run, {args.concurrency} in flight, "
+          f"{args.slow_share:.0%} of scrapes and model calls take {args.slow_seconds:.0f}s")
+    print(f"\n{'endpoint':<15} {'deadlines':<9} {'p50 s':>6} {'p90 s':>6} {'p99 s':>6} {'max s':>6} {'degraded':>9}  reasons")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench",
+                                 timeout=args.slow_seconds * 5) as client:
+        for endpoint in ("/api/summarize", "/api/chat"):
+            for mode in ("off", "on"):
+                if mode == "off":
+                    main.chat_deadline = main.summary_deadline = 0
+                    main.scrape_hedge_enabled = False
+                else:
+                    main.chat_deadline, main.summary_deadline, main.scrape_hedge_enabled = configured
+                # Every run scrapes its articles again
+                main.article_digests = main.DigestCache(main.article_digests.max_entries)
+                latencies, degraded, reasons = await run_endpoint(client, endpoint, args.requests, args.concurrency)
+                print(f"{endpoint:<15} {mode:<9} {statistics.median(latencies):>6.2f} {percentile(latencies, 0.9):>6.2f} "
+                      f"{percentile(latencies, 0.99):>6.2f} {max(latencies):>6.2f} {degraded / len(latencies):>9.0%}  "
+                      f"{', '.join(f'{reason} {count}' for reason, count in reasons.most_common())}")
+    print(f"\nscrape hedging: {main.scrape_latency.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tail latency with and without request deadlines")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--scrape-seconds", type=float, default=0.4, help="typical scrape latency")
+    parser.add_argument("--model-seconds", type=float, default=0.6, help="typical completion latency")
+    parser.add_argument("--slow-share", type=float, default=0.05)
+    parser.add_argument("--slow-seconds", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
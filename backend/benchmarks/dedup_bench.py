@@ -0,0 +1,134 @@
+#---------------DESCRIPTION🧬-----------------------------
+# Accuracy, cost and prompt savings of the near-duplicate stage (dedup.py)
+# Uses the labeled articles in dedup_articles.jsonl (same "story" = same event
+# reported by different outlets, plus look-alike headlines about other events):
+#  - pairs: precision/recall of "same cluster" against the labels per threshold
+#  - cost: microseconds per collapse() of a batch of 10/20/40 cards, with new
+#    articles (cold) and already indexed ones (warm), on an index holding
+#    --fill other articles
+#  - tokens: what the model would read for the same batches with and without
+#    collapsing (project_articles, as run_tool_calls sends them)
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/dedup_bench.py'
+# Options: '--thresholds 0.4,0.5,0.6 --fill 5000 --repeat 20'
+
+import argparse
+import copy
+import itertools
+import json
+import os
+import random
+import statistics
+import time
+
+import stubs  # noqa: F401  (puts backend/ on sys.path)
+from dedup import DedupIndex
+from prompt_budget import count_tokens, project_articles
+
+ARTICLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dedup_articles.jsonl")
+
+
+def load_articles(path):
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    # The card shape get_top_news hands to collapse()
+    return [{"id": str(i + 1), "title": row["title"], "description": row["description"], "url": f"https://example.com/{i}",
+             "source": row["source"], "publishedAt": "2024-01-01", "story": row["story"]} for i, row in enumerate(rows)]
+
+
+def filler(count, seed=7):
+    """Unrelated articles so lookups run against a realistically full index"""
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(20000)]
+    return [{"title": " ".join(rng.sample(vocabulary, 10)), "description": " ".join(rng.sample(vocabulary, 20)),
+             "source": "Filler"} for _ in range(count)]
+
+
+def pair_scores(articles, threshold):
+    index = DedupIndex(threshold=threshold)
+    clusters = [index.cluster_id(article) for article in articles]
+    tp = fp = fn = 0
+    for i, j in itertools.combinations(range(len(articles)), 2):
+        same, predicted = articles[i]["story"] == articles[j]["story"], clusters[i] == clusters[j]
+        tp += same and predicted
+        fp += predicted and not same
+        fn += same and not predicted
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    return precision, recall, tp, fp, fn
+
+
+def batches(articles, size, shuffle=True, seed=3):
+    ordered = list(articles)
+    if shuffle:
+        random.Random(seed).shuffle(ordered)
+    # Wrap around so every batch is full
+    return [[ordered[(start + k) % len(ordered)] for k in range(size)] for start in range(0, len(ordered), size)]
+
+
+def time_collapse(articles, size, filled, repeat):
+    cold, warm = [], []
+    for _ in range(repeat):
+        index = copy.deepcopy(filled)
+        for batch in batches(articles, size):
+            start = time.perf_counter()
+            index.collapse(batch)
+            cold.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            index.collapse(batch)
+            warm.append(time.perf_counter() - start)
+    return statistics.median(cold) * 1e6, statistics.median(warm) * 1e6
+
+
+def token_savings(articles, size, shuffle, description_chars):
+    before = after = kept = 0
+    index = DedupIndex()
+    for batch in batches(articles, size, shuffle):
+        collapsed = index.collapse(batch)
+        before += count_tokens(project_articles(batch, description_chars))
+        after += count_tokens(project_articles(collapsed, description_chars))
+        kept += len(collapsed)
+    return before, after, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate detection")
+    parser.add_argument("--articles", default=ARTICLES)
+    parser.add_argument("--thresholds", default="0.3,0.4,0.5,0.6,0.7")
+    parser.add_argument("--fill", type=int, default=5000, help="unrelated articles already in the index")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--description-chars", type=int, default=200)
+    args = parser.parse_args()
+
+    articles = load_articles(args.articles)
+    stories = len({a["story"] for a in articles})
+    print(f"{len(articles)} articles, {stories} stories")
+
+    print(f"\n{'threshold':>9} {'precision':>10} {'recall':>8} {'tp':>5} {'fp':>5} {'fn':>5}")
+    for threshold in (float(t) for t in args.thresholds.split(",")):
+        precision, recall, tp, fp, fn = pair_scores(articles, threshold)
+        print(f"{threshold:>9.2f} {precision:>10.0%} {recall:>8.0%} {tp:>5} {fp:>5} {fn:>5}")
+
+    filled = DedupIndex()
+    for article in filler(args.fill):
+        filled.cluster_id(article)
+    print(f"\ncollapse() per batch, index pre-filled with {args.fill} articles")
+    print(f"{'batch':>5} {'cold us':>9} {'warm us':>9} {'us/article':>11}")
+    for size in (10, 20, 40):
+        cold, warm = time_collapse(articles, size, filled, args.repeat)
+        print(f"{size:>5} {cold:>9.0f} {warm:>9.0f} {cold / size:>11.1f}")
+
+    # "grouped" keeps the file order, where outlets of one story sit together like in a keyword search;
+    # "shuffled" is closer to a mixed top-headlines page
+    print("\nprompt tokens for the tool results (project_articles)")
+    print(f"{'order':<9} {'batch':>5} {'articles':>9} {'kept':>5} {'before':>7} {'after':>7} {'saved':>6}")
+    for order, size in itertools.product(("grouped", "shuffled"), (5, 10, 20)):
+        shuffle = order == "shuffled"
+        before, after, kept = token_savings(articles, size, shuffle, args.description_chars)
+        sent = len(batches(articles, size, shuffle)) * size
+        print(f"{order:<9} {size:>5} {sent:>9} {kept:>5} {before:>7} {after:>7} {(before - after) / before:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
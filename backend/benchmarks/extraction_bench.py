@@ -0,0 +1,199 @@
+#---------------DESCRIPTION📄-----------------------------
+# Offline benchmark: streaming lxml extractor vs the old BeautifulSoup one
+# Runs over a folder of saved HTML pages and reports per page:
+#  - extraction time (best of --repeat runs)
+#  - peak Python memory while extracting (tracemalloc)
+#  - text quality as token F1 against a reference text
+# A page 'name.html' is scored against 'name.txt' next to it when that file
+# exists, otherwise against the old extractor's output.
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/extraction_bench.py --corpus path/to/pages'
+# Without --corpus a synthetic corpus of news-like pages is generated, which
+# only checks the extractor against itself. For real numbers build a corpus
+# once from a list of article URLs (one per line, e.g. copied from a few
+# /api/news responses) and rerun against it:
+#   py benchmarks/extraction_bench.py --fetch urls.txt --corpus pages
+# Pages are saved as pages/NN-domain.html and skipped when already there. The
+# corpus is not checked in because the articles belong to their publishers.
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+import httpx
+from bs4 import BeautifulSoup
+
+import stubs  # noqa: F401  (puts backend/ on sys.path)
+from extractor import ArticleExtractor
+
+
+def legacy_extract(html):
+    """The extraction fetch_article_content used before the streaming extractor"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    content_selectors = [
+        'article',
+        '[class*="article-content"]',
+        '[class*="post-content"]',
+        '[class*="entry-content"]',
+        '[class*="content-body"]',
+        'main p',
+        '.content p'
+    ]
+    content = ""
+    for selector in content_selectors:
+        elements = soup.select(selector)
+        if elements:
+            for element in elements:
+                content += element.get_text() + " "
+            break
+    if not content.strip():
+        paragraphs = soup.find_all('p')
+        content = ' '.join([p.get_text() for p in paragraphs])
+    content = ' '.join(content.split())
+    return content[:3000] if content else None
+
+
+WORDS = ("government market climate election court energy players season company shares report "
+         "officials minister league growth inflation storm vaccine research startup investors").split()
+
+
+def sentence(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 22))).capitalize() + "."
+
+
+def synthetic_page(rng, layout):
+    """A news-like page with navigation, scripts, comments and a sidebar around the story"""
+    body = [" ".join(sentence(rng) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(8, 30))]
+    nav = "".join(f"<li><a href='/s{i}'>Section {i}</a></li>" for i in range(40))
+    script = "<script>" + "var tracking = {};" * 2000 + "</script>"
+    comments = "".join(f"<div class='comment'><p>{sentence(rng)}</p></div>" for _ in range(rng.randint(20, 200)))
+    paragraphs = "".join(f"<p>{p}</p>" for p in body)
+    if layout == 0:
+        story = f"<article><h1>Headline</h1>{paragraphs}</article>"
+    elif layout == 1:
+        story = f"<div class='story-wrapper'><div class='article-body'>{paragraphs}</div></div>"
+    else:
+        story = f"<main><div class='text'>{paragraphs}</div></main>"
+    html = (f"<html><head><title>t</title><style>{'p{margin:0}' * 500}</style>{script}</head><body>"
+            f"<header><nav><ul>{nav}</ul></nav></header>{story}"
+            f"<aside><p>{sentence(rng)} {sentence(rng)}</p></aside><section class='comments'>{comments}</section>"
+            f"<footer><p>Copyright and legal notice for the example news site.</p></footer></body></html>")
+    return html, " ".join(body)
+
+
+def build_corpus(directory, pages):
+    rng = random.Random(7)
+    for i in range(pages):
+        html, reference = synthetic_page(rng, i % 3)
+        with open(os.path.join(directory, f"page{i:03d}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        with open(os.path.join(directory, f"page{i:03d}.txt"), "w", encoding="utf-8") as f:
+            f.write(reference)
+
+
+def fetch_corpus(url_file, directory):
+    """Download every URL listed in url_file into directory as NN-domain.html"""
+    os.makedirs(directory, exist_ok=True)
+    with open(url_file, encoding="utf-8") as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    headers = {"User-Agent": "Mozilla/5.0 (compatible; extraction-bench)"}
+    with httpx.Client(headers=headers, timeout=15, follow_redirects=True) as client:
+        for i, url in enumerate(urls):
+            path = os.path.join(directory, f"{i:02d}-{ArticleExtractor.domain(url).replace('.', '_')}.html")
+            if os.path.exists(path):
+                continue
+            try:
+                response = client.get(url)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"skipped {url}: {e}")
+                continue
+            with open(path, "wb") as f:
+                f.write(response.content)
+    print(f"{len(os.listdir(directory))} files in {directory}\n")
+
+
+def token_f1(candidate, reference):
+    """Bag-of-words F1, reference clipped to the 3000 characters either extractor returns"""
+    cand = Counter((candidate or "").lower().split())
+    ref = Counter(reference.lower()[:3000].split())
+    overlap = sum((cand & ref).values())
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / sum(cand.values()), overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def measure(fn, html, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(html)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run(corpus, repeat):
+    extractor = ArticleExtractor()
+    rows = []
+    for name in sorted(os.listdir(corpus)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(corpus, name), "rb") as f:
+            html = f.read()
+        ref_path = os.path.join(corpus, name[:-5] + ".txt")
+
+        old_text, old_time, old_peak = measure(legacy_extract, html, repeat)
+        # Every page is its own domain here so no learned rule gives the new extractor a head start
+        new_text, new_time, new_peak = measure(lambda h: extractor.extract_html(h, url=f"https://{name}/a"), html, repeat)
+
+        if os.path.exists(ref_path):
+            with open(ref_path, encoding="utf-8") as f:
+                reference = f.read()
+        else:
+            reference = old_text or ""
+        rows.append((name, len(html), old_time, new_time, old_peak, new_peak,
+                     token_f1(old_text, reference), token_f1(new_text, reference)))
+
+    print(f"{'page':<14} {'KB':>6} {'old ms':>8} {'new ms':>8} {'old KB':>8} {'new KB':>8} {'old F1':>7} {'new F1':>7}")
+    for name, size, ot, nt, op, np_, of, nf in rows:
+        print(f"{name:<14} {size / 1024:>6.0f} {ot * 1000:>8.2f} {nt * 1000:>8.2f} "
+              f"{op / 1024:>8.0f} {np_ / 1024:>8.0f} {of:>7.3f} {nf:>7.3f}")
+
+    def med(i):
+        return statistics.median(r[i] for r in rows)
+    print(f"\nmedian time    old {med(2) * 1000:.2f} ms   new {med(3) * 1000:.2f} ms   ({med(2) / med(3):.1f}x faster)")
+    print(f"median peak    old {med(4) / 1024:.0f} KB    new {med(5) / 1024:.0f} KB")
+    print(f"mean F1        old {statistics.mean(r[6] for r in rows):.3f}      new {statistics.mean(r[7] for r in rows):.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark article text extraction")
+    parser.add_argument("--corpus", help="folder of saved .html pages (optional .txt references)")
+    parser.add_argument("--pages", type=int, default=30, help="synthetic pages when no corpus is given")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fetch", metavar="URLS", help="file of article URLs to download into --corpus first")
+    args = parser.parse_args()
+
+    if args.fetch:
+        if not args.corpus:
+            parser.error("--fetch needs --corpus to save the pages in")
+        fetch_corpus(args.fetch, args.corpus)
+    if args.corpus:
+        run(args.corpus, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            build_corpus(tmp, args.pages)
+            run(tmp, args.repeat)
@@ -0,0 +1,240 @@
+#---------------DESCRIPTION🎭-----------------------------
+# Local stand-ins for every upstream main.py talks to, served by one app:
+#  - Azure OpenAI chat completions (tool calls and streaming included)
+#      POST /openai/deployments/{model}/chat/completions
+#  - NewsAPI       GET /v2/top-headlines, GET /v2/everything
+#  - article pages GET /articles/{n}
+# Latency and error rate are configurable per upstream, so load tests can
+# run offline without spending tokens or the 100/day NewsAPI quota.
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/fake_upstreams.py --port 9100'
+# Point the backend at it with:
+#   ENDPOINT=http://127.0.0.1:9100  NEWS_API_URL=http://127.0.0.1:9100/v2
+# Latency specs: 'fixed:0.2', 'uniform:0.1:0.5', 'lognormal:<median>:<sigma>'
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+
+CATEGORIES = ["business", "entertainment", "general", "health", "science", "sports", "technology"]
+# Large enough that two random sentences share few words, dedup.py must see distinct stories
+WORDS = ("government market climate election court energy players season company shares report officials "
+         "minister league growth inflation storm research startup investors parliament vote "
+         "airline flights merger trial metro ballots drought harvest wildfire forest bridge strike teachers "
+         "hospital nurses pension reform tariffs exports currency oil prices pipeline rocket launch satellite "
+         "museum painting festival concert film premiere novel award earthquake flood rescue border talks "
+         "ceasefire summit embassy protest students university glacier ocean reef whale coral robot factory "
+         "chip shortage phone recall software outage bank housing rents mortgage rates tourism visa railway "
+         "highway tunnel harbour port shipping drone police investigation fraud verdict appeal referendum "
+         "coalition senate governor mayor stadium marathon cyclist tennis cricket football rugby olympic record "
+         "farmers wheat coffee cocoa copper lithium mine refinery solar wind turbine grid blackout heatwave "
+         "typhoon monsoon volcano island village capital province district council budget deficit debt bonds "
+         "lender regulator antitrust lawsuit patent privacy hackers breach ransomware cloud telescope comet "
+         "asteroid fossil dinosaur vaccine outbreak clinic surgeon cancer diabetes nutrition school exam "
+         "scholarship orchestra theatre gallery fashion designer chef restaurant wine brewery airport runway "
+         "ferry cargo container truckers union wages jobs unemployment retail sales consumer spending").split()
+
+
+class Latency:
+    """Random delay drawn from a fixed, uniform or lognormal distribution"""
+
+    def __init__(self, spec):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+
+    def sample(self, rng=random):
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma)
+        raise ValueError(f"unknown latency distribution: {self.kind}")
+
+
+class UpstreamProfile:
+    def __init__(self, latency="fixed:0", error_rate=0.0):
+        self.latency = Latency(latency)
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+
+    async def delay(self):
+        self.requests += 1
+        await asyncio.sleep(self.latency.sample())
+
+    def should_fail(self):
+        if random.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+
+def sentence(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+
+def create_app(llm=None, news=None, pages=None, token_latency=0.01, base_url="http://127.0.0.1:9100"):
+    """Build the fake upstream app with the given UpstreamProfiles"""
+    llm = llm or UpstreamProfile()
+    news = news or UpstreamProfile()
+    pages = pages or UpstreamProfile()
+    app = FastAPI(title="Fake upstreams")
+
+    # ---------------- Azure OpenAI ----------------
+    def completion_payload(message, finish_reason, prompt_tokens):
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "fake",
+            "choices": [{"index": 0, "finish_reason": finish_reason, "message": message}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 30, "total_tokens": prompt_tokens + 30},
+        }
+
+    def pick_tool_args(text):
+        text = text.lower()
+        args = {"location": "gb" if " uk" in text or "britain" in text else "us"}
+        category = next((c for c in CATEGORIES if c[:4] in text), None)
+        if category:
+            args["category"] = category
+        elif "about" in text:
+            args["query"] = text.split("about", 1)[1].strip() or "world"
+        return args
+
+    def chunk(delta, finish_reason=None):
+        return "data: " + json.dumps({
+            "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": "fake", "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }) + "\n\n"
+
+    async def stream_reply(message):
+        for call in message.get("tool_calls", []):
+            yield chunk({"role": "assistant", "tool_calls": [{"index": 0, **call}]})
+        words = (message.get("content") or "").split()
+        for word in words:
+            await asyncio.sleep(token_latency)
+            yield chunk({"content": word + " "})
+        yield chunk({}, "tool_calls" if message.get("tool_calls") else "stop")
+        yield "data: [DONE]\n\n"
+
+    @app.post("/openai/deployments/{model}/chat/completions")
+    @app.post("/openai/chat/completions")
+    async def chat_completions(request: Request, model: str = "fake"):
+        body = await request.json()
+        await llm.delay()
+        if llm.should_fail():
+            return JSONResponse({"error": {"code": "429", "message": "Fake rate limit"}}, status_code=429,
+                                headers={"retry-after": "1"})
+
+        messages = body.get("messages", [])
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+        last = messages[-1] if messages else {}
+        if body.get("tools") and last.get("role") == "user" and "news" in (last.get("content") or "").lower():
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:8]}",
+                "type": "function",
+                "function": {"name": "get_top_news", "arguments": json.dumps(pick_tool_args(last["content"]))},
+            }]}
+        else:
+            rng = random.Random()
+            length = min(body.get("max_tokens") or 120, 120) // 6
+            message = {"role": "assistant", "content": " ".join(sentence(rng) for _ in range(max(length // 12, 1)))}
+
+        if body.get("stream"):
+            return StreamingResponse(stream_reply(message), media_type="text/event-stream")
+        finish = "tool_calls" if message.get("tool_calls") else "stop"
+        return completion_payload(message, finish, prompt_tokens)
+
+    # ---------------- NewsAPI ----------------
+    def news_payload(seed, page_size):
+        rng = random.Random(seed)
+        articles = []
+        for i in range(page_size):
+            n = rng.randint(0, 100_000)
+            articles.append({
+                "source": {"id": None, "name": f"Fake Source {n % 17}"},
+                "title": sentence(rng)[:90],
+                "description": sentence(rng),
+                "url": f"{base_url}/articles/{n}",
+                "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            })
+        return {"status": "ok", "totalResults": page_size, "articles": articles}
+
+    async def news_endpoint(request):
+        await news.delay()
+        if news.should_fail():
+            return JSONResponse({"status": "error", "code": "rateLimited", "message": "Fake quota exceeded"},
+                                status_code=429)
+        params = dict(request.query_params)
+        seed = json.dumps(sorted((k, v) for k, v in params.items() if k != "apiKey"))
+        return news_payload(seed, int(params.get("pageSize", 10)))
+
+    @app.get("/v2/top-headlines")
+    async def top_headlines(request: Request):
+        return await news_endpoint(request)
+
+    @app.get("/v2/everything")
+    async def everything(request: Request):
+        return await news_endpoint(request)
+
+    # ---------------- article pages ----------------
+    @app.get("/articles/{n}", response_class=HTMLResponse)
+    async def article_page(n: int):
+        await pages.delay()
+        if pages.should_fail():
+            return HTMLResponse("<h1>Service unavailable</h1>", status_code=503)
+        rng = random.Random(n)
+        paragraphs = "".join(f"<p>{sentence(rng)} {sentence(rng)}</p>" for _ in range(rng.randint(8, 25)))
+        nav = "".join(f"<li><a href='/s{i}'>Section {i}</a></li>" for i in range(30))
+        return (f"<html><head><script>{'var t={};' * 500}</script></head><body><nav><ul>{nav}</ul></nav>"
+                f"<article><h1>Story {n}</h1>{paragraphs}</article><footer><p>Fake footer text.</p></footer>"
+                f"</body></html>")
+
+    @app.get("/_stats")
+    async def stats():
+        return {name: {"requests": p.requests, "errors": p.errors}
+                for name, p in (("llm", llm), ("news", news), ("pages", pages))}
+
+    return app
+
+
+def add_arguments(parser):
+    """Upstream options shared with loadtest.py"""
+    parser.add_argument("--llm-latency", default="lognormal:0.6:0.35")
+    parser.add_argument("--llm-token-latency", type=float, default=0.01)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--news-latency", default="lognormal:0.15:0.3")
+    parser.add_argument("--news-error-rate", type=float, default=0.0)
+    parser.add_argument("--page-latency", default="lognormal:0.25:0.5")
+    parser.add_argument("--page-error-rate", type=float, default=0.0)
+
+
+def app_from_args(args, port):
+    return create_app(
+        llm=UpstreamProfile(args.llm_latency, args.llm_error_rate),
+        news=UpstreamProfile(args.news_latency, args.news_error_rate),
+        pages=UpstreamProfile(args.page_latency, args.page_error_rate),
+        token_latency=args.llm_token_latency,
+        base_url=f"http://127.0.0.1:{port}",
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Azure OpenAI, NewsAPI and article servers")
+    parser.add_argument("--port", type=int, default=9100)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(app_from_args(args, args.port), host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,158 @@
+#---------------DESCRIPTION📰-----------------------------
+# Requests/second of GET /api/news served from the in-memory headline snapshot
+# Starts the backend (one worker by default) against fake_upstreams.py, warms
+# the feed, then hammers it from several client processes over keep-alive
+# connections, once with full 200 responses and once with If-None-Match (304).
+# The clients speak raw HTTP/1.1 on asyncio streams; httpx would be the
+# bottleneck long before the server is.
+# Also reports how many NewsAPI and model calls the run caused (should be ~0).
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/feed_bench.py'
+# Options: '--workers 2 --clients 4 --connections 32 --seconds 10'
+# Without the timing middleware: '--backend-env METRICS_ENABLED=False'
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+import stubs  # noqa: F401  (puts backend/ on sys.path)
+from loadtest import BENCH_DIR, BACKEND_DIR, free_port, wait_until_up
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head[9:12])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    if length:
+        await reader.readexactly(length)
+    return status
+
+
+async def connection(port, request, deadline, latencies, statuses):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def client_process(port, path, etag, connections, seconds, results):
+    headers = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+    if etag:
+        headers += f"If-None-Match: {etag}\r\n"
+    request = (headers + "\r\n").encode()
+    latencies, statuses = [], {}
+
+    async def run():
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(connection(port, request, deadline, latencies, statuses) for _ in range(connections)))
+
+    asyncio.run(run())
+    results.put((len(latencies), sorted(latencies)[len(latencies) // 2] if latencies else 0,
+                 sorted(latencies)[int(len(latencies) * 0.99)] if latencies else 0, statuses))
+
+
+def load(port, path, etag, args):
+    results = multiprocessing.Queue()
+    per_client = max(args.connections // args.clients, 1)
+    processes = [multiprocessing.Process(target=client_process,
+                                         args=(port, path, etag, per_client, args.seconds, results))
+                 for _ in range(args.clients)]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    statuses = {}
+    for row in rows:
+        for status, count in row[3].items():
+            statuses[status] = statuses.get(status, 0) + count
+    return {
+        "rps": sum(row[0] for row in rows) / args.seconds,
+        "p50_ms": statistics.median(row[1] for row in rows) * 1000,
+        "p99_ms": max(row[2] for row in rows) * 1000,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /api/news throughput")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--clients", type=int, default=4, help="load generator processes")
+    parser.add_argument("--connections", type=int, default=32, help="keep-alive connections in total")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--path", default="/api/news?country=us&page=1")
+    parser.add_argument("--backend-env", action="append", default=[], help="extra KEY=VALUE for the backend")
+    args = parser.parse_args()
+
+    upstream_port, backend_port = free_port(), free_port()
+    upstream = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "fake_upstreams.py"), "--port", str(upstream_port)],
+                                cwd=BACKEND_DIR)
+    processes = [upstream]
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            wait_until_up(f"http://127.0.0.1:{upstream_port}/_stats", upstream)
+            env = {
+                **os.environ,
+                "ENDPOINT": f"http://127.0.0.1:{upstream_port}",
+                "SUBSCRIPTION_KEY": "feedbench",
+                "API_VERSION": "2024-06-01",
+                "MODEL_NAME": "fake",
+                "NEWS_API_KEY": "feedbench",
+                "NEWS_API_URL": f"http://127.0.0.1:{upstream_port}/v2",
+                "SUMMARY_CACHE_PATH": os.path.join(workdir, "summary_cache.db"),
+                "NEWS_INDEX_DIR": os.path.join(workdir, "news_index"),
+                "SHARED_CACHE_PATH": os.path.join(workdir, "shared_cache.db"),
+                "WEB_CONCURRENCY": str(args.workers),
+                "LOG_LEVEL": "WARNING",
+                **dict(kv.split("=", 1) for kv in args.backend_env),
+            }
+            backend = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:create_app", "--factory", "--host", "127.0.0.1",
+                                        "--port", str(backend_port), "--workers", str(args.workers), "--log-level", "warning",
+                                        "--no-access-log"], cwd=BACKEND_DIR, env=env)
+            processes.append(backend)
+            url = f"http://127.0.0.1:{backend_port}"
+            wait_until_up(f"{url}/health", backend)
+
+            # Warm every worker's snapshot and grab the ETag
+            for _ in range(args.workers * 4):
+                response = httpx.get(url + args.path, timeout=30)
+                response.raise_for_status()
+            etag = response.headers["etag"]
+            before = httpx.get(f"http://127.0.0.1:{upstream_port}/_stats").json()
+
+            print(f"GET {args.path}: {len(response.content)} bytes, {args.workers} worker(s), "
+                  f"{args.connections} connections from {args.clients} client processes, {args.seconds:.0f}s each")
+            for name, tag in (("200 full body", None), ("304 If-None-Match", etag)):
+                result = load(backend_port, args.path, tag, args)
+                print(f"{name:<18} {result['rps']:>9.0f} req/s   p50 {result['p50_ms']:.2f} ms   "
+                      f"p99 {result['p99_ms']:.2f} ms   statuses {result['statuses']}")
+
+            after = httpx.get(f"http://127.0.0.1:{upstream_port}/_stats").json()
+            print(f"upstream calls during the run: NewsAPI {after['news']['requests'] - before['news']['requests']}, "
+                  f"model {after['llm']['requests'] - before['llm']['requests']}")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
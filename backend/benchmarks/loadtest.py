@@ -0,0 +1,230 @@
+#---------------DESCRIPTION📈-----------------------------
+# Offline load test for the FastAPI backend (main.py)
+# Starts fake_upstreams.py and the backend as separate processes, drives
+# /api/chat and /api/summarize at a fixed concurrency and reports
+# throughput and p50/p95/p99 latency per endpoint.
+# Results are written as JSON so runs can be compared across commits.
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/loadtest.py --concurrency 16 --requests 400 --out before.json'
+# Compare with an earlier run: '--compare before.json'
+# Hit an already running backend instead: '--target http://127.0.0.1:8000'
+# Upstream latency/errors: see 'py benchmarks/fake_upstreams.py --help'
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+import fake_upstreams
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+CHAT_PROMPTS = [
+    "Get me the latest technology news in the US",
+    "Any sports news from the UK?",
+    "Show me business news",
+    "Find news about climate change",
+    "What's new in health news today?",
+    "news about artificial intelligence",
+    "Hi, what can you do?",
+    "Explain what a headline is",
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"process for {url} exited with {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def start_processes(args, workdir):
+    """Launch the fake upstreams and the backend, returns (backend url, upstream url, processes)"""
+    upstream_port, backend_port = free_port(), free_port()
+    upstream_cmd = [sys.executable, os.path.join(BENCH_DIR, "fake_upstreams.py"), "--port", str(upstream_port),
+                    "--llm-latency", args.llm_latency, "--llm-token-latency", str(args.llm_token_latency),
+                    "--llm-error-rate", str(args.llm_error_rate), "--news-latency", args.news_latency,
+                    "--news-error-rate", str(args.news_error_rate), "--page-latency", args.page_latency,
+                    "--page-error-rate", str(args.page_error_rate)]
+    upstream = subprocess.Popen(upstream_cmd, cwd=BACKEND_DIR)
+    wait_until_up(f"http://127.0.0.1:{upstream_port}/_stats", upstream)
+
+    env = {
+        **os.environ,
+        "ENDPOINT": f"http://127.0.0.1:{upstream_port}",
+        "SUBSCRIPTION_KEY": "loadtest",
+        "API_VERSION": "2024-06-01",
+        "MODEL_NAME": "fake",
+        "NEWS_API_KEY": "loadtest",
+        "NEWS_API_URL": f"http://127.0.0.1:{upstream_port}/v2",
+        # Fresh caches per run so results don't depend on earlier runs
+        "SUMMARY_CACHE_PATH": os.path.join(workdir, "summary_cache.db"),
+        "NEWS_INDEX_DIR": os.path.join(workdir, "news_index"),
+        "SHARED_CACHE_PATH": os.path.join(workdir, "shared_cache.db"),
+        "SESSION_SPILL_DIR": os.path.join(workdir, "sessions"),
+        "WEB_CONCURRENCY": str(args.workers),
+        "NEWS_API_DAILY_QUOTA": "1000000",
+        **dict(kv.split("=", 1) for kv in args.backend_env),
+    }
+    backend_cmd = [sys.executable, "-m", "uvicorn", "main:create_app", "--factory", "--host", "127.0.0.1",
+                   "--port", str(backend_port), "--log-level", "warning", "--workers", str(args.workers)]
+    backend = subprocess.Popen(backend_cmd, cwd=BACKEND_DIR, env=env)
+    wait_until_up(f"http://127.0.0.1:{backend_port}/health", backend)
+    return f"http://127.0.0.1:{backend_port}", f"http://127.0.0.1:{upstream_port}", [backend, upstream]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(s["latency"] for s in samples if s["ok"])
+    return {
+        "requests": len(samples),
+        "errors": sum(not s["ok"] for s in samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else None,
+    }
+
+
+async def drive(base_url, args):
+    """Keep `concurrency` requests in flight until `requests` have completed"""
+    rng = random.Random(args.seed)
+    weights = dict(part.split("=") for part in args.mix.split(","))
+    endpoints, probabilities = zip(*((name, float(w)) for name, w in weights.items()))
+    fake_upstream = args.target is None
+
+    def next_request():
+        endpoint = rng.choices(endpoints, probabilities)[0]
+        if endpoint == "chat":
+            return endpoint, "/api/chat", {"message": rng.choice(CHAT_PROMPTS)}
+        # A limited article pool makes popular articles repeat, like real clicks do
+        n = rng.randint(0, args.article_pool - 1)
+        url = f"{args.article_base}/articles/{n}" if fake_upstream else args.article_base.format(n=n)
+        return endpoint, "/api/summarize", {"article": {"title": f"Story {n}", "description": "Fake", "url": url}}
+
+    samples = []
+    queue = [next_request() for _ in range(args.requests)]
+
+    async def worker(client):
+        while queue:
+            endpoint, path, body = queue.pop()
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            samples.append({"endpoint": endpoint, "latency": time.perf_counter() - start, "ok": ok})
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    results = {"all": summarize(samples, elapsed), "elapsed_s": round(elapsed, 2)}
+    for endpoint in endpoints:
+        results[endpoint] = summarize([s for s in samples if s["endpoint"] == endpoint], elapsed)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    print(f"{'endpoint':<10} {'reqs':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in results.items():
+        if not isinstance(row, dict):
+            continue
+        print(f"{name:<10} {row['requests']:>6} {row['errors']:>6} {row['throughput_rps']:>8} "
+              f"{row['p50_ms']!s:>9} {row['p95_ms']!s:>9} {row['p99_ms']!s:>9}")
+        old = (baseline or {}).get(name)
+        if old:
+            def delta(key):
+                if not old.get(key) or row.get(key) is None:
+                    return "n/a"
+                return f"{(row[key] - old[key]) / old[key] * 100:+.1f}%"
+            print(f"{'  vs base':<10} {'':>6} {'':>6} {delta('throughput_rps'):>8} "
+                  f"{delta('p50_ms'):>9} {delta('p95_ms'):>9} {delta('p99_ms'):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for /api/chat and /api/summarize")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--mix", default="chat=0.5,summarize=0.5")
+    parser.add_argument("--article-pool", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the backend")
+    parser.add_argument("--backend-env", nargs="*", default=[], help="extra KEY=VALUE settings for the backend")
+    parser.add_argument("--target", help="use an already running backend instead of starting one")
+    parser.add_argument("--article-url", default="http://127.0.0.1:9100/articles/{n}",
+                        help="article URL template when --target is used")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    fake_upstreams.add_arguments(parser)
+    args = parser.parse_args()
+
+    processes = []
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            if args.target:
+                base_url, args.article_base = args.target, args.article_url
+            else:
+                base_url, args.article_base, processes = start_processes(args, workdir)
+            results = asyncio.run(drive(base_url, args))
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.out:
+        config = {k: v for k, v in vars(args).items() if k not in ("out", "compare", "article_base")}
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "config": config, "results": results}, f, indent=2)
+        print(f"\nSaved results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
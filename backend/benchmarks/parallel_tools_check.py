@@ -0,0 +1,80 @@
+#---------------DESCRIPTION🔀-----------------------------
+# Checks that run_tool_calls (main.py) dispatches tool calls concurrently
+# Each stubbed NewsAPI lookup sleeps for a different time, so the turn
+# should take as long as the slowest lookup, not the sum of all of them.
+# It also checks that results are merged and tool messages stay in order.
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/parallel_tools_check.py'
+# or under pytest: 'pytest benchmarks/parallel_tools_check.py'
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from openai.types.chat import ChatCompletionMessageToolCall
+
+import stubs
+
+# Start from empty caches, headlines cached by an earlier run would skip the stubbed lookups
+_scratch = tempfile.mkdtemp(prefix="parallel_tools_check_")
+os.environ.setdefault("SUMMARY_CACHE_PATH", os.path.join(_scratch, "summaries.db"))
+os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(_scratch, "shared.db"))
+
+import main  # noqa: E402
+
+LATENCIES = {"us": 0.3, "my": 0.5, "gb": 0.2}
+
+
+class SlowPerCountryNews(stubs.StubNewsClient):
+    """News stub whose latency depends on the requested country"""
+
+    async def get_top_headlines(self, country=None, category=None, q=None, page_size=None, page=None):
+        self.calls += 1
+        await asyncio.sleep(LATENCIES[country])
+        payload = self._payload(f"{country}-{category or 'general'}")
+        # The same wire story shows up in every country's feed
+        payload["articles"][0]["url"] = "https://wire.example.com/shared-story"
+        return payload
+
+
+def tool_call(i, **args):
+    return ChatCompletionMessageToolCall(
+        id=f"call_{i}",
+        type="function",
+        function={"name": "get_top_news", "arguments": json.dumps(args)},
+    )
+
+
+async def check():
+    main.news_client = SlowPerCountryNews()
+    calls = [tool_call(i, location=country, category="technology") for i, country in enumerate(LATENCIES)]
+    messages = []
+
+    start = time.perf_counter()
+    articles = await main.run_tool_calls(calls, messages)
+    elapsed = time.perf_counter() - start
+
+    slowest, total = max(LATENCIES.values()), sum(LATENCIES.values())
+    print(f"wall time {elapsed:.3f}s  slowest call {slowest:.3f}s  sum of calls {total:.3f}s")
+    assert elapsed < slowest + 0.1, f"turn took {elapsed:.3f}s, the slowest call alone takes {slowest:.3f}s"
+    assert elapsed < 0.75 * total, f"turn took {elapsed:.3f}s, close to the {total:.3f}s of running the calls in turn"
+
+    tool_ids = [m["tool_call_id"] for m in messages if m["role"] == "tool"]
+    assert tool_ids == [c.id for c in calls], f"tool messages out of order: {tool_ids}"
+
+    urls = [a["url"] for a in articles]
+    assert len(urls) == len(set(urls)), "merged articles contain duplicates"
+    assert {a["location"] for a in articles} == set(LATENCIES), "a tool result was dropped"
+    assert [a["id"] for a in articles] == [str(i + 1) for i in range(len(articles))]
+    print(f"merged {len(articles)} unique articles from {len(calls)} tool calls - OK")
+
+
+def test_tool_calls_run_concurrently():
+    asyncio.run(check())
+
+
+if __name__ == "__main__":
+    asyncio.run(check())
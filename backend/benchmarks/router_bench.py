@@ -0,0 +1,136 @@
+#---------------DESCRIPTION🧭-----------------------------
+# Accuracy and latency of the local intent router vs the model's tool choice
+# Runs every labeled query in router_queries.jsonl through IntentRouter and,
+# with --llm, through the tool-selection completion main.py makes. Reports:
+#  - coverage: share of news queries the router answers on its own
+#  - precision: share of routed queries whose get_top_news calls match the label
+#  - deferrals: non-news queries the router correctly leaves to the model
+#  - latency per query for both
+# A query's label is its list of get_top_news argument dicts, or null when it
+# is not an obvious news request.
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/router_bench.py'
+# Compare with the model (uses the Azure settings from .env): '--llm'
+# Offline, against fake_upstreams.py: 'ENDPOINT=http://127.0.0.1:9100 py benchmarks/router_bench.py --llm'
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import stubs  # noqa: F401  (puts backend/ on sys.path)
+import main
+from intent_router import IntentRouter
+
+QUERIES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "router_queries.jsonl")
+
+
+def load_queries(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def call_matches(got, expected):
+    if got.get("location", "us").lower() != expected.get("location", "us") or got.get("category") != expected.get("category"):
+        return False
+    if bool(got.get("query")) != bool(expected.get("query")):
+        return False
+    if not expected.get("query"):
+        return True
+    # Keyword queries only need to mostly agree ("tesla recall" vs "tesla recalls" is fine)
+    a, b = set(got["query"].lower().split()), set(expected["query"].lower().split())
+    return len(a & b) / len(a | b) >= 0.5
+
+
+def calls_match(got, expected):
+    if not got or not expected or len(got) != len(expected):
+        return not got and not expected
+    remaining = list(expected)
+    for call in got:
+        match = next((e for e in remaining if call_matches(call, e)), None)
+        if match is None:
+            return False
+        remaining.remove(match)
+    return True
+
+
+def run_router(queries, min_confidence, repeat):
+    router = IntentRouter(main.tools[0])
+    rows = []
+    for item in queries:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            route = router.route(item["query"])
+            best = min(best, time.perf_counter() - start)
+        calls = route.calls if route and route.confidence >= min_confidence else None
+        rows.append({"query": item["query"], "expected": item["expected"], "got": calls, "seconds": best})
+    return rows
+
+
+async def run_llm(queries):
+    rows = []
+    for item in queries:
+        messages = main.build_chat_messages(main.ChatRequest(message=item["query"]))
+        start = time.perf_counter()
+        try:
+            response = await main.create_completion("tool_select", messages=messages, tools=main.tools, tool_choice="auto")
+            tool_calls = response.choices[0].message.tool_calls or []
+            calls = [json.loads(tc.function.arguments) for tc in tool_calls] or None
+        except Exception as e:
+            print(f"LLM error for {item['query']!r}: {e}")
+            calls = "error"
+        rows.append({"query": item["query"], "expected": item["expected"], "got": calls,
+                     "seconds": time.perf_counter() - start})
+    return rows
+
+
+def report(name, rows, routed_only):
+    news = [r for r in rows if r["expected"]]
+    other = [r for r in rows if not r["expected"]]
+    answered = [r for r in news if r["got"] and r["got"] != "error"]
+    correct = [r for r in answered if calls_match(r["got"], r["expected"])]
+    deferred = [r for r in other if not r["got"]]
+    latencies = sorted(r["seconds"] for r in rows)
+
+    print(f"\n== {name} ==")
+    label = "coverage" if routed_only else "tool calls"
+    print(f"{label:<12} {len(answered)}/{len(news)} news queries ({len(answered) / max(len(news), 1):.0%})")
+    print(f"{'precision':<12} {len(correct)}/{len(answered)} ({len(correct) / max(len(answered), 1):.0%})")
+    print(f"{'deferrals':<12} {len(deferred)}/{len(other)} non-news queries left to the model"
+          if routed_only else f"{'no tool':<12} {len(deferred)}/{len(other)} non-news queries answered directly")
+    print(f"{'latency':<12} median {statistics.median(latencies) * 1000:.3f} ms   "
+          f"max {latencies[-1] * 1000:.3f} ms")
+    mistakes = [r for r in answered if r not in correct] + [r for r in other if r not in deferred]
+    for r in mistakes:
+        print(f"  miss: {r['query']!r}: got {r['got']}, expected {r['expected']}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark the intent router against the model's tool choice")
+    parser.add_argument("--queries", default=QUERIES)
+    parser.add_argument("--min-confidence", type=float, default=main.intent_router_min_confidence)
+    parser.add_argument("--repeat", type=int, default=200, help="router runs per query, best is kept")
+    parser.add_argument("--llm", action="store_true", help="also ask the model for its tool choice")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    router_rows = run_router(queries, args.min_confidence, args.repeat)
+    report("router", router_rows, routed_only=True)
+
+    if args.llm:
+        llm_rows = asyncio.run(run_llm(queries))
+        report("model", llm_rows, routed_only=False)
+        # Where both answered, how often the router agrees with the model
+        both = [(r, l) for r, l in zip(router_rows, llm_rows) if r["got"] and l["got"] and l["got"] != "error"]
+        agree = sum(calls_match(r["got"], l["got"]) for r, l in both)
+        print(f"\nrouter agrees with the model on {agree}/{len(both)} queries both answered")
+        saved = sum(l["seconds"] for r, l in zip(router_rows, llm_rows) if r["got"])
+        print(f"model time skipped on routed queries: {saved:.1f} s over {len(queries)} queries")
+
+
+if __name__ == "__main__":
+    main_cli()
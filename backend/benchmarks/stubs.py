@@ -0,0 +1,177 @@
+#---------------DESCRIPTION🧪-----------------------------
+# In-process stand-ins for the Azure OpenAI and News API clients
+# Used by the benchmark scripts so they never spend real tokens or quota
+
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+# Make the backend modules importable when a script is run from benchmarks/
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# main.py builds its clients at import time, give it harmless settings
+os.environ.setdefault("ENDPOINT", "https://example.openai.azure.com")
+os.environ.setdefault("SUBSCRIPTION_KEY", "benchmark")
+os.environ.setdefault("API_VERSION", "2024-06-01")
+os.environ.setdefault("MODEL_NAME", "gpt-4o-mini")
+os.environ.setdefault("NEWS_API_KEY", "benchmark")
+
+# Headline words, each stub article draws its own handful (seeded by country,
+# category and position) so articles are different stories to dedup.py
+STORY_WORDS = ("markets rally inflation report storm coastal evacuations team championship final scientists "
+               "distant galaxy parliament budget vote startup battery design airline holiday flights court merger "
+               "vaccine trial metro line election ballots minister resigns drought harvest wildfire forest bridge "
+               "collapse strike teachers hospital nurses pension reform tariffs exports currency slump oil prices "
+               "pipeline rocket launch satellite orbit museum painting festival concert film premiere novel award "
+               "earthquake tremor flood rescue border talks ceasefire summit embassy protest students university "
+               "research glacier ocean reef whale coral robot factory chip shortage phone recall software outage "
+               "bank merger housing rents mortgage rates tourism visa railway highway tunnel harbour port shipping "
+               "drone police investigation fraud trial verdict appeal referendum coalition senate governor mayor "
+               "stadium marathon cyclist tennis cricket football rugby olympic record").split()
+
+
+async def pause(latency):
+    """Sleep `latency` seconds, or latency() seconds when it is a function (a latency distribution)"""
+    await asyncio.sleep(latency() if callable(latency) else latency)
+
+
+def make_completion(content=None, tool_calls=None, prompt_tokens=50, completion_tokens=20):
+    """Build a real ChatCompletion object so main.py sees the same types as in production"""
+    message = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = [
+            {
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(args)},
+            }
+            for i, (name, args) in enumerate(tool_calls)
+        ]
+    return ChatCompletion.model_validate({
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "stub",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "tool_calls" if tool_calls else "stop",
+            "message": message,
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    })
+
+
+def make_chunk(content=None, tool_call=None, finish_reason=None):
+    """Build one streamed ChatCompletionChunk"""
+    delta = {"role": "assistant"}
+    if content is not None:
+        delta["content"] = content
+    if tool_call is not None:
+        delta["tool_calls"] = [tool_call]
+    return ChatCompletionChunk.model_validate({
+        "id": "chatcmpl-stream",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "stub",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    })
+
+
+async def stream_completion(completion, token_latency):
+    """Replay a ChatCompletion as the chunk stream the real API would send"""
+    message = completion.choices[0].message
+    for i, call in enumerate(message.tool_calls or []):
+        # Arguments arrive in fragments, split them to exercise reassembly
+        arguments = call.function.arguments
+        half = len(arguments) // 2
+        yield make_chunk(tool_call={"index": i, "id": call.id, "type": "function",
+                                    "function": {"name": call.function.name, "arguments": arguments[:half]}})
+        yield make_chunk(tool_call={"index": i, "function": {"arguments": arguments[half:]}})
+    for word in (message.content or "").split():
+        await asyncio.sleep(token_latency)
+        yield make_chunk(content=word + " ")
+    yield make_chunk(finish_reason="tool_calls" if message.tool_calls else "stop")
+
+
+class _StubCompletions:
+    def __init__(self, owner):
+        self.owner = owner
+
+    async def create(self, **kwargs):
+        self.owner.calls += 1
+        await pause(self.owner.latency)
+
+        messages = kwargs.get("messages", [])
+        last = messages[-1]
+        if kwargs.get("tools") and last["role"] == "user" and "news" in last["content"].lower():
+            completion = make_completion(tool_calls=self.owner.tool_calls)
+        else:
+            completion = make_completion(content="Here is a short stubbed reply from the model.")
+
+        if kwargs.get("stream"):
+            return stream_completion(completion, self.owner.token_latency)
+        return completion
+
+
+class _StubChat:
+    def __init__(self, owner):
+        self.completions = _StubCompletions(owner)
+
+
+class StubAsyncOpenAI:
+    """Pretends to be AsyncAzureOpenAI, sleeping `latency` seconds per completion (time to first token when streaming)"""
+
+    def __init__(self, latency=0.2, tool_calls=None, token_latency=0.02):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.calls = 0
+        self.tool_calls = tool_calls or [("get_top_news", {"location": "us", "category": "technology"})]
+        self.chat = _StubChat(self)
+
+
+class StubNewsClient:
+    """Pretends to be AsyncNewsApiClient, sleeping `latency` seconds per request"""
+
+    def __init__(self, latency=0.1, articles=5):
+        self.latency = latency
+        self.articles = articles
+        self.calls = 0
+
+    def _payload(self, tag):
+        stories = [random.Random(f"{tag}/{i}").sample(STORY_WORDS, 16) for i in range(self.articles)]
+        return {
+            "status": "ok",
+            "totalResults": self.articles,
+            "articles": [
+                {
+                    "source": {"id": None, "name": f"Stub Source {i}"},
+                    "title": f"{tag} headline {i}: {' '.join(stories[i][:8])}",
+                    "description": f"Stubbed description about {' '.join(stories[i][8:])}.",
+                    "url": f"https://news.example.com/{tag}/{i}",
+                    "publishedAt": "2024-01-01T00:00:00Z",
+                }
+                for i in range(self.articles)
+            ],
+        }
+
+    async def get_top_headlines(self, country=None, category=None, q=None, page_size=None, page=None):
+        self.calls += 1
+        await pause(self.latency)
+        return self._payload(f"{country}-{category or 'general'}")
+
+    async def get_everything(self, q=None, language=None, sort_by=None, page_size=None, page=None):
+        self.calls += 1
+        await pause(self.latency)
+        return self._payload(f"search-{q}")
@@ -0,0 +1,143 @@
+#---------------DESCRIPTION🪄-----------------------------
+# What the summary model gets to read: 3000-character cut vs extractive selection
+# For every article in summary_articles.jsonl (scraped-looking text with
+# boilerplate, plus reference highlights) it compares:
+#  - truncate: the first 3000 characters (what prepare_summary used to send)
+#  - lead: the first sentences, within the same token budget as extractive
+#  - extractive: extractive.py's TextRank selection within SUMMARY_INPUT_TOKENS
+# and reports input tokens, how much of the highlights the input covers
+# (ROUGE-1 / ROUGE-2 recall on content words) and time to rank an article.
+# The preview (3 sentences) is compared with the first 3 sentences the same way.
+# With --llm it also runs the summary completion on both inputs.
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/summary_bench.py'
+# Options: '--budget 400 --repeat 50'
+# With the model (uses the Azure settings from .env): '--llm'
+# Offline, against fake_upstreams.py: 'ENDPOINT=http://127.0.0.1:9100 py benchmarks/summary_bench.py --llm'
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import stubs  # noqa: F401  (puts backend/ on sys.path)
+from extractive import digest, split_sentences
+from news_index import tokenize
+from prompt_budget import count_tokens
+
+ARTICLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "summary_articles.jsonl")
+
+
+def load_articles(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def ngrams(text, n):
+    words = tokenize(text)
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def recall(candidate, references, n):
+    """Share of the highlights' n-grams that appear in `candidate`"""
+    wanted = set().union(*(ngrams(reference, n) for reference in references))
+    return len(wanted & ngrams(candidate, n)) / len(wanted) if wanted else 0.0
+
+
+def lead(text, max_tokens=None, max_sentences=None):
+    picked, used = [], 0
+    for sentence in split_sentences(text):
+        if max_sentences is not None and len(picked) >= max_sentences:
+            break
+        cost = count_tokens(sentence) + 1
+        if max_tokens is not None and used + cost > max_tokens:
+            break
+        picked.append(sentence)
+        used += cost
+    return " ".join(picked)
+
+
+def inputs(article, budget):
+    document = digest(article["text"], article["title"])
+    return {
+        "truncate": article["text"][:3000],
+        "lead": lead(article["text"], max_tokens=budget),
+        "extractive": document.select(budget),
+        "lead-3": lead(article["text"], max_sentences=3),
+        "preview": " ".join(document.preview(3)),
+    }
+
+
+def rank_ms(article, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        digest(article["text"], article["title"])
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+async def run_llm(articles, budget):
+    import main
+
+    rows = {"truncate": [], "extractive": []}
+    for article in articles:
+        texts = inputs(article, budget)
+        for name in rows:
+            messages = [
+                {"role": "system", "content": "You are an AI that provides comprehensive summaries of news articles."},
+                {"role": "user", "content": f"Please provide a comprehensive summary of this article:\n\n"
+                                            f"Title: {article['title']}\n\n{texts[name]}"},
+            ]
+            start = time.perf_counter()
+            response = await main.create_completion("summary", messages=messages, max_tokens=400)
+            summary = response.choices[0].message.content or ""
+            rows[name].append({
+                "seconds": time.perf_counter() - start,
+                "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
+                "rouge1": recall(summary, article["highlights"], 1),
+            })
+    print(f"\n{'model input':<12} {'latency s':>10} {'prompt tokens':>14} {'summary R1':>11}")
+    for name, results in rows.items():
+        print(f"{name:<12} {statistics.mean(r['seconds'] for r in results):>10.2f} "
+              f"{statistics.mean(r['prompt_tokens'] for r in results):>14.0f} "
+              f"{statistics.mean(r['rouge1'] for r in results):>11.0%}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Compare truncation and extractive selection for summaries")
+    parser.add_argument("--articles", default=ARTICLES)
+    parser.add_argument("--budget", type=int, default=int(os.getenv("SUMMARY_INPUT_TOKENS", "500")))
+    parser.add_argument("--repeat", type=int, default=20, help="ranking runs per article, best is kept")
+    parser.add_argument("--llm", action="store_true", help="also summarize both inputs with the model")
+    args = parser.parse_args()
+
+    articles = load_articles(args.articles)
+    rows = [inputs(article, args.budget) for article in articles]
+    print(f"{len(articles)} articles, {statistics.mean(count_tokens(a['text']) for a in articles):.0f} tokens on average,"
+          f" budget {args.budget} tokens")
+    print(f"\n{'input':<12} {'tokens':>7} {'R1 recall':>10} {'R2 recall':>10}")
+    for name in ("truncate", "lead", "extractive", "lead-3", "preview"):
+        tokens = statistics.mean(count_tokens(row[name]) for row in rows)
+        r1 = statistics.mean(recall(row[name], a["highlights"], 1) for row, a in zip(rows, articles))
+        r2 = statistics.mean(recall(row[name], a["highlights"], 2) for row, a in zip(rows, articles))
+        print(f"{name:<12} {tokens:>7.0f} {r1:>10.0%} {r2:>10.0%}")
+
+    # The first summary in a worker also pays for importing numpy
+    code = "import time; t = time.perf_counter(); import numpy; print(time.perf_counter() - t)"
+    numpy_ms = float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout) * 1000
+    times = [rank_ms(article, args.repeat) for article in articles]
+    print(f"\nranking: median {statistics.median(times):.2f} ms, max {max(times):.2f} ms per article "
+          f"(+{numpy_ms:.0f} ms once per worker to import numpy)")
+
+    if args.llm:
+        asyncio.run(run_llm(articles, args.budget))
+
+
+if __name__ == "__main__":
+    main_cli()
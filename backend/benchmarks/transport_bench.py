@@ -0,0 +1,110 @@
+#---------------DESCRIPTION🔌-----------------------------
+# Repeated scrapes of the same news domains: one client per scrape (the old
+# way) vs the shared pooled transport in http_pool.py.
+# Reports per-scrape latency and how many connections each mode opened.
+# By default the pages come from fake_upstreams.py on localhost, which only
+# shows the client-side cost (CA bundle loading, connection setup). Pass real
+# article URLs with --urls to include DNS and TLS handshakes over the network.
+
+#---------------GUIDELINES---------------------------------
+# 'cd backend' then 'py benchmarks/transport_bench.py'
+# Real sites: 'py benchmarks/transport_bench.py --urls urls.txt --rounds 3'
+#   (one URL per line; several from each domain shows the reuse best)
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import stubs  # noqa: F401  (puts backend/ on sys.path)
+from extractor import ArticleExtractor
+from http_pool import HttpPool
+from loadtest import BENCH_DIR, BACKEND_DIR, free_port, wait_until_up
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (transport benchmark)"}
+
+
+async def scrape_all(extractor, urls, rounds, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(url):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await extractor.fetch(url, headers=HEADERS)
+            except Exception as e:
+                print(f"  error {url}: {e}")
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(one(url) for url in urls))
+    return latencies, time.perf_counter() - started
+
+
+async def run(urls, rounds, concurrency):
+    results = {}
+
+    # Old behaviour: a fresh AsyncClient (and connection) per scrape
+    latencies, elapsed = await scrape_all(ArticleExtractor(), urls, rounds, concurrency)
+    results["per-call client"] = (latencies, elapsed, None)
+
+    pool = HttpPool()
+    pool.start()
+    try:
+        latencies, elapsed = await scrape_all(ArticleExtractor(http=pool), urls, rounds, concurrency)
+    finally:
+        await pool.close()
+    results["shared pool"] = (latencies, elapsed, pool.report())
+    return results
+
+
+def print_results(results, scrapes):
+    print(f"\n{'mode':<16} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'total s':>8} {'connections':>12}")
+    for mode, (latencies, elapsed, report) in results.items():
+        ordered = sorted(latencies)
+        p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+        connections = report["connections"] if report else scrapes
+        print(f"{mode:<16} {statistics.mean(ordered) * 1000:>9.1f} {statistics.median(ordered) * 1000:>9.1f} "
+              f"{p95 * 1000:>9.1f} {elapsed:>8.2f} {connections:>12}")
+    report = results["shared pool"][2]
+    print(f"\nshared pool: {report['reused']} of {report['requests']} requests reused a connection "
+          f"({report['reuse_ratio']:.0%}), {report['dns_lookups']} DNS lookups, {report['dns_hits']} cached")
+    old, new = (statistics.mean(results[m][0]) for m in ("per-call client", "shared pool"))
+    print(f"mean latency cut: {(old - new) * 1000:.1f} ms per scrape ({(old - new) / old:.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-call clients vs the shared HTTP transport")
+    parser.add_argument("--urls", help="file with one article URL per line (default: fake local pages)")
+    parser.add_argument("--pages", type=int, default=20, help="fake pages when no --urls is given")
+    parser.add_argument("--rounds", type=int, default=5, help="times every URL is scraped")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    process = None
+    if args.urls:
+        with open(args.urls, encoding="utf-8") as f:
+            urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        port = free_port()
+        process = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "fake_upstreams.py"), "--port", str(port),
+                                    "--page-latency", "fixed:0.005"], cwd=BACKEND_DIR)
+        wait_until_up(f"http://127.0.0.1:{port}/_stats", process)
+        urls = [f"http://127.0.0.1:{port}/articles/{n}" for n in range(args.pages)]
+
+    try:
+        results = asyncio.run(run(urls, args.rounds, args.concurrency))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print_results(results, len(urls) * args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#---------------DESCRIPTION⏱️-----------------------------
+# Per-request deadlines and tail-latency helpers (main.py)
+#  - deadline(seconds) starts a request's time budget in a contextvar, so every
+#    stage below it (NewsAPI, scraping, model calls) can ask remaining() how
+#    long it may take without the value being passed through every call
+#  - a stage that runs out of time falls back to a cheaper answer and calls
+#    degrade(reason); the reasons are returned to the client as "degraded"
+#  - hedged() starts a second copy of a slow call once the first one has run
+#    longer than usual (LatencyTracker's percentile); the first result wins
+# Tasks started inside a request copy its context, so they share its deadline;
+# section() gives one part of a request (an article of a batch) its own reasons.
+
+import asyncio
+import contextvars
+import time
+from collections import deque
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """A stage ran out of its share of the request's deadline"""
+
+    def __init__(self, stage):
+        super().__init__(f"{stage} ran past the request deadline")
+        self.stage = stage
+
+
+class Deadline:
+    __slots__ = ("expires_at", "degraded", "outer")
+
+    def __init__(self, seconds, outer=None):
+        self.expires_at = time.monotonic() + seconds
+        self.degraded = []
+        self.outer = outer
+
+    def remaining(self):
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+
+@contextmanager
+def deadline(seconds):
+    """Run the block with a deadline `seconds` from now; 0 or None means no deadline"""
+    if not seconds:
+        yield None
+        return
+    outer = _current.get()
+    budget = Deadline(seconds, outer)
+    if outer is not None:
+        # Nested: the tighter deadline wins
+        budget.expires_at = min(budget.expires_at, outer.expires_at)
+    with _scope(budget):
+        yield budget
+
+
+@contextmanager
+def section():
+    """Same deadline with its own degraded reasons (one article of a batch); they still reach the outer request"""
+    outer = _current.get()
+    if outer is None:
+        yield None
+        return
+    budget = Deadline(0, outer)
+    budget.expires_at = outer.expires_at
+    with _scope(budget):
+        yield budget
+
+
+@contextmanager
+def _scope(budget):
+    token = _current.set(budget)
+    try:
+        yield
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            pass  # An abandoned streaming response closed from another context
+
+
+def remaining(cap=None, reserve=0.0):
+    """Seconds the next stage may take: what is left minus `reserve` (kept for later stages), at most `cap`
+
+    None when there is no deadline and no cap.
+    """
+    budget = _current.get()
+    if budget is None:
+        return cap
+    left = max(budget.remaining() - reserve, 0.0)
+    return left if cap is None else min(left, cap)
+
+
+def degrade(reason):
+    """Record that the response is missing something because a stage ran out of time"""
+    budget = _current.get()
+    # Nested deadlines and sections report to every enclosing one
+    while budget is not None:
+        if reason not in budget.degraded:
+            budget.degraded.append(reason)
+        budget = budget.outer
+
+
+def degraded():
+    budget = _current.get()
+    return list(budget.degraded) if budget is not None else []
+
+
+class LatencyTracker:
+    """Recent latencies of one kind of call, to decide when a hedge is worth sending"""
+
+    def __init__(self, percentile=0.9, window=200, default=1.0, minimum=0.05, min_samples=20):
+        self.percentile = percentile
+        self.default = default
+        self.minimum = minimum
+        self.min_samples = min_samples
+        self.samples = deque(maxlen=window)
+        self.counters = {"calls": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0}
+
+    def observe(self, seconds):
+        self.samples.append(seconds)
+
+    def threshold(self):
+        """The configured percentile of recent latencies (`default` until there are enough samples)"""
+        if len(self.samples) < self.min_samples:
+            return self.default
+        ordered = sorted(self.samples)
+        return max(ordered[int(self.percentile * (len(ordered) - 1))], self.minimum)
+
+    def stats(self):
+        return {**self.counters, "samples": len(self.samples), "hedge_after": round(self.threshold(), 3)}
+
+
+async def hedged(attempt, tracker, timeout=None):
+    """Await attempt(), starting one more attempt if the first is slower than tracker.threshold()
+
+    Returns the first successful result. A first attempt that fails quickly is not
+    retried (a 404 stays a 404); if every attempt fails the last error is raised,
+    and asyncio.TimeoutError when `timeout` passes first.
+    """
+    loop = asyncio.get_running_loop()
+    end = None if timeout is None else loop.time() + timeout
+    delay = tracker.threshold()
+    tracker.counters["calls"] += 1
+
+    async def timed():
+        start = loop.time()
+        try:
+            result = await attempt()
+        except asyncio.CancelledError:
+            # A cancelled attempt took at least this long, which still says something about the tail
+            tracker.observe(loop.time() - start)
+            raise
+        tracker.observe(loop.time() - start)
+        return result
+
+    first = asyncio.ensure_future(timed())
+    pending, error, hedge = {first}, None, None
+    try:
+        while pending:
+            left = None if end is None else end - loop.time()
+            if left is not None and left <= 0:
+                tracker.counters["timeouts"] += 1
+                raise asyncio.TimeoutError()
+            wait = left if hedge is not None else (delay if left is None else min(delay, left))
+            done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        tracker.counters["hedge_wins"] += 1
+                    return task.result()
+                error = task.exception()
+            if not done and hedge is None and (end is None or end > loop.time()):
+                hedge = asyncio.ensure_future(timed())
+                pending.add(hedge)
+                tracker.counters["hedges"] += 1
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
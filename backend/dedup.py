@@ -0,0 +1,150 @@
+#---------------DESCRIPTION🧬-----------------------------
+# Near-duplicate detection for news articles (get_top_news in main.py)
+# NewsAPI often returns one wire story from several outlets with slightly
+# different titles. Articles whose title + description words overlap by at
+# least `threshold` (Jaccard) are the same story and are collapsed into the
+# first (highest ranked) one, which keeps every outlet in "sources".
+#  - each article gets a MinHash signature; its bands are the keys of an LSH
+#    index, so a lookup only compares against articles sharing a band
+#  - candidates are confirmed with the exact Jaccard of the word sets
+#    (headlines are short, so estimates alone are too noisy)
+#  - the index is kept across requests (LRU, max_entries), so a story keeps the
+#    same cluster id whichever search or request it turns up in
+
+import hashlib
+import struct
+from collections import OrderedDict
+
+from news_index import tokenize
+
+# Placeholders from get_top_news ("no-news", "error") are never merged
+PLACEHOLDER_IDS = ("no-news", "error")
+NO_DESCRIPTION = "No description available"
+# A 64 byte blake2b digest is 32 independent 16 bit hashes of a word, one per MinHash function
+NUM_HASHES = 32
+_unpack = struct.Struct(f"<{NUM_HASHES}H").unpack
+_word_hashes = {}
+
+
+def _word_hash(word):
+    value = _word_hashes.get(word)
+    if value is None:
+        if len(_word_hashes) > 100_000:
+            _word_hashes.clear()
+        value = _word_hashes[word] = _unpack(hashlib.blake2b(word.encode("utf-8"), digest_size=64).digest())
+    return value
+
+
+def strip_outlet(title, source):
+    """'Fed holds rates - Reuters' -> 'Fed holds rates' (NewsAPI appends the outlet to many titles)"""
+    head, sep, tail = (title or "").rpartition(" - ")
+    if sep and (tail.strip().lower() == (source or "").strip().lower() or len(tail.split()) <= 3):
+        return head
+    return title or ""
+
+
+def article_words(article):
+    """Set of title and description words, without the outlet suffix or placeholder text"""
+    source = article.get("source")
+    if isinstance(source, dict):
+        source = source.get("name")
+    description = article.get("description") or ""
+    if description == NO_DESCRIPTION:
+        description = ""
+    return frozenset(tokenize(strip_outlet(article.get("title"), source)) + tokenize(description))
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class DedupIndex:
+    """LSH index of recently seen articles, grouped into clusters of the same story"""
+
+    def __init__(self, threshold=0.5, bands=16, rows=2, max_entries=5000):
+        if bands * rows > NUM_HASHES:
+            raise ValueError(f"bands * rows can be at most {NUM_HASHES}")
+        self.threshold = threshold
+        # 16 bands of 2: two articles sharing half their words meet in some band 99% of the time
+        self.bands = bands
+        self.rows = rows
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (title, description) -> (words, band keys, cluster id)
+        self._buckets = [dict() for _ in range(bands)]  # band key -> set of entry keys
+        self.counters = {"articles": 0, "collapsed": 0, "clusters": 0, "evictions": 0}
+
+    def minhash(self, words):
+        if not words:
+            return (0,) * NUM_HASHES
+        return tuple(map(min, zip(*[_word_hash(word) for word in words])))
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows] for i in range(self.bands)]
+
+    def cluster_id(self, article):
+        """Stable id of the story `article` belongs to, registering it when new"""
+        key = (article.get("title"), article.get("description"))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry[2]
+
+        words = article_words(article)
+        band_keys = self._band_keys(self.minhash(words))
+        best, cluster = self.threshold, None
+        seen = set()
+        for band, band_key in enumerate(band_keys):
+            for other in self._buckets[band].get(band_key, ()):
+                if other in seen:
+                    continue
+                seen.add(other)
+                similarity = jaccard(words, self._entries[other][0])
+                if similarity >= best:
+                    best, cluster = similarity, self._entries[other][2]
+        if cluster is None:
+            cluster = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=8).hexdigest()
+            self.counters["clusters"] += 1
+
+        self._entries[key] = (words, band_keys, cluster)
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band].setdefault(band_key, set()).add(key)
+        self._evict()
+        return cluster
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            key, (_, band_keys, _) = self._entries.popitem(last=False)
+            for band, band_key in enumerate(band_keys):
+                bucket = self._buckets[band].get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band][band_key]
+            self.counters["evictions"] += 1
+
+    def collapse(self, articles):
+        """One article per story in rank order; each keeps the outlets of its duplicates in "sources"
+
+        Works on the article cards from format_articles (source is a name).
+        """
+        representatives = OrderedDict()
+        for article in articles:
+            if article.get("id") in PLACEHOLDER_IDS:
+                representatives[id(article)] = article
+                continue
+            self.counters["articles"] += 1
+            cluster = self.cluster_id(article)
+            # Already collapsed articles (e.g. from another search) bring their own sources along
+            sources = article.get("sources") or [article.get("source") or "Unknown"]
+            kept = representatives.get(cluster)
+            if kept is None:
+                representatives[cluster] = {**article, "sources": list(sources)}
+                continue
+            self.counters["collapsed"] += 1
+            kept["sources"].extend(source for source in sources if source not in kept["sources"])
+        return list(representatives.values())
+
+    def stats(self):
+        return {**self.counters, "entries": len(self._entries)}
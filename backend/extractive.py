@@ -0,0 +1,166 @@
+#---------------DESCRIPTION🪄-----------------------------
+# Extractive pre-summarization of scraped articles (main.py)
+# Instead of cutting the article text at 3000 characters, the text is split
+# into sentences and ranked with TextRank:
+#  - sentences are TF-IDF vectors, their cosine similarities the graph edges
+#  - PageRank over that graph, teleporting towards sentences that resemble the
+#    title and towards the lead (news puts the key facts first)
+#  - the best sentences are picked greedily within a token budget, skipping
+#    near-repeats, and put back in article order
+# The selection is what the model summarizes; the top few sentences double
+# as an instant preview that needs no model call (/api/summarize/preview).
+# numpy is imported on first use so workers start without it.
+
+import re
+from collections import OrderedDict
+
+from news_index import tokenize
+from prompt_budget import count_tokens
+
+# A sentence ends at . ! or ? (optionally followed by a quote or bracket) before a capital, digit or quote
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"'”’)\]]?\s+(?=[\"'“‘(\[]?[A-Z0-9])")
+# Abbreviations that end in a period without ending the sentence
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "gov", "sen", "rep", "gen", "lt", "col", "u.s",
+                 "u.k", "inc", "corp", "ltd", "co", "no", "vs", "jan", "feb", "mar", "apr", "aug", "sept", "oct",
+                 "nov", "dec", "a.m", "p.m", "e.g", "i.e"}
+# On top of news_index's stopwords: words every quote and sentence has, which would tie unrelated sentences together
+FILLER_WORDS = {"said", "says", "say", "told", "according", "also", "not", "but", "this", "these", "those", "there",
+                "we", "i", "you", "she", "they", "his", "her", "their", "our", "who", "which", "what", "have", "had",
+                "been", "would", "could", "can", "do", "does", "did", "more", "than", "about", "after", "into", "so",
+                "if", "one", "mr", "mrs", "ms", "just", "like", "over", "up", "out", "all", "no", "new"}
+# Page furniture the scraper picks up along with the article text
+BOILERPLATE = re.compile(r"^\W*(advertisement|photo|image|video|caption|related|read more|sign up|subscribe|share this|"
+                         r"cookies|accept all|manage preferences|click here|follow us)\b", re.IGNORECASE)
+MIN_SENTENCE_WORDS = 4
+DAMPING = 0.85
+# Sentences this similar to one already picked add nothing new
+MAX_OVERLAP = 0.7
+
+
+def split_sentences(text):
+    """Split article text into sentences, keeping abbreviations like 'Mr.' and 'U.S.' intact"""
+    sentences = []
+    for part in SENTENCE_END.split(" ".join((text or "").split())):
+        previous = sentences[-1] if sentences else ""
+        last_word = previous.rsplit(" ", 1)[-1].rstrip(".").lower()
+        if previous and (last_word in ABBREVIATIONS or len(last_word) == 1):
+            sentences[-1] = previous + " " + part
+        else:
+            sentences.append(part)
+    return [s for s in sentences if s]
+
+
+class Digest:
+    """Ranked sentences of one article"""
+
+    def __init__(self, sentences, scores, tokens, vectors):
+        self.sentences = sentences
+        self.scores = scores  # TextRank score per sentence
+        self.tokens = tokens  # token count per sentence
+        self.vectors = vectors  # unit TF-IDF rows, for the overlap check
+
+    @property
+    def total_tokens(self):
+        return sum(self.tokens)
+
+    def pick(self, max_tokens, max_sentences=None):
+        """Indexes of the best sentences fitting in `max_tokens`, in article order"""
+        chosen, used = [], 0
+        for i in sorted(range(len(self.sentences)), key=lambda i: -self.scores[i]):
+            if max_sentences is not None and len(chosen) >= max_sentences:
+                break
+            if self.scores[i] <= 0 or used + self.tokens[i] > max_tokens:
+                continue
+            if chosen and float((self.vectors[chosen] @ self.vectors[i]).max()) > MAX_OVERLAP:
+                continue
+            chosen.append(i)
+            used += self.tokens[i]
+        return sorted(chosen)
+
+    def select(self, max_tokens):
+        """The most informative sentences within `max_tokens`, as one text"""
+        if self.total_tokens <= max_tokens:
+            return " ".join(self.sentences)
+        return " ".join(self.sentences[i] for i in self.pick(max_tokens))
+
+    def preview(self, max_sentences=3, max_tokens=150):
+        return [self.sentences[i] for i in self.pick(max_tokens, max_sentences)]
+
+
+def rank(sentences, title=None):
+    """TextRank scores and unit TF-IDF vectors for `sentences`"""
+    import numpy as np
+
+    words = [[] if BOILERPLATE.match(s) else [t for t in tokenize(s) if t not in FILLER_WORDS] for s in sentences]
+    vocabulary = {}
+    rows, cols = [], []
+    for i, tokens in enumerate(words):
+        if len(tokens) < MIN_SENTENCE_WORDS:
+            continue  # Bylines, boilerplate and fragments of quotes
+        for token in tokens:
+            rows.append(i)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    n = len(sentences)
+    vectors = np.zeros((n, max(len(vocabulary), 1)), dtype=np.float32)
+    if not rows:
+        return np.zeros(n), vectors
+    np.add.at(vectors, (rows, cols), 1.0)
+    ranked = vectors.any(axis=1)
+    document_frequency = (vectors > 0).sum(axis=0)
+    vectors = np.log1p(vectors) * (np.log((1 + ranked.sum()) / (1 + document_frequency)) + 1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, out_weight, out=np.zeros_like(similarity), where=out_weight > 0)
+
+    # Teleport towards the lead and the sentences closest to the title
+    teleport = 1.0 / (1.0 + np.arange(n, dtype=np.float32))
+    title_cols = [vocabulary[t] for t in set(tokenize(title)) if t in vocabulary]
+    if title_cols:
+        teleport = teleport + vectors[:, title_cols].sum(axis=1)
+    teleport = teleport * ranked
+    teleport /= teleport.sum()
+
+    scores = teleport.copy()
+    dangling = out_weight[:, 0] == 0
+    for _ in range(50):
+        updated = (1 - DAMPING) * teleport + DAMPING * (transition.T @ scores + scores[dangling].sum() * teleport)
+        if np.abs(updated - scores).sum() < 1e-6:
+            scores = updated
+            break
+        scores = updated
+    return scores * ranked, vectors
+
+
+def digest(text, title=None):
+    """Split and rank an article's text"""
+    sentences = split_sentences(text)
+    scores, vectors = rank(sentences, title)
+    return Digest(sentences, scores.tolist(), [count_tokens(s) + 1 for s in sentences], vectors)
+
+
+class DigestCache:
+    """Recently ranked articles by URL, so a preview and the summary that follows scrape once"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, url):
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def put(self, url, value):
+        self._entries[url] = value
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
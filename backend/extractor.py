@@ -0,0 +1,257 @@
+#---------------DESCRIPTION📄-----------------------------
+# Streaming article text extraction for fetch_article_content (main.py)
+# The page is streamed into lxml's incremental HTML parser as it downloads.
+#  - at most max_bytes are read, however large the page is
+#  - paragraphs are grouped by their content container (article, main, *-content)
+#  - the download stops as soon as one container has enough text
+#  - which container holds the article is remembered per domain, either
+#    configured in a JSON rules file or learned from earlier pages
+#  - parsing runs on a few dedicated threads, never on the event loop; each
+#    page stays on one of them from start to finish, because lxml parsers and
+#    their elements must not move between threads
+
+import asyncio
+import itertools
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import httpx
+from lxml import etree
+
+# Class fragments that usually mark the article body (same ones the old BeautifulSoup selectors used)
+CONTENT_HINTS = ("article-content", "article-body", "post-content", "entry-content", "content-body", "story-body")
+TEXT_TAGS = {"p", "blockquote"}
+SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg"}
+MIN_PARAGRAPH_CHARS = 25
+MIN_ARTICLE_CHARS = 200
+
+
+def container_key(element):
+    """Name the nearest content container of `element`, e.g. 'article' or 'div.post-content'
+
+    Returns None for paragraphs inside navigation, headers, footers and sidebars.
+    """
+    for ancestor in element.iterancestors():
+        tag = ancestor.tag if isinstance(ancestor.tag, str) else ""
+        if tag in SKIP_TAGS:
+            return None
+        classes = (ancestor.get("class") or "").lower().split()
+        for cls in classes:
+            if any(hint in cls for hint in CONTENT_HINTS):
+                return f"{tag}.{cls}"
+        if tag in ("article", "main"):
+            return tag
+    return "body"
+
+
+def _timed(work, *args):
+    """Run work(*args[:-1]) and add its time to the stats dict passed last"""
+    stats = args[-1]
+    start = time.perf_counter()
+    try:
+        return work(*args[:-1])
+    finally:
+        stats["parse_seconds"] += time.perf_counter() - start
+
+
+class ExtractionSession:
+    """Incremental parse of one page, fed chunk by chunk"""
+
+    def __init__(self, rule=None, target_chars=3000, max_bytes=1_500_000, encoding=None):
+        self.rule = rule
+        self.target_chars = target_chars
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.buckets = {}
+        self._parser = etree.HTMLPullParser(events=("end",), encoding=encoding, recover=True)
+
+    def feed(self, chunk):
+        """Parse the next chunk, returns True once enough text has been collected"""
+        remaining = self.max_bytes - self.bytes_read
+        chunk = chunk[:remaining]
+        self.bytes_read += len(chunk)
+        self._parser.feed(chunk)
+        done = self._collect()
+        return done or self.bytes_read >= self.max_bytes
+
+    def _collect(self):
+        for _, element in self._parser.read_events():
+            tag = element.tag if isinstance(element.tag, str) else ""
+            if tag in SKIP_TAGS:
+                element.clear()
+                continue
+            if tag not in TEXT_TAGS:
+                continue
+
+            text = " ".join(element.xpath("string()").split())
+            key = container_key(element)
+            # Drop the paragraph and its already-read siblings to keep memory flat
+            element.clear()
+            parent = element.getparent()
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+
+            if key is None or len(text) < MIN_PARAGRAPH_CHARS:
+                continue
+            bucket = self.buckets.setdefault(key, [])
+            bucket.append(text)
+            if self._enough(key):
+                return True
+        return False
+
+    def _enough(self, key):
+        if self.rule is not None and key != self.rule:
+            return False
+        if self.rule is None and key == "body":
+            return False
+        return sum(len(t) + 1 for t in self.buckets[key]) >= self.target_chars
+
+    def finish(self):
+        """Return (text, container key) for the best container found"""
+        try:
+            self._parser.close()
+            self._collect()
+        except etree.LxmlError:
+            pass
+        # Free the parsed tree here, on the thread that built it
+        self._parser = None
+
+        def size(key):
+            return sum(len(t) for t in self.buckets.get(key, []))
+
+        if self.rule is not None and size(self.rule) >= MIN_ARTICLE_CHARS:
+            key = self.rule
+        else:
+            # Prefer the biggest named container, fall back to every paragraph on the page
+            named = sorted((k for k in self.buckets if k != "body"), key=size, reverse=True)
+            if not named or size(named[0]) < MIN_ARTICLE_CHARS:
+                text = " ".join(t for bucket in self.buckets.values() for t in bucket)
+                return (text[:self.target_chars] or None), None
+            key = named[0]
+
+        text = " ".join(self.buckets[key])
+        return text[:self.target_chars], key
+
+
+class ArticleExtractor:
+    """Fetch pages and extract article text, caching which container works per domain"""
+
+    def __init__(self, target_chars=3000, max_bytes=1_500_000, timeout=10, rules_path=None, max_learned=1000, http=None,
+                 on_fetch=None, parse_threads=2, parse_batch_bytes=65536):
+        self.target_chars = target_chars
+        # One single-thread executor per parse thread, pages are handed out round robin
+        self._parse_threads = [ThreadPoolExecutor(1, thread_name_prefix="lxml-parse") for _ in range(max(parse_threads, 1))]
+        self._next_thread = itertools.cycle(self._parse_threads)
+        # Downloaded bytes are parsed in batches of this size, each batch is one hop to the parse thread
+        self.parse_batch_bytes = parse_batch_bytes
+        # Called as on_fetch(url, stats) after every fetch, stats splits the time into parsing and network
+        self.on_fetch = on_fetch
+        # Shared http_pool.HttpPool, so repeat visits to a site reuse its connection
+        self.http = http
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_learned = max_learned
+        self.configured = {}
+        self.learned = OrderedDict()
+        if rules_path and os.path.exists(rules_path):
+            with open(rules_path, encoding="utf-8") as f:
+                self.configured = json.load(f)
+
+    @staticmethod
+    def domain(url):
+        host = (urlsplit(url).hostname or "").lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def rule_for(self, domain):
+        return self.configured.get(domain) or self.learned.get(domain)
+
+    def _learn(self, domain, key):
+        if key is None or domain in self.configured:
+            return
+        self.learned[domain] = key
+        self.learned.move_to_end(domain)
+        while len(self.learned) > self.max_learned:
+            self.learned.popitem(last=False)
+
+    def session(self, url, encoding=None):
+        return ExtractionSession(
+            rule=self.rule_for(self.domain(url)),
+            target_chars=self.target_chars,
+            max_bytes=self.max_bytes,
+            encoding=encoding,
+        )
+
+    def complete(self, url, session):
+        """Finish a session and remember which container held the article"""
+        return self.remember(url, *session.finish())
+
+    def remember(self, url, text, key):
+        if text and len(text) >= MIN_ARTICLE_CHARS:
+            self._learn(self.domain(url), key)
+        return text or None
+
+    def extract_html(self, html, url="", chunk_size=65536):
+        """Extract article text from an already downloaded page"""
+        session = self.session(url)
+        for start in range(0, len(html), chunk_size):
+            if session.feed(html[start:start + chunk_size]):
+                break
+        return self.complete(url, session)
+
+    async def fetch(self, url, headers=None, timeout=None):
+        """Stream `url` and extract its article text, reading no more than needed
+
+        `timeout` (seconds per connect/read) can lower the default, e.g. to fit a request deadline.
+        """
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        stats = {"status": None, "bytes": 0, "parse_seconds": 0.0, "stopped_early": False, "error": None}
+        start = time.perf_counter()
+        try:
+            if self.http is not None:
+                text, key = await self._stream(self.http.client, url, headers, timeout, stats)
+            else:
+                async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+                    text, key = await self._stream(client, url, headers, timeout, stats)
+            return self.remember(url, text, key)
+        except BaseException as e:
+            # Cancelled included, e.g. the slower copy of a hedged fetch
+            stats["error"] = type(e).__name__
+            raise
+        finally:
+            if self.on_fetch is not None:
+                stats["seconds"] = time.perf_counter() - start
+                self.on_fetch(url, stats)
+
+    async def _stream(self, client, url, headers, timeout, stats):
+        """Download and parse `url`, returns (text, container key)"""
+        loop = asyncio.get_running_loop()
+        thread = next(self._next_thread)
+        async with client.stream("GET", url, headers=headers, timeout=timeout) as response:
+            stats["status"] = response.status_code
+            response.raise_for_status()
+            # The rule is looked up here, the learned rules are only touched from the event loop
+            rule = self.rule_for(self.domain(url))
+            session = await loop.run_in_executor(
+                thread, ExtractionSession, rule, self.target_chars, self.max_bytes, response.charset_encoding
+            )
+            batch, batch_bytes = [], 0
+            async for chunk in response.aiter_bytes():
+                batch.append(chunk)
+                batch_bytes += len(chunk)
+                if batch_bytes < self.parse_batch_bytes:
+                    continue
+                done = await loop.run_in_executor(thread, _timed, session.feed, b"".join(batch), stats)
+                batch, batch_bytes = [], 0
+                stats["bytes"] = session.bytes_read
+                if done:
+                    stats["stopped_early"] = True
+                    break
+            else:
+                if batch:
+                    await loop.run_in_executor(thread, _timed, session.feed, b"".join(batch), stats)
+                    stats["bytes"] = session.bytes_read
+        return await loop.run_in_executor(thread, _timed, session.finish, stats)
@@ -0,0 +1,153 @@
+#---------------DESCRIPTION📰-----------------------------
+# Paginated headline feed behind /api/news (main.py)
+# Every feed (country, category) is kept as a snapshot of ready-to-send pages:
+# the JSON is encoded once per refresh, so a request is a dict lookup and an
+# ETag comparison, with no NewsAPI or model call.
+#  - a background job rebuilds the snapshots every refresh_interval seconds
+#  - the first request for a feed nobody asked for yet builds it once
+#    (concurrent requests share that build); at most max_feeds are kept
+#  - feeds that aren't configured stop being refreshed, and are dropped, once
+#    nobody has requested them for idle_expiry seconds
+#  - refreshes are skipped while skip_refresh() is true (NewsAPI quota low),
+#    the previous snapshots keep being served
+#  - each page has a strong ETag, a hash of its bytes, so unchanged headlines
+#    keep their ETag across refreshes and If-None-Match gets a 304
+
+import asyncio
+import hashlib
+import json
+import math
+import time
+
+
+class FeedPage:
+    __slots__ = ("body", "etag", "headers")
+
+    def __init__(self, body, cache_max_age):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.headers = {"ETag": self.etag, "Cache-Control": f"public, max-age={cache_max_age}"}
+
+
+class HeadlineFeed:
+    """In-memory snapshot of pre-encoded headline pages, refreshed in the background"""
+
+    def __init__(self, load, feeds=(), page_size=10, refresh_interval=300, max_feeds=64, cache_max_age=30,
+                 idle_expiry=3600, skip_refresh=None):
+        self.load = load  # async (country, category, background) -> list of article dicts
+        self.feeds = list(feeds)  # always kept fresh, others only once requested
+        self.page_size = page_size
+        self.refresh_interval = refresh_interval
+        self.max_feeds = max_feeds
+        self.cache_max_age = cache_max_age
+        self.idle_expiry = idle_expiry
+        self.skip_refresh = skip_refresh  # () -> bool, e.g. NewsCache.quota_low
+
+        self.snapshots = {}  # (country, category) -> [FeedPage, ...]
+        self.updated_at = {}
+        self.requested_at = {}
+        self._building = {}
+        self.counters = {"served": 0, "not_modified": 0, "builds": 0, "build_errors": 0,
+                         "expired": 0, "refreshes_skipped": 0}
+
+    def render(self, country, category, articles):
+        """Encode every page of a feed once"""
+        total = len(articles)
+        pages = max(math.ceil(total / self.page_size), 1)
+        return [
+            FeedPage(json.dumps({
+                "country": country,
+                "category": category,
+                "page": number,
+                "pages": pages,
+                "total": total,
+                "articles": articles[(number - 1) * self.page_size:number * self.page_size],
+            }, separators=(",", ":")).encode("utf-8"), self.cache_max_age)
+            for number in range(1, pages + 1)
+        ]
+
+    async def _build(self, key, background):
+        articles = await self.load(*key, background)
+        pages = self.render(*key, articles)
+        # Re-insert so the dict stays ordered by build time
+        self.snapshots.pop(key, None)
+        self.snapshots[key] = pages
+        self.updated_at[key] = time.time()
+        self.counters["builds"] += 1
+        # Forget the least recently built feed that isn't configured
+        while len(self.snapshots) > self.max_feeds:
+            extra = next((k for k in self.snapshots if k not in self.feeds), None)
+            if extra is None:
+                break
+            self._forget(extra)
+        return pages
+
+    def _forget(self, key):
+        self.snapshots.pop(key, None)
+        self.updated_at.pop(key, None)
+        self.requested_at.pop(key, None)
+
+    async def build(self, key, background=True):
+        """Rebuild one feed, sharing a build that is already running"""
+        task = self._building.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._build(key, background))
+            self._building[key] = task
+            task.add_done_callback(lambda _: self._building.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def page(self, country, category, number):
+        """The FeedPage for page `number`, or None when the feed has fewer pages"""
+        key = (country, category)
+        self.requested_at[key] = time.time()
+        pages = self.snapshots.get(key)
+        if pages is None:
+            # Someone is waiting on this one, so it isn't background work
+            pages = await self.build(key, background=False)
+        self.counters["served"] += 1
+        return pages[number - 1] if number <= len(pages) else None
+
+    def not_modified(self, if_none_match, etag):
+        """If-None-Match check (weak comparison, as RFC 9110 asks for GET)"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == etag:
+                self.counters["not_modified"] += 1
+                return True
+        return False
+
+    def expire_idle(self):
+        """Drop the feeds that aren't configured and weren't requested within idle_expiry seconds"""
+        cutoff = time.time() - self.idle_expiry
+        for key in [k for k in self.snapshots if k not in self.feeds and self.requested_at.get(k, 0) < cutoff]:
+            self._forget(key)
+            self.counters["expired"] += 1
+
+    async def refresh(self):
+        self.expire_idle()
+        if self.skip_refresh is not None and self.skip_refresh():
+            self.counters["refreshes_skipped"] += 1
+            return
+        for key in list(dict.fromkeys([*self.feeds, *self.snapshots])):
+            try:
+                await self.build(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep serving the previous snapshot
+                self.counters["build_errors"] += 1
+                print(f"Headline feed refresh error for {key}: {e}")
+
+    async def refresh_forever(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def stats(self):
+        return {
+            **self.counters,
+            "feeds": len(self.snapshots),
+            "oldest_seconds": round(time.time() - min(self.updated_at.values()), 1) if self.updated_at else None,
+        }
@@ -0,0 +1,182 @@
+#---------------DESCRIPTION🔌-----------------------------
+# One shared HTTP client for every outbound call that isn't the model:
+# NewsAPI (newsclient.py) and article scraping (extractor.py).
+#  - keep-alive connection pool, so repeat visits to a news site skip the
+#    TCP and TLS handshakes (and the CA bundle is only loaded once)
+#  - optional HTTP/2 when httpx[http2] is installed (pip install "httpx[http2]")
+#  - at most max_per_host requests in flight to any one host
+#  - DNS answers cached for dns_ttl seconds
+#  - counters for requests, new connections and DNS lookups
+# Started in the FastAPI lifespan and closed on shutdown (main.py).
+
+import asyncio
+import importlib.util
+import socket
+import time
+
+import httpcore
+import httpx
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that resolves each host once per TTL and counts new connections"""
+
+    def __init__(self, stats, ttl=300, inner=None):
+        self.stats = stats
+        self.ttl = ttl
+        self.inner = inner or httpcore.AnyIOBackend()
+        self._cache = {}
+
+    async def resolve(self, host, port):
+        entry = self._cache.get((host, port))
+        if entry is not None and entry[0] > time.monotonic():
+            self.stats["dns_hits"] += 1
+            return entry[1]
+        self.stats["dns_lookups"] += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.stats["connections"] += 1
+        # TLS still uses the original hostname for SNI and certificate checks (httpcore passes it separately)
+        addresses = await self.resolve(host, port)
+        for i, address in enumerate(addresses):
+            try:
+                return await self.inner.connect_tcp(address, port, timeout=timeout, local_address=local_address,
+                                                    socket_options=socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout):
+                if i == len(addresses) - 1:
+                    # Maybe the host moved, look it up again next time
+                    self._cache.pop((host, port), None)
+                    raise
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self.inner.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds):
+        await self.inner.sleep(seconds)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its host slot once the body is closed"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            # Closing twice must not hand out a second slot
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """httpx transport with a DNS-caching connection pool and per-host concurrency caps"""
+
+    def __init__(self, stats, max_connections=100, max_keepalive=20, keepalive_expiry=30, max_per_host=6,
+                 http2=False, dns_ttl=300, verify=True):
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                              keepalive_expiry=keepalive_expiry)
+        # Loading the CA bundle is the slow part, build the context once for both pools
+        # (httpcore sets the ALPN protocols for HTTP/2 on it per connection)
+        ssl_context = httpx.create_ssl_context(verify=verify)
+        super().__init__(verify=ssl_context, limits=limits, http2=http2)
+        # httpx doesn't take a network backend, so swap in a pool built with ours
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=ssl_context,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=CachingDNSBackend(stats, ttl=dns_ttl),
+        )
+        self.stats = stats
+        self.max_per_host = max_per_host
+        self._hosts = {}  # host -> [semaphore, requests holding or waiting for one of its slots]
+
+    def _leave(self, host, slot, acquired=True):
+        if acquired:
+            slot[0].release()
+        slot[1] -= 1
+        # Article links reach an unbounded set of sites, forget a host once nobody is using it
+        if slot[1] == 0 and self._hosts.get(host) is slot:
+            del self._hosts[host]
+
+    async def handle_async_request(self, request):
+        host = request.url.host
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = [asyncio.Semaphore(self.max_per_host), 0]
+        slot[1] += 1
+        if slot[0].locked():
+            self.stats["host_waits"] += 1
+        try:
+            await slot[0].acquire()
+        except BaseException:
+            self._leave(host, slot, acquired=False)
+            raise
+        self.stats["requests"] += 1
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self._leave(host, slot)
+            raise
+        response.stream = _ReleasingStream(response.stream, lambda: self._leave(host, slot))
+        return response
+
+
+class HttpPool:
+    """Owns the shared AsyncClient; created on startup (or first use) and closed on shutdown"""
+
+    def __init__(self, timeout=10, max_connections=100, max_keepalive=20, keepalive_expiry=30, max_per_host=6,
+                 http2=False, dns_ttl=300):
+        self.timeout = timeout
+        self.options = {
+            "max_connections": max_connections,
+            "max_keepalive": max_keepalive,
+            "keepalive_expiry": keepalive_expiry,
+            "max_per_host": max_per_host,
+            # HTTP/2 needs the optional 'h2' package
+            "http2": http2 and importlib.util.find_spec("h2") is not None,
+            "dns_ttl": dns_ttl,
+        }
+        self.stats = {"requests": 0, "connections": 0, "dns_lookups": 0, "dns_hits": 0, "host_waits": 0}
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self.start()
+        return self._client
+
+    def start(self):
+        if self._client is None:
+            transport = PooledTransport(self.stats, **self.options)
+            self._client = httpx.AsyncClient(transport=transport, timeout=self.timeout, follow_redirects=True)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def report(self):
+        requests = self.stats["requests"]
+        reused = max(requests - self.stats["connections"], 0)
+        return {
+            **self.stats,
+            "reused": reused,
+            "reuse_ratio": round(reused / requests, 4) if requests else 0.0,
+            "http2": self.options["http2"],
+        }
@@ -0,0 +1,185 @@
+#---------------DESCRIPTION🧭-----------------------------
+# Local intent router for /api/chat (main.py)
+# Obvious news requests ("sports news in the uk", "news about climate change")
+# are turned into get_top_news arguments with a few dictionary lookups, so the
+# tool-selection completion can be skipped. Anything that looks like a
+# follow-up, a question, a negation ("no sports news") or an ambiguous request
+# gets no route, and the model picks the tool call as before.
+
+import re
+
+# Words that make a message a request for news
+NEWS_WORDS = {"news", "headlines", "headline", "stories", "articles", "updates", "breaking"}
+
+# Signs the message is about earlier results or asks for an explanation instead of news
+FOLLOW_UP = re.compile(
+    r"\b(why|how|explain|summari[sz]e|summary|meaning|mean|tell me more|more about (it|this|that)|"
+    r"first one|second one|third one|last one|that article|this article|these articles|those articles|"
+    r"the article|you (said|found|showed))\b"
+)
+
+# Negated requests ("I don't want sports news", "not tech, show me health"): the categories or
+# places mentioned are the ones to leave out, which only the model can sort out
+NEGATION = re.compile(
+    r"\b(don'?t|do not|doesn'?t|does not|not|no|never|nothing|without|except|excluding|exclude|skip|"
+    r"instead of|anything but|other than|rather than|apart from|besides)\b"
+)
+
+# Category synonyms; the categories themselves come from the tools schema
+CATEGORY_WORDS = {
+    "business": ["business", "finance", "financial", "economy", "economic", "markets", "stock market"],
+    "entertainment": ["entertainment", "celebrity", "celebrities", "showbiz", "movies", "film", "music", "hollywood"],
+    "general": ["general", "world"],
+    "health": ["health", "medical", "medicine", "healthcare"],
+    "science": ["science", "scientific", "space"],
+    "sports": ["sports", "sport", "football", "soccer", "cricket", "basketball", "nba", "nfl", "tennis"],
+    "technology": ["technology", "tech", "gadgets", "software"],
+}
+
+# Country names and adjectives -> NewsAPI country code
+COUNTRY_NAMES = {
+    "united states": "us", "united states of america": "us", "usa": "us", "america": "us", "american": "us",
+    "united kingdom": "gb", "uk": "gb", "britain": "gb", "great britain": "gb", "british": "gb", "england": "gb",
+    "malaysia": "my", "malaysian": "my", "singapore": "sg", "indonesia": "id", "indonesian": "id",
+    "philippines": "ph", "thailand": "th", "thai": "th", "india": "in", "indian": "in", "china": "cn",
+    "chinese": "cn", "japan": "jp", "japanese": "jp", "korea": "kr", "south korea": "kr", "korean": "kr",
+    "taiwan": "tw", "hong kong": "hk", "australia": "au", "australian": "au", "new zealand": "nz",
+    "canada": "ca", "canadian": "ca", "mexico": "mx", "mexican": "mx", "brazil": "br", "brazilian": "br",
+    "argentina": "ar", "colombia": "co", "venezuela": "ve", "cuba": "cu", "germany": "de", "german": "de",
+    "france": "fr", "french": "fr", "italy": "it", "italian": "it", "spain": "es", "spanish": "es",
+    "portugal": "pt", "netherlands": "nl", "dutch": "nl", "belgium": "be", "switzerland": "ch",
+    "swiss": "ch", "austria": "at", "sweden": "se", "swedish": "se", "norway": "no", "norwegian": "no",
+    "poland": "pl", "polish": "pl", "ireland": "ie", "irish": "ie", "greece": "gr", "greek": "gr",
+    "czech republic": "cz", "hungary": "hu", "romania": "ro", "bulgaria": "bg", "serbia": "rs",
+    "slovakia": "sk", "slovenia": "si", "latvia": "lv", "lithuania": "lt", "ukraine": "ua",
+    "ukrainian": "ua", "russia": "ru", "russian": "ru", "turkey": "tr", "turkish": "tr", "israel": "il",
+    "egypt": "eg", "morocco": "ma", "nigeria": "ng", "nigerian": "ng", "south africa": "za",
+    "saudi arabia": "sa", "saudi": "sa", "uae": "ae", "united arab emirates": "ae",
+}
+
+# Two-letter codes that are also English words only count as countries after "the" ("in the us")
+# or when written in capitals ("news in MY"), never in "news in my country"
+AMBIGUOUS_CODES = {"us", "my", "in", "it", "at", "be", "no", "is", "id", "co", "ma", "ch", "sa", "ae"}
+
+# A place only the model can resolve (or ask about): "news in my country", "local news"
+UNKNOWN_PLACE = re.compile(
+    r"\b(my|our|your|their|this|home|local)\s+(country|region|area|city|state|town|nation)\b|"
+    r"\bnear (me|here)\b|\blocal (news|headlines)\b|\bnews (around )?here\b"
+)
+
+# Search phrases made only of these refer to something earlier in the conversation ("news on it")
+PRONOUNS = {"it", "its", "this", "that", "these", "those", "them", "they", "he", "him", "his", "she", "her",
+            "there", "one", "ones", "same"}
+
+# Joined entities ("israel and iran") need separate searches or a comparison, the model splits them
+CONJUNCTION = re.compile(r"\b(and|or|vs|versus|plus|between|as well as)\b|&")
+
+# "news about X", "headlines on X", "anything regarding X"
+QUERY_PATTERN = re.compile(r"\b(?:about|on|regarding|concerning|related to|for)\s+(?P<query>.+)$")
+FILLER = re.compile(r"\b(the|latest|recent|today'?s?|current|some|any|me|please|news|headlines|stories|articles|updates)\b")
+
+
+def _phrase_pattern(phrases, prefix=""):
+    ordered = sorted(phrases, key=len, reverse=True)
+    return re.compile(prefix + r"\b(" + "|".join(re.escape(p) for p in ordered) + r")\b")
+
+
+class RouteResult:
+    def __init__(self, calls, confidence):
+        self.calls = calls  # list of get_top_news argument dicts
+        self.confidence = confidence
+
+
+class IntentRouter:
+    """Map news requests to get_top_news arguments without a model call"""
+
+    def __init__(self, tool_schema, default_country="us", max_calls=3):
+        parameters = tool_schema["function"]["parameters"]["properties"]
+        self.categories = parameters["category"]["enum"]
+        self.default_country = default_country
+        self.max_calls = max_calls
+        self.category_of = {}
+        for category in self.categories:
+            self.category_of[category] = category
+            for word in CATEGORY_WORDS.get(category, []):
+                self.category_of[word] = category
+        self.country_codes = set(COUNTRY_NAMES.values())
+        self._categories = _phrase_pattern(self.category_of)
+        self._countries = _phrase_pattern(COUNTRY_NAMES)
+        self._places = _phrase_pattern(COUNTRY_NAMES, prefix=r"(?:\b(?:in|from)\s+(?:the\s+)?)?")
+        self._codes = re.compile(r"(?:\b(in|from)\s+)?(?:\b(the)\s+)?\b([a-z]{2})\b")
+
+    def _code_mentions(self, text, message=""):
+        """Country code matches in `text`; ambiguous ones need "the" before them or capitals in `message`"""
+        shouting = message.isupper()
+        for m in self._codes.finditer(text):
+            code = m.group(3)
+            if code not in self.country_codes:
+                continue
+            if code in AMBIGUOUS_CODES and not m.group(2) and (shouting or not re.search(rf"\b{code.upper()}\b", message)):
+                continue
+            yield m
+
+    def countries(self, text, message=""):
+        found = [COUNTRY_NAMES[m.group(1)] for m in self._countries.finditer(text)]
+        found += [m.group(3) for m in self._code_mentions(text, message)]
+        return list(dict.fromkeys(found))
+
+    def strip_places(self, text, message="", keep_names=False):
+        """Remove places with their "in"/"from the"; keep_names leaves the bare name: 'news in the uk' -> 'news uk'"""
+        text = self._places.sub(lambda m: f" {m.group(1)} " if keep_names else " ", text)
+        for m in reversed(list(self._code_mentions(text, message))):
+            if m.group(1) or m.group(2):
+                text = text[:m.start()] + (f" {m.group(3)} " if keep_names else " ") + text[m.end():]
+        return text
+
+    def place_names(self, text, message=""):
+        found = [(m.start(), m.group(1)) for m in self._countries.finditer(text)]
+        found += [(m.start(3), m.group(3)) for m in self._code_mentions(text, message)]
+        return list(dict.fromkeys(name for _, name in sorted(found)))
+
+    def _clean_query(self, match):
+        return " ".join(FILLER.sub(" ", match.group("query")).split()).strip(" .")
+
+    def route(self, message):
+        """Return a RouteResult, or None when the model should decide"""
+        text = " ".join(message.lower().replace("’", "'").replace("?", " ").replace("!", " ").replace(",", " ").split())
+        words = set(text.replace(".", " ").split())
+        if not words & NEWS_WORDS or FOLLOW_UP.search(text) or NEGATION.search(text) or UNKNOWN_PLACE.search(text):
+            return None
+
+        countries = self.countries(text, message)
+        if len(countries) > 1:
+            return None
+        country = countries[0] if countries else self.default_country
+
+        # "news about X" is a keyword search, unless X is just a category or a place
+        query = None
+        match = QUERY_PATTERN.search(self.strip_places(text, message))
+        if match:
+            candidate = self._clean_query(match)
+            if candidate and not self._categories.fullmatch(candidate):
+                if set(candidate.split()) <= PRONOUNS or CONJUNCTION.search(candidate):
+                    return None
+                # Keyword searches ignore the location, so the place has to stay in the query
+                query = self._clean_query(QUERY_PATTERN.search(self.strip_places(text, message, keep_names=True)))
+                query = " ".join([query, *(p for p in self.place_names(text, message) if p not in query.split())])
+
+        categories = list(dict.fromkeys(self.category_of[m.group(1)] for m in self._categories.finditer(text)))
+        if query:
+            # Category words inside the search phrase belong to the query
+            calls = [{"location": country, "query": query}]
+        elif categories:
+            calls = [{"location": country, "category": c} for c in categories[:self.max_calls]]
+        else:
+            calls = [{"location": country}]
+
+        # Plain requests score high; long or country-less messages leave more room for nuance
+        confidence = 0.6
+        if query or categories or countries:
+            confidence += 0.3
+        if len(words) > 12:
+            confidence -= 0.3
+        if query and len(query.split()) > 5:
+            confidence -= 0.2
+        return RouteResult(calls, round(confidence, 2))
@@ -1,37 +1,76 @@
 #---------------DESCRIPTION🛠️-----------------------------
 # FastAPI backend for AI News Chatbot
 # Integrates Azure OpenAI with News API
-# Run with: python main.py
+# Run with: python main.py (add --workers N for production, see the bottom of this file)
 
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
+from typing import Literal, Optional
 from dotenv import load_dotenv
 import os
 import json
-from openai import AzureOpenAI
-from newsapi import NewsApiClient
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import time
+import uuid
+import logging
+import threading
+import secrets
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from newsclient import AsyncNewsApiClient, NewsAPIError, NEWS_API_URL
+from http_pool import HttpPool
+from news_cache import NewsCache
+from shared_cache import SharedCache
+from headline_feed import HeadlineFeed
+from dedup import DedupIndex
+from summary_store import SummaryStore
+from news_index import NewsIndex
+from extractor import ArticleExtractor
+from extractive import DigestCache, digest
+import deadlines
+from deadlines import DeadlineExceeded, LatencyTracker
+import profiler
+from profiler import SamplingProfiler, SlowRequestLog, SlowRequestMiddleware
+from metrics import Metrics
+from session_store import SessionStore
+from intent_router import COUNTRY_NAMES, IntentRouter
+from prefetch import SummaryPrefetcher
+from scheduler import Scheduler, RateLimited
+from prompt_budget import fit_messages, messages_tokens, count_tokens, project_articles, token_counter
 
 # Load environment variables
 load_dotenv()
 
-# Create FastAPI instance
-app = FastAPI(
-    title="AI News Chatbot API",
-    description="Backend API for AI News Chatbot application with Azure OpenAI integration",
-    version="1.0.0"
-)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger("chatbot")
+# httpx logs every upstream request at INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[os.getenv("FRONTEND_URL", "http://localhost:3000")],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(app):
+    """Start background jobs on startup and stop them on shutdown"""
+    logger.info("Prompt budget: counting tokens with %s", token_counter())
+    http_pool.start()
+    background = []
+    if llm_client_warmup:
+        # Import openai and build its client off the event loop, after the worker is already serving
+        background.append(asyncio.create_task(asyncio.to_thread(llm_client)))
+    if news_ingest_enabled:
+        background.append(asyncio.create_task(ingest_forever()))
+    await asyncio.to_thread(session_store.prune_spill)
+    summary_prefetcher.start()
+    background.append(asyncio.create_task(headline_feed.refresh_forever()))
+    yield
+    await summary_prefetcher.stop()
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await http_pool.close()
+
+# Endpoints are collected here and mounted by create_app() at the bottom of the file
+router = APIRouter()
 
 # Initialize AI and News clients
 env_endpoint = os.getenv("ENDPOINT")
@@ -40,74 +79,335 @@ env_api_version = os.getenv("API_VERSION")
 env_base_model = os.getenv("MODEL_NAME")
 env_news_api_key = os.getenv("NEWS_API_KEY")
 
-news_client = NewsApiClient(api_key=env_news_api_key)
-openai_client = AzureOpenAI(
-    azure_endpoint=env_endpoint,
-    api_key=env_api_key,
-    api_version=env_api_version,
+# Worker processes serving this app (set by `python main.py --workers N` or the process manager)
+web_concurrency = max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+
+# Shared keep-alive connections for NewsAPI and article scraping (the model client has its own)
+http_pool = HttpPool(
+    timeout=float(os.getenv("HTTP_TIMEOUT", "10")),
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+    max_keepalive=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+    max_per_host=int(os.getenv("HTTP_MAX_PER_HOST", "6")),
+    http2=os.getenv("HTTP2_ENABLED", "False").lower() == "true",
+    dns_ttl=int(os.getenv("DNS_CACHE_TTL", "300")),
+)
+
+news_client = AsyncNewsApiClient(api_key=env_news_api_key, base_url=os.getenv("NEWS_API_URL", NEWS_API_URL), http=http_pool)
+
+# Importing openai takes longer than everything else here together, so the client is built on first use
+openai_client = None
+openai_client_lock = threading.Lock()
+# Build it in the background on startup so the first chat doesn't wait for the import
+llm_client_warmup = os.getenv("LLM_CLIENT_WARMUP", "True").lower() == "true"
+
+def llm_client():
+    """The Azure OpenAI client, created on first use (or by the warm-up on startup)"""
+    global openai_client
+    if openai_client is None:
+        with openai_client_lock:
+            if openai_client is None:
+                from openai import AsyncAzureOpenAI
+                openai_client = AsyncAzureOpenAI(
+                    azure_endpoint=env_endpoint,
+                    api_key=env_api_key,
+                    api_version=env_api_version,
+                )
+    return openai_client
+
+# One SQLite file shared by all workers on this host, so extra workers don't mean extra NewsAPI calls
+shared_cache = SharedCache(
+    path=os.getenv("SHARED_CACHE_PATH", "shared_cache.db"),
+) if os.getenv("SHARED_CACHE_ENABLED", "True").lower() == "true" else None
+
+# Cache headlines in front of NewsAPI (free tier allows 100 requests/day)
+news_cache = NewsCache(
+    max_entries=int(os.getenv("NEWS_CACHE_MAX_ENTRIES", "256")),
+    headlines_ttl=int(os.getenv("NEWS_CACHE_HEADLINES_TTL", "600")),
+    query_ttl=int(os.getenv("NEWS_CACHE_QUERY_TTL", "1800")),
+    daily_quota=int(os.getenv("NEWS_API_DAILY_QUOTA", "100")),
+    quota_reserve=int(os.getenv("NEWS_API_QUOTA_RESERVE", "10")),
+    shared=shared_cache,
+)
+
+# Outbound rate limits: NewsAPI requests/day, Azure OpenAI requests and tokens/minute
+scheduler = Scheduler(max_wait={
+    "interactive": float(os.getenv("SCHEDULER_MAX_WAIT_INTERACTIVE", "3")),
+    "summary": float(os.getenv("SCHEDULER_MAX_WAIT_SUMMARY", "10")),
+    "background": float(os.getenv("SCHEDULER_MAX_WAIT_BACKGROUND", "60")),
+})
+# Each worker has its own buckets, so every worker gets an equal share of the limits
+# Spread the daily allowance out instead of letting a burst spend it in minutes
+scheduler.register("newsapi", "requests", int(os.getenv("NEWS_API_DAILY_QUOTA", "100")) / web_concurrency, 86400,
+                   burst=max(int(os.getenv("NEWS_API_BURST", "20")) // web_concurrency, 1))
+# 0 means no limit; set these to the deployment's quota
+scheduler.register("azure_openai", "requests", int(os.getenv("AZURE_OPENAI_RPM", "0")) / web_concurrency, 60)
+scheduler.register("azure_openai", "tokens", int(os.getenv("AZURE_OPENAI_TPM", "0")) / web_concurrency, 60)
+
+# Persist article summaries on disk, shared by all workers on this host
+summary_store = SummaryStore(
+    path=os.getenv("SUMMARY_CACHE_PATH", "summary_cache.db"),
+    max_entries=int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000")),
+    max_bytes=int(os.getenv("SUMMARY_CACHE_MAX_BYTES", "50000000")),
+    max_age=int(os.getenv("SUMMARY_CACHE_MAX_AGE", "604800")),
+    url_fresh_seconds=int(os.getenv("SUMMARY_CACHE_URL_FRESH", "3600")),
+)
+
+# Local headline index, filled by the background ingest job and searched before NewsAPI
+def open_news_index(repair):
+    return NewsIndex(
+        directory=os.getenv("NEWS_INDEX_DIR", "news_index"),
+        max_age_hours=int(os.getenv("NEWS_INDEX_MAX_AGE_HOURS", "48")),
+        repair=repair,
+    )
+
+# With several workers only the ingest leader writes to the index (and repairs it first)
+news_index = open_news_index(repair=web_concurrency == 1)
+news_index_min_hits = int(os.getenv("NEWS_INDEX_MIN_HITS", "3"))
+news_index_feed_max_age = int(os.getenv("NEWS_INDEX_FEED_MAX_AGE", "14400"))
+news_ingest_enabled = os.getenv("NEWS_INGEST_ENABLED", "False").lower() == "true"
+news_ingest_countries = [c.strip() for c in os.getenv("NEWS_INGEST_COUNTRIES", "us").split(",") if c.strip()]
+# "top" means the plain country headlines without a category
+news_ingest_categories = [c.strip() for c in os.getenv("NEWS_INGEST_CATEGORIES", "top,technology,business").split(",") if c.strip()]
+news_ingest_interval = int(os.getenv("NEWS_INGEST_INTERVAL", "10800"))
+# How often the other workers check for what the ingest leader wrote
+news_index_refresh = int(os.getenv("NEWS_INDEX_REFRESH", "60"))
+
+# /api/news: headline pages kept pre-encoded in memory and rebuilt in the background
+def parse_feeds(countries, categories):
+    return [(country.strip().lower(), None if category.strip() == "top" else category.strip().lower())
+            for country in countries.split(",") if country.strip()
+            for category in categories.split(",") if category.strip()]
+
+async def load_headline_feed(country, category, background=True):
+    """Articles for one /api/news feed: the ingested index first, otherwise NewsAPI through the news cache"""
+    articles = lookup_local_news(country, category)
+    if articles is None:
+        async def fetch():
+            payload = await fetch_news_api(country, category, page_size=news_feed_fetch_size,
+                                           priority="background" if background else "interactive")
+            return payload.get("articles", [])
+        # Own cache key: these are raw NewsAPI articles, not get_top_news results
+        articles = await news_cache.get_or_fetch(("feed", country, category), fetch, ttl=news_feed_ttl)
+    return collapse_duplicates(format_articles(country, [a for a in articles if a.get("title") and a.get("title") != "[Removed]"]))
+
+headline_feed = HeadlineFeed(
+    load_headline_feed,
+    # Without NEWS_INGEST_ENABLED every feed costs one NewsAPI request per NEWS_FEED_TTL
+    feeds=parse_feeds(os.getenv("NEWS_FEED_COUNTRIES", "us"), os.getenv("NEWS_FEED_CATEGORIES", "top")),
+    page_size=int(os.getenv("NEWS_FEED_PAGE_SIZE", "10")),
+    refresh_interval=int(os.getenv("NEWS_FEED_REFRESH", "300")),
+    max_feeds=int(os.getenv("NEWS_FEED_MAX_FEEDS", "64")),
+    cache_max_age=int(os.getenv("NEWS_FEED_CACHE_MAX_AGE", "30")),
+    idle_expiry=int(os.getenv("NEWS_FEED_IDLE_EXPIRY", "3600")),
+    # Leave the last NewsAPI requests of the day for interactive users
+    skip_refresh=news_cache.quota_low,
+)
+news_feed_ttl = int(os.getenv("NEWS_FEED_TTL", "3600"))
+# /api/news only builds feeds for these, any other code would cost NewsAPI requests for nothing
+news_feed_countries = set(COUNTRY_NAMES.values()) | {country for country, _ in headline_feed.feeds} | set(news_ingest_countries)
+news_feed_fetch_size = int(os.getenv("NEWS_FEED_FETCH_SIZE", "40"))
+
+def record_scrape(url, stats):
+    """Add a page fetch to the slow-request trace, its lxml parse time apart from the network time"""
+    profiler.record_call(
+        "scrape", stats["seconds"],
+        host=ArticleExtractor.domain(url),
+        status=stats["status"],
+        bytes=stats["bytes"],
+        parse_ms=round(stats["parse_seconds"] * 1000, 1),
+        network_ms=round((stats["seconds"] - stats["parse_seconds"]) * 1000, 1),
+        stopped_early=stats["stopped_early"],
+        error=stats["error"],
+    )
+
+# Article scraping: byte cap, text target and optional per-domain container rules
+article_extractor = ArticleExtractor(
+    target_chars=int(os.getenv("SCRAPE_TARGET_CHARS", "12000")),
+    max_bytes=int(os.getenv("SCRAPE_MAX_BYTES", "1500000")),
+    timeout=float(os.getenv("SCRAPE_TIMEOUT", "10")),
+    rules_path=os.getenv("SCRAPE_RULES_PATH"),
+    parse_threads=int(os.getenv("SCRAPE_PARSE_THREADS", "2")),
+    http=http_pool,
+    on_fetch=record_scrape,
+)
+
+# Deadlines: each request gets a time budget that every stage draws from (deadlines.py), 0 turns one off
+# A stage that runs out of time falls back to a cheaper answer and the response lists it under "degraded"
+chat_deadline = float(os.getenv("CHAT_DEADLINE", "8"))
+summary_deadline = float(os.getenv("SUMMARY_DEADLINE", "10"))
+preview_deadline = float(os.getenv("PREVIEW_DEADLINE", "5"))
+# Model calls outside a request (prefetch, ingest) still give up after LLM_TIMEOUT seconds
+llm_timeout = float(os.getenv("LLM_TIMEOUT", "30"))
+# Scraping stops this long before the summary deadline so the model still has time for the title/description path
+summary_model_reserve = float(os.getenv("SUMMARY_MODEL_RESERVE", "5"))
+# A second scrape of the same page starts once the first is slower than this percentile of recent scrapes
+scrape_hedge_enabled = os.getenv("SCRAPE_HEDGE_ENABLED", "True").lower() == "true"
+scrape_latency = LatencyTracker(
+    percentile=float(os.getenv("SCRAPE_HEDGE_PERCENTILE", "0.9")),
+    default=float(os.getenv("SCRAPE_HEDGE_AFTER", "2")),
+)
+
+# Summaries read the article's most informative sentences (extractive.py) instead of its first 3000 characters
+summary_input_tokens = int(os.getenv("SUMMARY_INPUT_TOKENS", "500"))
+summary_preview_sentences = int(os.getenv("SUMMARY_PREVIEW_SENTENCES", "3"))
+article_digests = DigestCache(max_entries=int(os.getenv("ARTICLE_DIGEST_CACHE", "256")))
+article_digests_inflight = {}  # url -> task scraping and digesting it
+
+# How news turns acknowledge the articles: "llm" (short model call) or "template" (no model call)
+chat_ack_mode = os.getenv("CHAT_ACK_MODE", "llm")
+
+# Parallel tool calls: how many run at once and how many merged articles are returned
+tool_call_concurrency = int(os.getenv("TOOL_CALL_CONCURRENCY", "4"))
+max_merged_articles = int(os.getenv("MAX_MERGED_ARTICLES", "10"))
+
+# Near-duplicates: one wire story from several outlets becomes one article listing every source
+dedup_enabled = os.getenv("DEDUP_ENABLED", "True").lower() == "true"
+dedup_index = DedupIndex(
+    threshold=float(os.getenv("DEDUP_THRESHOLD", "0.5")),
+    max_entries=int(os.getenv("DEDUP_MAX_ENTRIES", "5000")),
 )
 
+# Prompt size: token budget for each chat call and how much of each article description the model sees
+chat_prompt_budget = int(os.getenv("CHAT_PROMPT_BUDGET", "2000"))
+tool_description_chars = int(os.getenv("TOOL_DESCRIPTION_CHARS", "200"))
+
+# Conversation history kept on the server, keyed by the session id returned to the client
+# With several workers every turn is written to the spill folder so any worker can continue a session
+session_shared = (os.getenv("SESSION_SHARED") or str(web_concurrency > 1)).lower() == "true"
+session_store = SessionStore(
+    max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "1000")),
+    max_bytes=int(os.getenv("SESSION_MAX_BYTES", "20000000")),
+    idle_ttl=int(os.getenv("SESSION_IDLE_TTL", "3600")),
+    max_messages=int(os.getenv("SESSION_MAX_MESSAGES", "20")),
+    spill_dir=os.getenv("SESSION_SPILL_DIR") or ("sessions" if session_shared else None),
+    shared=session_shared,
+)
+
+# Per-stage timings, token counts and error counters (/metrics and Server-Timing)
+metrics = Metrics(enabled=os.getenv("METRICS_ENABLED", "True").lower() == "true")
+metrics.describe("stage_duration_seconds", "histogram", "Time spent in each stage of a request")
+metrics.describe("http_request_duration_seconds", "histogram", "Time until response headers are sent")
+metrics.describe("llm_prompt_tokens_total", "counter", "Prompt tokens reported by Azure OpenAI")
+metrics.describe("llm_completion_tokens_total", "counter", "Completion tokens reported by Azure OpenAI")
+metrics.describe("upstream_errors_total", "counter", "Failed calls to Azure OpenAI, NewsAPI and article pages")
+metrics.describe("dedup_collapsed_total", "counter", "Articles folded into another outlet's copy of the same story")
+metrics.describe("deadline_exceeded_total", "counter", "Stages cut short by the request deadline")
+metrics.describe("degraded_responses_total", "counter", "Responses sent with a fallback because a stage ran out of time")
+
+# Requests slower than SLOW_REQUEST_MS keep a trace of their upstream calls (profiler.py)
+# Read it and run the sampling profiler through /admin/*, which needs ADMIN_TOKEN (unset = disabled)
+admin_token = os.getenv("ADMIN_TOKEN", "")
+slow_request_log_enabled = os.getenv("SLOW_REQUEST_LOG_ENABLED", "True").lower() == "true"
+slow_requests = SlowRequestLog(
+    threshold_ms=float(os.getenv("SLOW_REQUEST_MS", "2000")),
+    capacity=int(os.getenv("SLOW_REQUEST_BUFFER", "100")),
+)
+profile_max_seconds = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+profile_lock = asyncio.Lock()
+
+async def rate_limited_handler(request, exc):
+    """Shed load with 429 and Retry-After when an upstream is out of capacity"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "upstream": exc.upstream},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+# Prompt tokens the current request saved, by reason; logged as one line when it ends
+_tokens_saved = ContextVar("tokens_saved", default=None)
+
+def record_tokens_saved(saved, stage, reason):
+    """Count prompt tokens kept out of a model call, for /metrics and the request's log line"""
+    metrics.inc("prompt_tokens_saved_total", saved, stage=stage, reason=reason)
+    totals = _tokens_saved.get()
+    if totals is not None:
+        totals[reason] = totals.get(reason, 0) + saved
+
+class TimingMiddleware:
+    """Record request metrics and return the stage timings as a Server-Timing header
+
+    Plain ASGI instead of @app.middleware("http"), which costs about half the
+    throughput of cheap endpoints such as /api/news.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = metrics.start_request()
+        saved = {}
+        saved_token = _tokens_saved.set(saved)
+        timings = metrics.request_timings()
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                route = getattr(scope.get("route"), "path", "unmatched")
+                metrics.inc("http_requests_total", method=scope["method"], path=route, status=message["status"])
+                metrics.observe("http_request_duration_seconds", elapsed, path=route)
+                # Streamed responses only carry the stages finished before the first byte
+                header = metrics.server_timing(timings, elapsed * 1000).encode("latin-1")
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.end_request(token)
+            _tokens_saved.reset(saved_token)
+            if saved:
+                logger.info("%s %s: saved ~%d prompt tokens (%s)", scope["method"], scope["path"], sum(saved.values()),
+                            ", ".join(f"{reason} {tokens}" for reason, tokens in saved.items()))
+
+def cache_gauges():
+    """Cache and index sizes, read when /metrics is scraped"""
+    news = news_cache.stats()
+    summaries = summary_store.counters
+    lookups = summaries["hits"] + summaries["url_hits"] + summaries["misses"]
+    return {
+        ("news_cache_hit_ratio", ()): news["hit_ratio"],
+        ("news_cache_entries", ()): news["entries"],
+        ("newsapi_quota_remaining", ()): news["quota_remaining"],
+        ("summary_cache_hit_ratio", ()): round((summaries["hits"] + summaries["url_hits"]) / lookups, 4) if lookups else 0.0,
+        ("news_index_documents", ()): len(news_index.docs),
+        ("chat_sessions", ()): session_store.stats()["sessions"],
+        ("article_digests", ()): len(article_digests),
+        ("http_connection_reuse_ratio", ()): http_pool.report()["reuse_ratio"],
+    }
+
+metrics.add_gauges(cache_gauges)
+
 # Request models
 class ChatRequest(BaseModel):
     message: str
-    conversation_history: list = []
+    conversation_history: list = []  # Legacy clients only, superseded by session_id
+    session_id: Optional[str] = None
+    include_full_message: bool = False  # The UI only shows the short acknowledgement
+    ack_mode: Optional[Literal["llm", "template"]] = None  # Defaults to CHAT_ACK_MODE
 
 class SummaryRequest(BaseModel):
     article: dict
 
+class SummaryBatchRequest(BaseModel):
+    articles: list[dict]
+
 # Copy your get_top_news function from aibot.py
-def get_top_news(location, category=None, query=None):
+async def get_top_news(location, category=None, query=None):
     """Get the top news headlines for a given location, optionally filtered by category or query"""
     try:
-        # Determine the search parameters
-        if query:
-            # Search by query/keyword
-            top_headlines = news_client.get_everything(
-                q=query,
-                language='en',
-                sort_by='publishedAt',
-                page_size=10,
-            )
-        elif category:
-            # Search by category
-            top_headlines = news_client.get_top_headlines(
-                country=location,
-                category=category,  # sports, technology, business, etc.
-                page_size=10,
-            )
-        else:
-            # General news
-            top_headlines = news_client.get_top_headlines(
-                country=location,
-                page_size=10,
-            )
-
-        articles = top_headlines.get("articles", [])
-        
-        if not articles:
-            return [{
-                "id": "no-news",
-                "location": location,
-                "title": "No news found.",
-                "description": f"No articles available for this {'category' if category else 'query' if query else 'location'}.",
-                "url": "#",
-                "source": "System",
-                "publishedAt": "2024-01-01",
-            }]
-
-        top_news = []
-        for i, article in enumerate(articles[:5]):  # Return top 5
-            top_news.append({
-                "id": str(i + 1),
-                "location": location,
-                "title": article.get('title') or "No title",
-                "description": article.get('description') or "No description available",
-                "url": article.get('url') or "#",
-                "source": article.get('source', {}).get('name', 'Unknown'),
-                "publishedAt": article.get('publishedAt') or "2024-01-01",
-            })
-
-        return top_news
+        # Serve from the cache, identical concurrent misses share one NewsAPI call
+        key = news_cache.make_key(location, category, query)
+        articles = await news_cache.get_or_fetch(key, lambda: fetch_top_news(*key))
+        # Hand out copies so callers can't modify the cached entry
+        return [dict(article) for article in articles]
+    except RateLimited:
+        # No cached copy to fall back on, let the endpoint answer with 429
+        raise
     except Exception as e:
         print(f"Error fetching news: {e}")
         return [{
@@ -120,6 +420,178 @@ def get_top_news(location, category=None, query=None):
             "publishedAt": "2024-01-01",
         }]
 
+def lookup_local_news(location, category=None, query=None):
+    """Answer from the local headline index, returns None on a miss"""
+    if query:
+        docs = news_index.search(query, limit=5)
+        if len(docs) < news_index_min_hits:
+            return None
+    else:
+        docs = news_index.headlines(location, category, max_age=news_index_feed_max_age)
+        if not docs:
+            return None
+    # Back to the NewsAPI article shape so both paths format the same way
+    return [{**doc, "source": {"name": doc["source"]}} for doc in docs]
+
+async def fetch_top_news(location, category=None, query=None):
+    """Fetch and format the top headlines, from the local index or straight from NewsAPI"""
+    articles = lookup_local_news(location, category, query)
+    if articles is None:
+        articles = (await fetch_news_api(location, category, query)).get("articles", [])
+    
+    if not articles:
+        return [{
+            "id": "no-news",
+            "location": location,
+            "title": "No news found.",
+            "description": f"No articles available for this {'category' if category else 'query' if query else 'location'}.",
+            "url": "#",
+            "source": "System",
+            "publishedAt": "2024-01-01",
+        }]
+
+    # Collapse duplicates first so the top 5 are 5 different stories
+    return collapse_duplicates(format_articles(location, articles))[:5]  # Return top 5
+
+def format_articles(location, articles):
+    """NewsAPI-shaped articles -> the article cards the frontend shows"""
+    return [{
+        "id": str(i + 1),
+        "location": location,
+        "title": article.get('title') or "No title",
+        "description": article.get('description') or "No description available",
+        "url": article.get('url') or "#",
+        "source": article.get('source', {}).get('name', 'Unknown'),
+        "publishedAt": article.get('publishedAt') or "2024-01-01",
+    } for i, article in enumerate(articles)]
+
+def collapse_duplicates(articles):
+    """Fold copies of the same story into the first one (see dedup.py) and renumber the ids"""
+    if not dedup_enabled:
+        return articles
+    with metrics.span("dedup"):
+        collapsed = dedup_index.collapse(articles)
+    if len(collapsed) < len(articles):
+        metrics.inc("dedup_collapsed_total", len(articles) - len(collapsed))
+    for i, article in enumerate(collapsed):
+        article["id"] = str(i + 1)
+    return collapsed
+
+async def fetch_news_api(location, category=None, query=None, page_size=10, priority="interactive"):
+    """Call NewsAPI for headlines or a keyword search"""
+    try:
+        await scheduler.acquire("newsapi", priority, requests=1)
+    except RateLimited:
+        metrics.inc("rate_limited_total", upstream="newsapi", priority=priority)
+        raise
+    # Every call here spends one request of the daily NewsAPI quota
+    await news_cache.arecord_upstream_call()
+    try:
+        with metrics.span("newsapi"):
+            return await request_news_api(location, category, query, page_size)
+    except NewsAPIError as e:
+        metrics.inc("upstream_errors_total", upstream="newsapi")
+        if e.code in ("rateLimited", "maximumResultsReached"):
+            raise RateLimited("newsapi", 3600) from e
+        raise
+    except Exception:
+        metrics.inc("upstream_errors_total", upstream="newsapi")
+        raise
+
+async def request_news_api(location, category, query, page_size):
+    start = time.perf_counter()
+    try:
+        top_headlines = await search_news_api(location, category, query, page_size)
+    except Exception as e:
+        profiler.record_call("newsapi", time.perf_counter() - start, location=location, category=category,
+                             query=bool(query), page_size=page_size, error=type(e).__name__)
+        raise
+    if profiler.tracing():
+        profiler.record_call("newsapi", time.perf_counter() - start, location=location, category=category,
+                             query=bool(query), page_size=page_size,
+                             articles=len(top_headlines.get("articles") or []), bytes=len(json.dumps(top_headlines)))
+    return top_headlines
+
+async def search_news_api(location, category, query, page_size):
+    # Determine the search parameters
+    if query:
+        # Search by query/keyword
+        top_headlines = await news_client.get_everything(
+            q=query,
+            language='en',
+            sort_by='publishedAt',
+            page_size=page_size,
+        )
+    elif category:
+        # Search by category
+        top_headlines = await news_client.get_top_headlines(
+            country=location,
+            category=category,  # sports, technology, business, etc.
+            page_size=page_size,
+        )
+    else:
+        # General news
+        top_headlines = await news_client.get_top_headlines(
+            country=location,
+            page_size=page_size,
+        )
+
+    return top_headlines
+
+async def ingest_headlines():
+    """Pull the configured headline feeds into the local index"""
+    for country in news_ingest_countries:
+        for category in news_ingest_categories:
+            category = None if category == "top" else category
+            # Leave the last requests of the day for interactive users
+            if news_cache.quota_low():
+                print("Skipping news ingest, NewsAPI quota is running low")
+                return
+            try:
+                payload = await fetch_news_api(country, category, page_size=20, priority="background")
+                added = await asyncio.to_thread(news_index.add_articles, payload.get("articles", []), country, category)
+                print(f"Ingested {added} new articles for {country}/{category or 'top'}")
+            except RateLimited as e:
+                print(f"Stopping news ingest: {e}")
+                return
+            except Exception as e:
+                print(f"Error ingesting news for {country}/{category or 'top'}: {e}")
+
+async def refresh_news_index(repair=False):
+    """Reload the local index when another worker has written to it"""
+    global news_index
+    if news_index.version() == news_index.loaded_version:
+        return
+    fresh = await asyncio.to_thread(open_news_index, repair)
+    if not fresh.consistent():
+        # The leader is in the middle of a compaction, try again next round
+        fresh.close()
+        return
+    old, news_index = news_index, fresh
+    old.close()
+
+async def claim_ingest():
+    """Only one worker ingests; the lease outlives an interval so a dead leader is replaced"""
+    if shared_cache is None:
+        return True
+    return await shared_cache.aclaim("lease:ingest", news_ingest_interval + 2 * news_index_refresh)
+
+async def ingest_forever():
+    """Background job: refresh the local index every NEWS_INGEST_INTERVAL seconds"""
+    next_ingest = 0
+    while True:
+        try:
+            if time.time() >= next_ingest and await claim_ingest():
+                # Start from what the previous leader wrote
+                await refresh_news_index(repair=True)
+                await ingest_headlines()
+                next_ingest = time.time() + news_ingest_interval
+            else:
+                await refresh_news_index()
+        except Exception as e:
+            print(f"News ingest error: {e}")
+        await asyncio.sleep(min(news_ingest_interval, news_index_refresh))
+
 # Copy your tools definition from aibot.py
 tools = [
     {
@@ -150,33 +622,174 @@ tools = [
     }
 ]
 
-@app.get("/")
+# Local router for obvious news requests; the model picks the tool call for everything else
+intent_router = IntentRouter(tools[0], default_country=os.getenv("INTENT_ROUTER_DEFAULT_COUNTRY", "us"))
+intent_router_enabled = os.getenv("INTENT_ROUTER_ENABLED", "True").lower() == "true"
+intent_router_min_confidence = float(os.getenv("INTENT_ROUTER_MIN_CONFIDENCE", "0.8"))
+
+@router.get("/")
 async def root():
     """Root endpoint"""
     return {"message": "AI News Chatbot API is running!"}
 
-@app.get("/health")
+@router.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "ai-news-chatbot-backend"}
 
-@app.post("/api/chat")
-async def chat_endpoint(request: ChatRequest):
-    """Chat endpoint for AI responses with news integration"""
+@router.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics"""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/api/cache/stats")
+async def cache_stats():
+    """Cache hit/miss counters and remaining NewsAPI quota"""
+    # Pick up what the other workers spent
+    await news_cache.arecord_upstream_call(0)
+    return {
+        "news": news_cache.stats(),
+        "summaries": await summary_store.astats(),
+        "index": news_index.stats(),
+        "sessions": session_store.stats(),
+        "prefetch": summary_prefetcher.stats(),
+        "scheduler": scheduler.stats(),
+        "http": http_pool.report(),
+        "shared": shared_cache.stats() if shared_cache else None,
+        "feed": headline_feed.stats(),
+        "dedup": dedup_index.stats() if dedup_enabled else None,
+        "scrape_hedging": scrape_latency.stats() if scrape_hedge_enabled else None,
+    }
+
+def require_admin(request):
+    """404 while ADMIN_TOKEN is unset, 401 unless the request carries it (X-Admin-Token or Bearer)"""
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    supplied = request.headers.get("x-admin-token") or request.headers.get("authorization", "").removeprefix("Bearer ")
+    if not secrets.compare_digest(supplied.strip().encode("utf-8"), admin_token.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@router.get("/admin/slow-requests")
+async def slow_requests_endpoint(request: Request, limit: int = Query(20, ge=1, le=1000)):
+    """Traces of this worker's recent slow requests, newest first"""
+    require_admin(request)
+    return {"worker": os.getpid(), **slow_requests.stats(), "requests": slow_requests.recent(limit)}
+
+@router.get("/admin/profile")
+async def profile_endpoint(request: Request, seconds: float = Query(10, gt=0), interval_ms: float = Query(10, ge=1, le=1000)):
+    """Sample this worker's stacks for `seconds` and return them as collapsed stacks for a flamegraph"""
+    require_admin(request)
+    if seconds > profile_max_seconds:
+        raise HTTPException(status_code=400, detail=f"At most {profile_max_seconds:g} seconds per profile")
+    if profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running in this worker")
+    async with profile_lock:
+        sampler = SamplingProfiler(interval=interval_ms / 1000)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+    return PlainTextResponse(sampler.collapsed(), headers={
+        "X-Profile-Samples": str(sampler.sample_count),
+        "X-Profile-Worker": str(os.getpid()),
+    })
+
+async def create_completion(stage, priority=None, **kwargs):
+    """Call the chat completions API as one timed stage, counting tokens and errors"""
+    client = llm_client()
+    from openai import APITimeoutError, RateLimitError
+    priority = priority or ("summary" if stage == "summary" else "interactive")
+    # Reserve the prompt plus the longest possible answer, corrected below from response.usage
+    estimate = messages_tokens(kwargs.get("messages", [])) + kwargs.get("max_tokens", 500)
     try:
-        # Build messages from conversation history
-        messages = [
-            {"role": "system", "content": """You are a helpful AI news assistant. When users ask for news:
-    
+        await scheduler.acquire("azure_openai", priority, requests=1, tokens=estimate)
+    except RateLimited:
+        metrics.inc("rate_limited_total", upstream="azure_openai", priority=priority)
+        raise
+
+    # Whatever is left of the request deadline, LLM_TIMEOUT at most
+    timeout = deadlines.remaining(llm_timeout)
+    start = time.perf_counter()
+    try:
+        if timeout is not None and timeout <= 0:
+            raise asyncio.TimeoutError()
+        # For streams this times the wait for the first chunk
+        with metrics.span(stage):
+            response = await asyncio.wait_for(
+                client.chat.completions.create(model=env_base_model, timeout=timeout, **kwargs), timeout)
+    except (asyncio.TimeoutError, APITimeoutError) as e:
+        trace_completion(stage, start, kwargs, error="timeout")
+        metrics.inc("deadline_exceeded_total", stage=stage)
+        raise DeadlineExceeded(stage) from e
+    except RateLimitError as e:
+        trace_completion(stage, start, kwargs, error="rate_limited")
+        metrics.inc("upstream_errors_total", upstream="azure_openai", stage=stage)
+        try:
+            retry_after = float(e.response.headers.get("retry-after", "10"))
+        except ValueError:
+            retry_after = 10
+        raise RateLimited("azure_openai", retry_after) from e
+    except Exception as e:
+        trace_completion(stage, start, kwargs, error=type(e).__name__)
+        metrics.inc("upstream_errors_total", upstream="azure_openai", stage=stage)
+        raise
+    usage = getattr(response, "usage", None)
+    trace_completion(stage, start, kwargs, usage=usage)
+    metrics.record_usage(stage, usage)
+    if usage is not None:
+        scheduler.settle("azure_openai", "tokens", estimate, usage.total_tokens)
+    return response
+
+def trace_completion(stage, start, kwargs, usage=None, error=None):
+    """Add a model call to the slow-request trace (for streams, the wait for the first chunk)"""
+    if not profiler.tracing():
+        return
+    messages = kwargs.get("messages", [])
+    profiler.record_call(
+        "azure_openai", time.perf_counter() - start,
+        stage=stage,
+        stream=bool(kwargs.get("stream")),
+        messages=len(messages),
+        prompt_chars=sum(len(m.get("content") or "") for m in messages),
+        prompt_tokens=getattr(usage, "prompt_tokens", None),
+        completion_tokens=getattr(usage, "completion_tokens", None),
+        error=error,
+    )
+
+def open_session(request):
+    """The request's server-side session, None for legacy clients that send their own history"""
+    if request.session_id or not request.conversation_history:
+        return session_store.get(request.session_id)
+    return None
+
+def assistant_turn(message, articles=()):
+    """What the session remembers of a reply: the text plus the titles of the articles shown"""
+    titles = "; ".join(a["title"] for a in articles if a.get("title"))
+    if titles:
+        return f"{message or ''}\nArticles shown: {titles}".strip()
+    return message or ""
+
+def build_chat_messages(request, session=None):
+    """Build the model messages from the system prompt, conversation history and new message"""
+    messages = [
+        {"role": "system", "content": """You are a helpful AI news assistant. When users ask for news:
+
     1. For specific topics (sports, technology, business, etc.), use the 'category' parameter
     2. For very specific queries (like "climate change", "AI developments"), use the 'query' parameter  
     3. For general news, use location only
-    
+
     Categories available: business, entertainment, general, health, science, sports, technology
-    
+
     Always provide brief, clean responses without listing article details since they'll be displayed separately."""},
-        ]
-        
+    ]
+
+    if session is not None:
+        # Already stored as model messages, nothing to rebuild
+        messages.extend(session.messages)
+    else:
         # Add conversation history (last 10 messages)
         for msg in request.conversation_history[-10:]:
             if msg.get("content"):
@@ -184,194 +797,777 @@ async def chat_endpoint(request: ChatRequest):
                     "role": "user" if msg.get("type") == "user" else "assistant",
                     "content": msg.get("content", "")
                 })
-        
-        # Add current message
-        messages.append({"role": "user", "content": request.message})
-
-        # First AI call with tools
-        response = openai_client.chat.completions.create(
-            model=env_base_model,
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
+
+    # Add current message
+    messages.append({"role": "user", "content": request.message})
+    return budget_messages("tool_select", messages)
+
+def route_tool_calls(message, min_confidence=None):
+    """get_top_news calls for obvious news requests, None when the model should choose"""
+    if not intent_router_enabled:
+        return None
+    route = intent_router.route(message)
+    if min_confidence is None:
+        min_confidence = intent_router_min_confidence
+    if route is None or route.confidence < min_confidence:
+        metrics.inc("intent_router_total", outcome="model")
+        return None
+    metrics.inc("intent_router_total", outcome="routed")
+    from openai.types.chat import ChatCompletionMessageToolCall
+    return [
+        ChatCompletionMessageToolCall(
+            id=f"call_{uuid.uuid4().hex[:24]}",
+            type="function",
+            function={"name": "get_top_news", "arguments": json.dumps(args)},
         )
+        for args in route.calls
+    ]
 
-        response_message = response.choices[0].message
+def budget_messages(stage, messages):
+    """Fit the conversation history into the prompt budget, logging what it saved"""
+    fitted, dropped = fit_messages(messages, chat_prompt_budget)
+    if dropped:
+        saved = messages_tokens(messages) - messages_tokens(fitted)
+        record_tokens_saved(saved, stage, "history")
+        logger.debug("%s prompt: dropped %d old turns, saved ~%d tokens", stage, dropped, saved)
+    return fitted
 
-        # Handle tool calls (news fetching)
-        if response_message.tool_calls:
-            # Add assistant message with tool calls to conversation
-            messages.append({
-                "role": response_message.role,
-                "content": response_message.content,
-                "tool_calls": [tc.model_dump() for tc in response_message.tool_calls]
-            })
+def merge_articles(results, limit=10):
+    """Merge several get_top_news results into one ranked list without duplicates"""
+    # Placeholders ("no-news"/"error") only matter when nothing real came back
+    real = [[a for a in articles if a.get("id") not in ("no-news", "error")] for articles in results]
+    if not any(real):
+        return next((articles for articles in results if articles), [])
+
+    # Interleave by rank so every search contributes its best articles first
+    merged, seen = [], set()
+    for rank in range(max(len(articles) for articles in real)):
+        for articles in real:
+            if rank >= len(articles):
+                continue
+            article = articles[rank]
+            keys = {article.get("url"), " ".join((article.get("title") or "").lower().split())} - {"#", ""}
+            if keys & seen:
+                continue
+            seen |= keys
+            merged.append(article)
+
+    # The same story can come back from two searches through different outlets
+    if dedup_enabled:
+        merged = dedup_index.collapse(merged)
+    merged = merged[:limit]
+    for i, article in enumerate(merged):
+        article["id"] = str(i + 1)
+    return merged
 
-            articles = []
-            for tool_call in response_message.tool_calls:
-                if tool_call.function.name == "get_top_news":
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    # Get news articles with category/query support
-                    news_response = get_top_news(
+async def run_tool_calls(tool_calls, messages, content=None):
+    """Run the model's tool calls concurrently, append their results to messages and return the merged articles"""
+    # Add assistant message with tool calls to conversation
+    messages.append({
+        "role": "assistant",
+        "content": content,
+        "tool_calls": [tc.model_dump() for tc in tool_calls]
+    })
+
+    # Bound how many NewsAPI lookups a single turn can have in flight
+    semaphore = asyncio.Semaphore(tool_call_concurrency)
+
+    async def run_one(tool_call):
+        if tool_call.function.name != "get_top_news":
+            return None
+        function_args = json.loads(tool_call.function.arguments)
+
+        # Get news articles with category/query support
+        async with semaphore:
+            with metrics.span("news"):
+                try:
+                    return await asyncio.wait_for(get_top_news(
                         location=function_args.get("location", "us"),
                         category=function_args.get("category"),
                         query=function_args.get("query")
-                    )
-                    articles = news_response
-                    
-                    # Add tool response to conversation
-                    messages.append({
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": "get_top_news",
-                        "content": json.dumps(news_response),
-                    })
-
-            # Second AI call to get final response
-            final_response = openai_client.chat.completions.create(
-                model=env_base_model,
-                messages=messages,
-            )
+                    ), deadlines.remaining())
+                except asyncio.TimeoutError:
+                    # The fetch keeps running for the news cache, this turn answers without it
+                    metrics.inc("deadline_exceeded_total", stage="news")
+                    deadlines.degrade("news_timeout")
+                    return [{
+                        "id": "error",
+                        "title": "News search timed out",
+                        "description": "The news search took too long. Please try again in a moment.",
+                        "url": "#",
+                        "source": "System",
+                        "publishedAt": ""
+                    }]
 
-            final_message = final_response.choices[0].message
-            
-            # Generate a clean version for UI
-            clean_messages = [
-                {"role": "system", "content": "Generate a brief, friendly response (max 40 words) acknowledging that you found articles for the user's query. Don't list article details since they'll be displayed separately. Be conversational and helpful."},
-                {"role": "user", "content": f"I searched for: {request.message} and found {len(articles)} articles. Generate a brief response."}
-            ]
-            
-            clean_response = openai_client.chat.completions.create(
-                model=env_base_model,
-                messages=clean_messages,
-                max_tokens=60,
+    results = await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls))
+
+    # Add tool responses to conversation in the order the model asked for them
+    saved = 0
+    for tool_call, news_response in zip(tool_calls, results):
+        if news_response is None:
+            continue
+        # The model only reads titles, sources and descriptions; ids, urls and dates go to the UI
+        projected = project_articles(news_response, tool_description_chars)
+        saved += count_tokens(json.dumps(news_response)) - count_tokens(projected)
+        messages.append({
+            "tool_call_id": tool_call.id,
+            "role": "tool",
+            "name": "get_top_news",
+            "content": projected,
+        })
+    if saved > 0:
+        record_tokens_saved(saved, "final", "tool_results")
+        logger.debug("tool results: projected articles saved ~%d tokens", saved)
+
+    return merge_articles([r for r in results if r is not None], limit=max_merged_articles)
+
+def describe_search(tool_calls):
+    """Describe what the news tool searched for, e.g. 'technology news in US'"""
+    topics = []
+    for tool_call in tool_calls:
+        if tool_call.function.name != "get_top_news":
+            continue
+        args = json.loads(tool_call.function.arguments or "{}")
+        location = (args.get("location") or "us").upper()
+        if args.get("query"):
+            topics.append(f"\"{args['query']}\"")
+        elif args.get("category"):
+            topics.append(f"{args['category']} news in {location}")
+        else:
+            topics.append(f"top headlines in {location}")
+    return " and ".join(topics) or "your request"
+
+def template_acknowledgement(tool_calls, articles):
+    """Local stand-in for the clean acknowledgement call"""
+    found = [a for a in articles if a.get("id") not in ("no-news", "error")]
+    topic = describe_search(tool_calls)
+    if not found:
+        return f"I couldn't find any articles for {topic} right now. Try another topic or country."
+    return f"Here {'is' if len(found) == 1 else 'are'} {len(found)} article{'' if len(found) == 1 else 's'} on {topic}. Click any of them below for an AI summary."
+
+def build_clean_messages(user_message, articles):
+    """Prompt for the short acknowledgement shown above the article cards"""
+    return [
+        {"role": "system", "content": "Generate a brief, friendly response (max 40 words) acknowledging that you found articles for the user's query. Don't list article details since they'll be displayed separately. Be conversational and helpful."},
+        {"role": "user", "content": f"I searched for: {user_message} and found {len(articles)} articles. Generate a brief response."}
+    ]
+
+async def acknowledge_articles(request, tool_calls, articles):
+    """Short, friendly message shown above the article cards"""
+    if (request.ack_mode or chat_ack_mode) == "template":
+        return template_acknowledgement(tool_calls, articles)
+
+    # Generate a clean version for UI
+    try:
+        clean_response = await create_completion(
+            "ack",
+            messages=build_clean_messages(request.message, articles),
+            max_tokens=60,
+        )
+    except DeadlineExceeded:
+        deadlines.degrade("ack_timeout")
+        return template_acknowledgement(tool_calls, articles)
+    return clean_response.choices[0].message.content
+
+async def full_answer(request, messages):
+    """Second AI call to get the full response, skipped unless the client asks for it"""
+    if not request.include_full_message:
+        return None
+
+    try:
+        final_response = await create_completion("final", messages=budget_messages("final", messages))
+    except DeadlineExceeded:
+        # The articles and acknowledgement go out without the prose
+        deadlines.degrade("final_timeout")
+        return None
+    return final_response.choices[0].message.content
+
+# Sent when the model could not pick a tool in time and the intent router had no guess either
+TIMEOUT_REPLY = "Sorry, that is taking longer than it should. Please try again in a moment."
+
+def fallback_tool_calls(message):
+    """The intent router's best guess when tool selection ran out of time, None when it has none"""
+    deadlines.degrade("tool_select_timeout")
+    return route_tool_calls(message, min_confidence=0.0)
+
+def mark_degraded(endpoint, payload):
+    """Add the stages that ran out of time to a response payload and count them"""
+    reasons = payload.get("degraded") or deadlines.degraded()
+    for reason in reasons:
+        metrics.inc("degraded_responses_total", endpoint=endpoint, reason=reason)
+    return {**payload, "degraded": reasons}
+
+@router.post("/api/chat")
+async def chat_endpoint(request: ChatRequest):
+    """Chat endpoint for AI responses with news integration"""
+    with deadlines.deadline(chat_deadline):
+        return await chat_response(request)
+
+async def chat_response(request):
+    """Body of chat_endpoint, run under the chat deadline"""
+    try:
+        # Build messages from the session (or the legacy client-sent history)
+        session = open_session(request)
+        messages = build_chat_messages(request, session)
+
+        # Obvious news requests skip the tool-selection call
+        tool_calls, content = route_tool_calls(request.message), None
+        if tool_calls is None:
+            try:
+                # First AI call with tools
+                response = await create_completion(
+                    "tool_select",
+                    messages=messages,
+                    tools=tools,
+                    tool_choice="auto",
+                )
+                response_message = response.choices[0].message
+                tool_calls, content = response_message.tool_calls, response_message.content
+            except DeadlineExceeded:
+                tool_calls = fallback_tool_calls(request.message)
+                content = None if tool_calls else TIMEOUT_REPLY
+
+        # Handle tool calls (news fetching)
+        if tool_calls:
+            articles = await run_tool_calls(tool_calls, messages, content)
+
+            # The acknowledgement doesn't depend on the full answer, so both run concurrently
+            clean_message, full_message = await asyncio.gather(
+                acknowledge_articles(request, tool_calls, articles),
+                full_answer(request, messages),
             )
+            if session is not None:
+                session_store.record(session, request.message, assistant_turn(clean_message, articles))
+            # Start summarizing the top articles before the user clicks one (SUMMARY_PREFETCH_ENABLED)
+            summary_prefetcher.schedule(articles[:summary_prefetch_top])
             
-            return {
-                "message": clean_response.choices[0].message.content,
-                "full_message": final_message.content,  # Keep full version if needed
+            return mark_degraded("chat", {
+                "message": clean_message,
+                "full_message": full_message,  # Only computed when include_full_message is set
                 "articles": articles,
-                "type": "news_with_articles"
-            }
+                "type": "news_with_articles",
+                "session_id": session.id if session else None,
+            })
         else:
+            if session is not None:
+                session_store.record(session, request.message, assistant_turn(content))
             # Normal response without tools
-            return {
-                "message": response_message.content,
+            return mark_degraded("chat", {
+                "message": content,
                 "articles": [],
-                "type": "text_response"
-            }
+                "type": "text_response",
+                "session_id": session.id if session else None,
+            })
 
+    except RateLimited:
+        raise
     except Exception as e:
         print(f"Chat error: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
 
-@app.post("/api/summarize")
+async def prepare_summary(article):
+    """Scrape the article and build its summary prompt, returns (cached_result, job)"""
+    url = article.get('url')
+
+    # A recent summary of the same URL skips scraping and the model call
+    cached = await summary_store.aget_fresh_for_url(url)
+    if cached:
+        return cached, None
+    
+    # Try to fetch full article content, leaving time for the model call
+    document = await article_digest(article, reserve=summary_model_reserve)
+    
+    # Prepare content for summarization
+    if document is not None:
+        variant = "full"
+        key_sentences = document.select(summary_input_tokens)
+        saved = document.total_tokens - count_tokens(key_sentences)
+        if saved > 0:
+            record_tokens_saved(saved, "summary", "extractive")
+        content_to_summarize = f"Title: {article.get('title')}\n\nKey Sentences: {key_sentences}"
+        system_message = "You are an AI that provides comprehensive summaries of news articles. You have the most informative sentences of the full article, in their original order. Provide a detailed summary with key points, implications, and important details."
+    else:
+        # Fallback to title + description if scraping fails
+        variant = "fallback"
+        content_to_summarize = f"Title: {article.get('title')}\nDescription: {article.get('description')}"
+        system_message = "You are an AI that provides summaries based on article titles and descriptions. Provide an informative summary with analysis and context."
+
+    # Same URL, same extracted text and same prompt variant -> same summary
+    cache_key = summary_store.make_key(url, content_to_summarize, variant)
+    cached = await summary_store.aget(cache_key)
+    if cached:
+        return cached, None
+    
+    messages = [
+        {
+            "role": "system",
+            "content": system_message
+        },
+        {
+            "role": "user",
+            "content": f"Please provide a comprehensive summary of this article:\n\n{content_to_summarize}"
+        }
+    ]
+    return None, {"url": url, "variant": variant, "cache_key": cache_key, "messages": messages}
+
+async def article_digest(article, reserve=0.0):
+    """The scraped article split into ranked sentences, None when the page gives no usable text"""
+    url = article.get('url')
+    document = article_digests.get(url)
+    if document is not None or not url:
+        return document
+    # The preview and the summary are requested together, both wait on one scrape
+    task = article_digests_inflight.get(url)
+    if task is None:
+        task = asyncio.ensure_future(build_article_digest(url, article.get('title'), reserve))
+        article_digests_inflight[url] = task
+        task.add_done_callback(lambda _: article_digests_inflight.pop(url, None))
+    try:
+        # Shield so one cancelled caller doesn't cancel the shared scrape; each caller waits within its own deadline
+        return await asyncio.wait_for(asyncio.shield(task), deadlines.remaining(reserve=reserve))
+    except asyncio.TimeoutError:
+        metrics.inc("deadline_exceeded_total", stage="scrape")
+        deadlines.degrade("scrape_timeout")
+        return None
+
+async def build_article_digest(url, title, reserve):
+    full_content = await fetch_article_content(url, reserve=reserve)
+    if not full_content or len(full_content) <= 200:
+        return None
+    with metrics.span("extractive"):
+        document = await asyncio.to_thread(digest, full_content, title)
+    article_digests.put(url, document)
+    return document
+
+async def store_summary(job, summary):
+    """Save a freshly generated summary and return the response payload"""
+    used_full_content = job["variant"] == "full"
+    degraded = deadlines.degraded()
+    # A title/description summary written because the scrape timed out is not the page's real summary
+    if summary and not degraded:
+        await summary_store.aput(job["cache_key"], job["url"], job["variant"], summary, used_full_content)
+    return {
+        "summary": summary,
+        "used_full_content": used_full_content,
+        "cached": False,
+        "degraded": degraded,
+    }
+
+def preview_sentences(article, document):
+    """Key sentences of a scraped article, or its description when it could not be scraped"""
+    if document is None:
+        description = article.get('description')
+        return [description] if description else []
+    return document.preview(summary_preview_sentences)
+
+def instant_summary(article, reason):
+    """Summary payload built without the model, for when the model call ran out of time"""
+    deadlines.degrade(reason)
+    document = article_digests.get(article.get('url'))
+    return {
+        "summary": " ".join(preview_sentences(article, document)) or article.get('title') or "",
+        "used_full_content": document is not None,
+        "cached": False,
+        "degraded": deadlines.degraded() or [reason],  # Background runs have no deadline to record it in
+    }
+
+async def summarize(article, background=False):
+    """Scrape and summarize one article, served from the summary cache when possible"""
+    with deadlines.section():
+        cached, job = await prepare_summary(article)
+        if cached:
+            return {**cached, "cached": True, "degraded": []}
+
+        try:
+            response = await create_completion(
+                "summary",
+                priority="background" if background else "summary",
+                messages=job["messages"],
+                max_tokens=400,  # Increased for more detailed summaries
+            )
+        except DeadlineExceeded:
+            return instant_summary(article, "model_timeout")
+        return await store_summary(job, response.choices[0].message.content)
+
+async def summarize_within_deadline(article):
+    """summary_prefetcher.summarize, answered with an instant summary if a joined run outlasts the deadline"""
+    with deadlines.section():
+        try:
+            return await asyncio.wait_for(summary_prefetcher.summarize(article), deadlines.remaining())
+        except asyncio.TimeoutError:
+            return instant_summary(article, "summary_timeout")
+
+# Summaries run once per URL at a time; optionally started speculatively for new chat results
+summary_prefetcher = SummaryPrefetcher(
+    summarize,
+    enabled=os.getenv("SUMMARY_PREFETCH_ENABLED", "False").lower() == "true",
+    workers=int(os.getenv("SUMMARY_PREFETCH_WORKERS", "2")),
+    max_queue=int(os.getenv("SUMMARY_PREFETCH_QUEUE", "20")),
+    max_inflight=int(os.getenv("SUMMARY_PREFETCH_MAX_INFLIGHT", "8")),
+)
+summary_prefetch_top = int(os.getenv("SUMMARY_PREFETCH_TOP", "3"))
+summary_batch_max = int(os.getenv("SUMMARY_BATCH_MAX", "10"))
+summary_batch_concurrency = int(os.getenv("SUMMARY_BATCH_CONCURRENCY", "3"))
+
+@router.post("/api/summarize")
 async def summarize_article(request: SummaryRequest):
     """Generate AI summary for a specific article using full content"""
     try:
-        article = request.article
-        
-        # Try to fetch full article content
-        full_content = fetch_article_content(article.get('url'))
-        
-        # Prepare content for summarization
-        if full_content and len(full_content) > 200:
-            content_to_summarize = f"Title: {article.get('title')}\n\nFull Article Content: {full_content}"
-            system_message = "You are an AI that provides comprehensive summaries of news articles. You have access to the full article content. Provide a detailed summary with key points, implications, and important details."
-        else:
-            # Fallback to title + description if scraping fails
-            content_to_summarize = f"Title: {article.get('title')}\nDescription: {article.get('description')}"
-            system_message = "You are an AI that provides summaries based on article titles and descriptions. Provide an informative summary with analysis and context."
-        
-        messages = [
-            {
-                "role": "system",
-                "content": system_message
-            },
-            {
-                "role": "user",
-                "content": f"Please provide a comprehensive summary of this article:\n\n{content_to_summarize}"
-            }
-        ]
+        with deadlines.deadline(summary_deadline):
+            # Served from a prefetched or in-progress run when there is one
+            return mark_degraded("summarize", await summarize_within_deadline(request.article))
+    except RateLimited:
+        raise
+    except Exception:
+        logger.exception("Summarization error")
+        return {"summary": "Error generating summary"}
 
-        response = openai_client.chat.completions.create(
-            model=env_base_model,
-            messages=messages,
-            max_tokens=400,  # Increased for more detailed summaries
-        )
+@router.post("/api/summarize/preview")
+async def summarize_preview(request: SummaryRequest):
+    """Instant summary: the article's key sentences, picked locally without a model call"""
+    try:
+        with deadlines.deadline(preview_deadline):
+            # Scraping failed or timed out: the description is all there is
+            document = await article_digest(request.article)
+            sentences = preview_sentences(request.article, document)
+            return mark_degraded("preview", {
+                "summary": " ".join(sentences),
+                "sentences": sentences,
+                "used_full_content": document is not None,
+            })
+    except Exception as e:
+        print(f"Summary preview error: {e}")
+        raise HTTPException(status_code=500, detail="Error building the summary preview")
+
+@router.post("/api/summarize/batch")
+async def summarize_batch(request: SummaryBatchRequest):
+    """Summarize several articles at once, results in the order they were sent"""
+    if len(request.articles) > summary_batch_max:
+        raise HTTPException(status_code=400, detail=f"At most {summary_batch_max} articles per batch")
+
+    semaphore = asyncio.Semaphore(summary_batch_concurrency)
 
+    def item(article, **result):
+        # Every item carries the same keys, whether fresh, cached, degraded or failed
+        return {"url": article.get("url"), "summary": None, "used_full_content": False, "cached": False,
+                "degraded": [], "error": False, "retry_after": None, **result}
+
+    async def summarize_one(article):
+        try:
+            async with semaphore:
+                result = await summarize_within_deadline(article)
+            return item(article, **result)
+        except RateLimited as e:
+            return item(article, summary="Rate limited, try again later", error=True, retry_after=e.retry_after)
+        except Exception:
+            logger.exception("Summarization error")
+            return item(article, summary="Error generating summary", error=True)
+
+    # One deadline for the whole batch, articles still waiting for the semaphore get less of it
+    with deadlines.deadline(summary_deadline):
+        summaries = await asyncio.gather(*(summarize_one(article) for article in request.articles))
+    reasons = list(dict.fromkeys(reason for result in summaries for reason in result.get("degraded", [])))
+    return mark_degraded("summarize_batch", {"summaries": summaries, "degraded": reasons})
+
+# ---------------- Server-Sent Events streaming ----------------
+def sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+class StreamTimer:
+    """Track time-to-first-byte and total latency of a streamed response"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_byte = None
+
+    def mark(self):
+        if self.first_byte is None:
+            self.first_byte = time.perf_counter()
+
+    def report(self):
+        now = time.perf_counter()
+        first_byte = self.first_byte or now
         return {
-            "summary": response.choices[0].message.content,
-            "used_full_content": bool(full_content and len(full_content) > 200)
+            "ttfb_ms": round((first_byte - self.started) * 1000, 1),
+            "total_ms": round((now - self.started) * 1000, 1),
         }
+
+async def stream_completion(stage, tool_calls=None, **kwargs):
+    """Yield the content deltas of a streamed completion, collecting any tool calls into `tool_calls`"""
+    stream = await create_completion(stage, stream=True, **kwargs)
+    fragments = {}
+    chunks = stream.__aiter__()
+    while True:
+        try:
+            chunk = await asyncio.wait_for(chunks.__anext__(), deadlines.remaining(llm_timeout))
+        except StopAsyncIteration:
+            break
+        except asyncio.TimeoutError as e:
+            metrics.inc("deadline_exceeded_total", stage=stage)
+            raise DeadlineExceeded(stage) from e
+        # Token usage arrives on the final chunk when the API includes it
+        metrics.record_usage(stage, getattr(chunk, "usage", None))
+        # Azure sends a content-filter chunk without choices first
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        for fragment in delta.tool_calls or []:
+            call = fragments.setdefault(fragment.index, {"id": "", "name": "", "arguments": ""})
+            call["id"] = fragment.id or call["id"]
+            if fragment.function:
+                call["name"] += fragment.function.name or ""
+                call["arguments"] += fragment.function.arguments or ""
+        if delta.content:
+            yield delta.content
+
+    if tool_calls is not None:
+        from openai.types.chat import ChatCompletionMessageToolCall
+        for _, call in sorted(fragments.items()):
+            tool_calls.append(ChatCompletionMessageToolCall(
+                id=call["id"],
+                type="function",
+                function={"name": call["name"], "arguments": call["arguments"]},
+            ))
+
+async def chat_event_stream(request):
+    """Events: 'articles' once the news tool resolves, then 'token'*, then 'done' or 'error'"""
+    timer = StreamTimer()
+    with deadlines.deadline(chat_deadline):
+        async for event in chat_events(request, timer):
+            yield event
+
+async def chat_events(request, timer):
+    """Body of chat_event_stream, run under the chat deadline"""
+    try:
+        session = open_session(request)
+        session_id = session.id if session else None
+        messages = build_chat_messages(request, session)
+
+        tool_calls, reply = route_tool_calls(request.message), []
+        if tool_calls is None:
+            tool_calls = []
+            try:
+                async for text in stream_completion("tool_select", tool_calls, messages=messages, tools=tools, tool_choice="auto"):
+                    timer.mark()
+                    reply.append(text)
+                    yield sse_event("token", {"content": text})
+            except DeadlineExceeded:
+                # Keep a partly streamed reply, otherwise fall back to the intent router's guess
+                tool_calls = [] if reply else fallback_tool_calls(request.message) or []
+                if not reply and not tool_calls:
+                    timer.mark()
+                    reply.append(TIMEOUT_REPLY)
+                    yield sse_event("token", {"content": TIMEOUT_REPLY})
+
+        if not tool_calls:
+            if session is not None:
+                session_store.record(session, request.message, assistant_turn("".join(reply)))
+            done = mark_degraded("chat_stream", {"type": "text_response", "session_id": session_id})
+            yield sse_event("done", {**done, **timer.report()})
+            return
+
+        # Send the articles before any model text so the cards render first
+        articles = await run_tool_calls(tool_calls, messages)
+        timer.mark()
+        yield sse_event("articles", {"articles": articles})
+        summary_prefetcher.schedule(articles[:summary_prefetch_top])
+
+        reply = []
+        if (request.ack_mode or chat_ack_mode) == "template":
+            reply.append(template_acknowledgement(tool_calls, articles))
+            yield sse_event("token", {"content": reply[0]})
+        else:
+            try:
+                async for text in stream_completion("ack", messages=build_clean_messages(request.message, articles), max_tokens=60):
+                    reply.append(text)
+                    yield sse_event("token", {"content": text})
+            except DeadlineExceeded:
+                deadlines.degrade("ack_timeout")
+                if not reply:
+                    reply.append(template_acknowledgement(tool_calls, articles))
+                    yield sse_event("token", {"content": reply[0]})
+
+        if session is not None:
+            session_store.record(session, request.message, assistant_turn("".join(reply), articles))
+        done = mark_degraded("chat_stream", {"type": "news_with_articles", "session_id": session_id})
+        yield sse_event("done", {**done, **timer.report()})
+    except RateLimited as e:
+        yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after, **timer.report()})
     except Exception as e:
-        print(f"Summarization error: {e}")
-        return {"summary": "Error generating summary"}
+        print(f"Chat stream error: {e}")
+        yield sse_event("error", {"detail": f"Error processing chat request: {str(e)}", **timer.report()})
+
+async def summary_event_stream(request):
+    """Events: 'token'* with the summary text, then 'done' or 'error'"""
+    timer = StreamTimer()
+    with deadlines.deadline(summary_deadline):
+        async for event in summary_events(request, timer):
+            yield event
+
+async def summary_events(request, timer):
+    """Body of summary_event_stream, run under the summary deadline"""
+    try:
+        url = request.article.get("url")
+        if url in summary_prefetcher.inflight:
+            # Already being summarized in the background, wait for that instead of starting over
+            result = mark_degraded("summarize_stream", await summarize_within_deadline(request.article))
+            timer.mark()
+            yield sse_event("token", {"content": result["summary"]})
+            yield sse_event("done", {"used_full_content": result["used_full_content"], "cached": result["cached"],
+                                     "degraded": result["degraded"], **timer.report()})
+            return
+
+        cached, job = await prepare_summary(request.article)
+        if cached:
+            timer.mark()
+            yield sse_event("token", {"content": cached["summary"]})
+            yield sse_event("done", {"used_full_content": cached["used_full_content"], "cached": True, **timer.report()})
+            return
+
+        parts = []
+        try:
+            async for text in stream_completion("summary", messages=job["messages"], max_tokens=400):
+                timer.mark()
+                parts.append(text)
+                yield sse_event("token", {"content": text})
+        except DeadlineExceeded:
+            if parts:
+                # What arrived is kept, just not cached
+                deadlines.degrade("model_timeout")
+                result = {"used_full_content": job["variant"] == "full"}
+            else:
+                result = instant_summary(request.article, "model_timeout")
+                timer.mark()
+                yield sse_event("token", {"content": result["summary"]})
+        else:
+            result = await store_summary(job, "".join(parts))
+        done = mark_degraded("summarize_stream", {"used_full_content": result["used_full_content"], "cached": False})
+        yield sse_event("done", {**done, **timer.report()})
+    except RateLimited as e:
+        yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after, **timer.report()})
+    except Exception as e:
+        print(f"Summarization stream error: {e}")
+        yield sse_event("error", {"detail": "Error generating summary", **timer.report()})
+
+@router.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """Streaming variant of /api/chat using Server-Sent Events"""
+    return sse_response(chat_event_stream(request))
+
+@router.post("/api/summarize/stream")
+async def summarize_stream_endpoint(request: SummaryRequest):
+    """Streaming variant of /api/summarize using Server-Sent Events"""
+    return sse_response(summary_event_stream(request))
 
-def fetch_article_content(url):
-    """Fetch full article content from URL using web scraping"""
+async def fetch_article_content(url, reserve=0.0):
+    """Fetch full article content from URL using web scraping, None when it fails or runs out of time"""
+    # What the deadline leaves after `reserve` seconds for later stages, SCRAPE_TIMEOUT at most
+    budget = deadlines.remaining(article_extractor.timeout, reserve=reserve)
     try:
+        if budget <= 0:
+            raise asyncio.TimeoutError()
         # Set headers to mimic a real browser
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Try different selectors for article content
-        content_selectors = [
-            'article',
-            '[class*="article-content"]',
-            '[class*="post-content"]',
-            '[class*="entry-content"]',
-            '[class*="content-body"]',
-            'main p',
-            '.content p'
-        ]
-        
-        content = ""
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            if elements:
-                for element in elements:
-                    content += element.get_text() + " "
-                break
-        
-        # Fallback: get all paragraphs
-        if not content.strip():
-            paragraphs = soup.find_all('p')
-            content = ' '.join([p.get_text() for p in paragraphs])
-        
-        # Clean and limit content
-        content = ' '.join(content.split())  # Remove extra whitespace
-        return content[:3000] if content else None  # Limit to 3000 chars
+        # Streams the page through lxml and stops once enough article text is found
+        with metrics.span("scrape"):
+            if not scrape_hedge_enabled:
+                return await asyncio.wait_for(article_extractor.fetch(url, headers=headers, timeout=budget), budget)
+            # A second request once this one is slower than usual, whichever answers first wins
+            return await deadlines.hedged(
+                lambda: article_extractor.fetch(url, headers=headers, timeout=budget), scrape_latency, timeout=budget)
         
+    except asyncio.TimeoutError:
+        metrics.inc("deadline_exceeded_total", stage="scrape")
+        deadlines.degrade("scrape_timeout")
+        print(f"Scraping {url} ran out of time")
+        return None
     except Exception as e:
+        metrics.inc("upstream_errors_total", upstream="scrape")
         print(f"Error scraping {url}: {e}")
         return None
 
-# Keep your existing endpoints
-@app.get("/api/news")
-async def get_news():
-    """Get latest news - legacy endpoint"""
-    return {"news": [], "message": "Use /api/chat for AI-powered news retrieval"}
+@router.get("/api/news")
+async def get_news(request: Request, country: str = "us", category: Optional[str] = None, page: int = Query(1, ge=1)):
+    """Paginated top headlines from the in-memory snapshot, answers If-None-Match with 304"""
+    country = country.strip().lower()
+    category = (category or "").strip().lower() or None
+    category = None if category == "top" else category
+    if country not in news_feed_countries:
+        raise HTTPException(status_code=400, detail=f"Unknown country: {country}")
+    if category and category not in tools[0]["function"]["parameters"]["properties"]["category"]["enum"]:
+        raise HTTPException(status_code=400, detail=f"Unknown category: {category}")
+
+    try:
+        feed_page = await headline_feed.page(country, category, page)
+    except RateLimited:
+        raise
+    except Exception as e:
+        print(f"Headline feed error: {e}")
+        raise HTTPException(status_code=503, detail="Headlines are not available right now")
+    if feed_page is None:
+        raise HTTPException(status_code=404, detail=f"No page {page} for this feed")
+
+    if headline_feed.not_modified(request.headers.get("if-none-match"), feed_page.etag):
+        return Response(status_code=304, headers=feed_page.headers)
+    return Response(feed_page.body, media_type="application/json", headers=feed_page.headers)
+
+def create_app():
+    """Build the FastAPI app; every uvicorn worker calls this (main:create_app with --factory)"""
+    app = FastAPI(
+        title="AI News Chatbot API",
+        description="Backend API for AI News Chatbot application with Azure OpenAI integration",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[os.getenv("FRONTEND_URL", "http://localhost:3000")],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_exception_handler(RateLimited, rate_limited_handler)
+    # Added first so it runs inside TimingMiddleware and sees the request's stage timings
+    if slow_request_log_enabled:
+        app.add_middleware(SlowRequestMiddleware, log=slow_requests, timings=metrics.request_timings)
+    if metrics.enabled:
+        app.add_middleware(TimingMiddleware)
+    app.include_router(router)
+    return app
+
+# For `uvicorn main:app` and the benchmarks
+app = create_app()
 
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    host = os.getenv("HOST", "0.0.0.0")
-    port = int(os.getenv("PORT", "8000"))
+    parser = argparse.ArgumentParser(description="Run the AI News Chatbot API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=web_concurrency, help="worker processes (default: WEB_CONCURRENCY or 1)")
+    args = parser.parse_args()
     debug = os.getenv("DEBUG", "True").lower() == "true"
+    # The workers import this module again and read it to share limits, sessions and the ingest job
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    # Auto-reload only works with a single process, so it is a development-only mode
+    reload = debug and args.workers == 1
     
-    print(f"🚀 Starting AI News Chatbot API on http://{host}:{port}")
+    print(f"🚀 Starting AI News Chatbot API on http://{args.host}:{args.port}")
     print(f"📰 News API: {'✅ Connected' if env_news_api_key else '❌ Missing'}")
     print(f"🤖 Azure OpenAI: {'✅ Connected' if env_api_key else '❌ Missing'}")
+    print(f"⚙️  Mode: {'development (auto-reload)' if reload else f'{args.workers} worker process(es)'}")
     
-    uvicorn.run(app, host=host, port=port, reload=debug)
\ No newline at end of file
+    uvicorn.run("main:create_app", factory=True, host=args.host, port=args.port, workers=args.workers, reload=reload)
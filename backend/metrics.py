@@ -0,0 +1,142 @@
+#---------------DESCRIPTION📊-----------------------------
+# Lightweight in-process metrics for the FastAPI backend (main.py)
+#  - timing spans for each stage of a request (tool selection, news, scraping, ...)
+#  - prompt/completion token counters from response.usage
+#  - counters for upstream errors, gauges for cache hit ratios
+# Exposed in Prometheus text format at /metrics. The spans of the current
+# request are also returned as a Server-Timing header.
+# When disabled every call returns straight away.
+
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Seconds, tuned for calls that take from a few milliseconds to tens of seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30)
+
+# (name, milliseconds) pairs recorded during the current request
+_request_timings = ContextVar("request_timings", default=None)
+_NOOP = nullcontext()
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    """Counters, histograms and per-request spans"""
+
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+        self.gauge_sources = []
+
+    def describe(self, name, kind, text):
+        self.help[name] = (kind, text)
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [0] * len(self.buckets) + [0, 0.0]
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                histogram[i] += 1
+        histogram[-2] += 1
+        histogram[-1] += seconds
+
+    @contextmanager
+    def _span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe("stage_duration_seconds", elapsed, stage=stage)
+            timings = _request_timings.get()
+            if timings is not None:
+                timings.append((stage, elapsed * 1000))
+
+    def span(self, stage):
+        """Time a block as one stage of the current request"""
+        if not self.enabled:
+            return _NOOP
+        return self._span(stage)
+
+    def record_usage(self, stage, usage):
+        """Count prompt and completion tokens reported by the model"""
+        if not self.enabled or usage is None:
+            return
+        self.inc("llm_prompt_tokens_total", usage.prompt_tokens or 0, stage=stage)
+        self.inc("llm_completion_tokens_total", usage.completion_tokens or 0, stage=stage)
+
+    def add_gauges(self, source):
+        """Register a callable returning {(name, labels tuple): value} evaluated at scrape time"""
+        self.gauge_sources.append(source)
+
+    # ---------------- per request ----------------
+    def start_request(self):
+        return _request_timings.set([])
+
+    def request_timings(self):
+        """The list the current request's spans are appended to"""
+        return _request_timings.get()
+
+    def end_request(self, token):
+        timings = _request_timings.get()
+        _request_timings.reset(token)
+        return timings or []
+
+    @staticmethod
+    def server_timing(timings, total_ms=None):
+        """Format spans as a Server-Timing header value"""
+        parts = [f"{name};dur={ms:.1f}" for name, ms in timings]
+        if total_ms is not None:
+            parts.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(parts)
+
+    # ---------------- exposition ----------------
+    def render(self):
+        """Prometheus text exposition format"""
+        lines, seen = [], set()
+
+        def header(name, default_kind):
+            if name in seen:
+                return
+            seen.add(name)
+            kind, text = self.help.get(name, (default_kind, name.replace("_", " ")))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{_label_text(labels)} {value}")
+
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            header(name, "histogram")
+            # observe() already keeps the bucket counts cumulative
+            for bound, count in zip(self.buckets, histogram):
+                lines.append(f"{name}_bucket{_label_text(labels + (('le', bound),))} {count}")
+            lines.append(f"{name}_bucket{_label_text(labels + (('le', '+Inf'),))} {histogram[-2]}")
+            lines.append(f"{name}_count{_label_text(labels)} {histogram[-2]}")
+            lines.append(f"{name}_sum{_label_text(labels)} {histogram[-1]:.6f}")
+
+        for source in self.gauge_sources:
+            for (name, labels), value in sorted(source().items()):
+                header(name, "gauge")
+                lines.append(f"{name}{_label_text(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
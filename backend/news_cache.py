@@ -0,0 +1,208 @@
+#---------------DESCRIPTION🗃️-----------------------------
+# In-process cache in front of get_top_news (main.py)
+# Headlines barely change within minutes, but NewsAPI's free tier only
+# allows 100 requests per day, so every avoided upstream call counts.
+#  - entries are keyed on normalized (location, category, query)
+#  - each entry carries its own TTL, the least recently used entry is evicted
+#  - concurrent misses for the same key share one upstream call
+#  - expired entries are kept around and served when the quota runs low
+#    or when the upstream call fails
+#  - with a SharedCache (shared_cache.py) behind it, uvicorn workers share
+#    results and the quota count, and only one worker fetches a given key
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "expires_at")
+
+    def __init__(self, value, ttl):
+        self.stored_at = time.monotonic()
+        self.expires_at = self.stored_at + ttl
+        self.value = value
+
+
+class NewsCache:
+    """TTL + LRU cache with single-flight misses and NewsAPI quota tracking"""
+
+    def __init__(self, max_entries=256, headlines_ttl=600, query_ttl=1800,
+                 daily_quota=100, quota_reserve=10, stale_max_age=86400, shared=None, shared_wait=5):
+        self.max_entries = max_entries
+        self.headlines_ttl = headlines_ttl
+        self.query_ttl = query_ttl
+        self.daily_quota = daily_quota
+        self.quota_reserve = quota_reserve
+        self.stale_max_age = stale_max_age
+        self.shared = shared
+        # How long to wait for another worker's fetch of the same key before fetching ourselves
+        self.shared_wait = shared_wait
+
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._quota_day = None
+        self._quota_used = 0
+        self.counters = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,  # quota running low, an expired entry instead of a fetch
+            "stale_on_error": 0,  # the fetch failed, an expired entry instead of the error
+            "coalesced": 0,
+            "evictions": 0,
+            "upstream_errors": 0,
+            "shared_hits": 0,
+        }
+
+    @staticmethod
+    def make_key(location, category=None, query=None):
+        """Normalize the get_top_news arguments into a cache key"""
+        location = (location or "us").strip().lower()
+        query = " ".join(query.lower().split()) if query else None
+        # News API ignores the category when searching by keyword
+        category = None if query else (category.strip().lower() if category else None)
+        return (location, category, query)
+
+    def ttl_for(self, key):
+        """Keyword searches move slower than the headline lists"""
+        return self.query_ttl if key[2] else self.headlines_ttl
+
+    # ---------------- quota ----------------
+    def _roll_quota_day(self):
+        today = datetime.now(timezone.utc).date()
+        if today != self._quota_day:
+            self._quota_day = today
+            self._quota_used = 0
+
+    async def arecord_upstream_call(self, amount=1):
+        """Count requests against today's NewsAPI allowance, across workers with a shared cache (0 just syncs)"""
+        self._roll_quota_day()
+        if self.shared is None:
+            self._quota_used += amount
+            return
+        used = await self.shared.aincr(f"newsapi-quota:{self._quota_day.isoformat()}", amount)
+        self._quota_used = used if used is not None else self._quota_used + amount
+
+    def quota_remaining(self):
+        self._roll_quota_day()
+        return max(self.daily_quota - self._quota_used, 0)
+
+    def quota_low(self):
+        return self.quota_remaining() <= self.quota_reserve
+
+    # ---------------- cache ----------------
+    def _store(self, key, value, ttl):
+        self._entries[key] = _Entry(value, ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _usable_stale(self, entry):
+        return entry is not None and time.monotonic() - entry.stored_at <= self.stale_max_age
+
+    @staticmethod
+    def _shared_key(key):
+        return "news:" + json.dumps(key)
+
+    async def _from_shared(self, key):
+        """Copy a fresh entry from the shared cache into this worker, returns (value, stale_row)"""
+        row = await self.shared.aget(self._shared_key(key))
+        if row is None:
+            return None, None
+        value, stored_at, expires_at = row
+        if expires_at > time.time():
+            self.counters["shared_hits"] += 1
+            self._store(key, value, expires_at - time.time())
+            return value, None
+        return None, row
+
+    async def _fill(self, key, fetch, ttl):
+        if self.shared is None:
+            value = await fetch()
+            self._store(key, value, ttl)
+            return value
+
+        value, stale = await self._from_shared(key)
+        if value is not None:
+            return value
+        name = self._shared_key(key)
+        lease = "fetch:" + name
+        # Another worker is already fetching this key, wait for its result
+        if not await self.shared.aclaim(lease, self.shared_wait):
+            deadline = time.monotonic() + self.shared_wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+                value, stale = await self._from_shared(key)
+                if value is not None:
+                    return value
+        try:
+            value = await fetch()
+        except Exception:
+            # An expired copy from another worker still beats an error
+            if stale is not None and time.time() - stale[1] <= self.stale_max_age:
+                self.counters["upstream_errors"] += 1
+                self.counters["stale_on_error"] += 1
+                return stale[0]
+            raise
+        finally:
+            await self.shared.arelease(lease)
+        self._store(key, value, ttl)
+        await self.shared.aput(name, value, ttl)
+        return value
+
+    async def get_or_fetch(self, key, fetch, ttl=None):
+        """Return the cached value for `key`, calling `fetch()` at most once per miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if entry.expires_at > time.monotonic():
+                self.counters["hits"] += 1
+                return entry.value
+            if self.shared is not None:
+                # Other workers spend the quota too
+                await self.arecord_upstream_call(0)
+            if self.quota_low() and self._usable_stale(entry):
+                self.counters["stale_hits"] += 1
+                return entry.value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.counters["misses"] += 1
+            task = asyncio.ensure_future(self._fill(key, fetch, ttl or self.ttl_for(key)))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.counters["coalesced"] += 1
+
+        try:
+            # Shield so one cancelled caller doesn't cancel the shared fetch
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.counters["upstream_errors"] += 1
+            if self._usable_stale(entry):
+                self.counters["stale_on_error"] += 1
+                return entry.value
+            raise
+
+    def stats(self):
+        # Every get_or_fetch call is one lookup: a hit, a stale hit, a miss or a miss joining another
+        lookups = (self.counters["hits"] + self.counters["stale_hits"] + self.counters["misses"]
+                   + self.counters["coalesced"])
+        # A stale entry served after a failed fetch was already counted as that miss
+        served = (self.counters["hits"] + self.counters["stale_hits"] + self.counters["stale_on_error"]
+                  + self.counters["shared_hits"])
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "shared": self.shared is not None,
+            "quota_used": self._quota_used if self._quota_day else 0,
+            "quota_remaining": self.quota_remaining(),
+            "daily_quota": self.daily_quota,
+        }
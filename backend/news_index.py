@@ -0,0 +1,344 @@
+#---------------DESCRIPTION🔎-----------------------------
+# Local headline store with a BM25 full-text index (used by main.py)
+# A background job pulls top headlines for the configured countries and
+# categories. get_top_news then answers from this index before spending
+# NewsAPI quota.
+#
+# On-disk layout (one directory):
+#  - docs.jsonl        append-only article metadata, line number = doc id
+#  - feeds.json        latest doc ids per (country, category) and when they were pulled
+#  - manifest.json     list of live index segments
+#  - seg-N.terms       JSON map term -> [offset, count] into the postings file
+#  - seg-N.post        packed (doc id uint32, term frequency uint16) postings, memory-mapped
+# Each ingest only writes a segment for the new articles, so restarts
+# just map the existing files instead of re-indexing everything.
+# With several workers only the ingest leader writes; the others open the
+# directory with repair=False and reload it when version() changes.
+
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from datetime import datetime
+
+POSTING = struct.Struct("<IH")
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "he", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "to", "was", "were", "will", "with", "news", "latest",
+}
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords"""
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def published_ts(value):
+    """Parse NewsAPI's publishedAt into a unix timestamp (0 when unknown)"""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+class _Segment:
+    """One immutable, memory-mapped slice of the inverted index"""
+
+    def __init__(self, directory, name):
+        self.name = name
+        self.post_path = os.path.join(directory, f"{name}.post")
+        self.terms_path = os.path.join(directory, f"{name}.terms")
+        with open(self.terms_path, encoding="utf-8") as f:
+            self.terms = json.load(f)
+        self._file = open(self.post_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def postings(self, term):
+        entry = self.terms.get(term)
+        if entry is None or self._map is None:
+            return ()
+        offset, count = entry
+        return POSTING.iter_unpack(self._map[offset:offset + count * POSTING.size])
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    @staticmethod
+    def write(directory, name, docs):
+        """Build a segment for `docs` ((doc_id, tokens) pairs) and write it to disk"""
+        index = {}
+        for doc_id, tokens in docs:
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                index.setdefault(token, []).append((doc_id, min(tf, 0xFFFF)))
+
+        terms, offset = {}, 0
+        with open(os.path.join(directory, f"{name}.post"), "wb") as f:
+            for term in sorted(index):
+                postings = index[term]
+                f.write(b"".join(POSTING.pack(doc_id, tf) for doc_id, tf in postings))
+                terms[term] = [offset, len(postings)]
+                offset += len(postings) * POSTING.size
+        with open(os.path.join(directory, f"{name}.terms"), "w", encoding="utf-8") as f:
+            json.dump(terms, f, separators=(",", ":"))
+
+
+class NewsIndex:
+    """Incremental BM25 index over ingested headline titles and descriptions"""
+
+    def __init__(self, directory="news_index", k1=1.2, b=0.75, max_age_hours=48, max_segments=8, repair=True):
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self.max_age = max_age_hours * 3600
+        self.max_segments = max_segments
+
+        self._lock = threading.RLock()
+        self.docs = []         # doc id -> article dict
+        self.doc_lens = []     # doc id -> token count
+        self.total_len = 0
+        self.urls = {}         # url -> doc id
+        self.feeds = {}        # "country|category" -> {"doc_ids": [...], "fetched_at": ts}
+        self.segments = []
+        self._next_segment = 1
+        self._indexed = 0
+        self.loaded_version = None  # version() of the files this instance reflects
+        self.load(repair)
+
+    # ---------------- persistence ----------------
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _write_json(self, name, data):
+        # Write then rename so a crash never leaves a half-written file behind
+        tmp = self._path(name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self._path(name))
+
+    def load(self, repair=True):
+        """Map the existing segments and read the document store
+
+        repair=False only reads: documents past the manifest are left for the
+        writer to index, so another process can load while ingest is running.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            # The manifest is written after the documents, read it first so it never points past what we read
+            self.loaded_version = self.version()
+            if os.path.exists(self._path("manifest.json")):
+                with open(self._path("manifest.json"), encoding="utf-8") as f:
+                    manifest = json.load(f)
+                self.segments = [_Segment(self.directory, name) for name in manifest["segments"]]
+                self._next_segment = manifest["next_segment"]
+                indexed = manifest["indexed_docs"]
+            else:
+                indexed = 0
+            self._indexed = indexed
+            if os.path.exists(self._path("docs.jsonl")):
+                with open(self._path("docs.jsonl"), encoding="utf-8") as f:
+                    for line in f:
+                        if not repair and len(self.docs) >= indexed:
+                            break
+                        if line.strip():
+                            self._remember(json.loads(line))
+            if os.path.exists(self._path("feeds.json")):
+                with open(self._path("feeds.json"), encoding="utf-8") as f:
+                    self.feeds = json.load(f)
+
+            if not repair:
+                return
+            # A crash during compaction can leave segments pointing past the document store
+            if indexed > len(self.docs):
+                self._write_segment([(doc_id, self._doc_tokens(doc)) for doc_id, doc in enumerate(self.docs)], replace=True)
+            # Only index articles stored after the last segment was written (e.g. a crash mid-ingest)
+            elif indexed < len(self.docs):
+                self._write_segment([(doc_id, self._doc_tokens(self.docs[doc_id])) for doc_id in range(indexed, len(self.docs))])
+
+    def version(self):
+        """Changes whenever a writer commits an ingest or compaction"""
+        try:
+            return tuple(os.stat(self._path(name)).st_mtime_ns for name in ("manifest.json", "feeds.json"))
+        except OSError:
+            return None
+
+    def consistent(self):
+        """False when the document store was rewritten after the manifest was read (mid-compaction)"""
+        with self._lock:
+            return len(self.docs) == self._indexed
+
+    def close(self):
+        with self._lock:
+            for segment in self.segments:
+                segment.close()
+            self.segments = []
+
+    def _remember(self, doc):
+        tokens = self._doc_tokens(doc)
+        self.docs.append(doc)
+        self.doc_lens.append(len(tokens))
+        self.total_len += len(tokens)
+        self.urls[doc["url"]] = len(self.docs) - 1
+        return tokens
+
+    @staticmethod
+    def _doc_tokens(doc):
+        # Titles count twice, they carry most of the signal in a headline
+        return tokenize(doc["title"]) * 2 + tokenize(doc["description"])
+
+    def _save_manifest(self):
+        self._write_json("manifest.json", {
+            "segments": [segment.name for segment in self.segments],
+            "next_segment": self._next_segment,
+            "indexed_docs": len(self.docs),
+        })
+        self._indexed = len(self.docs)
+
+    def _write_segment(self, docs, replace=False):
+        name = f"seg-{self._next_segment:06d}"
+        _Segment.write(self.directory, name, docs)
+        self._next_segment += 1
+        segment = _Segment(self.directory, name)
+        self.segments = [segment] if replace else self.segments + [segment]
+        self._save_manifest()
+
+    # ---------------- ingest ----------------
+    def add_articles(self, articles, country, category=None):
+        """Store new NewsAPI articles, index them in a fresh segment and update the feed"""
+        with self._lock:
+            feed_ids, new_docs, lines = [], [], []
+            now = time.time()
+            for article in articles:
+                url = article.get("url")
+                if not url or not article.get("title") or article.get("title") == "[Removed]":
+                    continue
+                if url in self.urls:
+                    feed_ids.append(self.urls[url])
+                    continue
+                doc = {
+                    "url": url,
+                    "title": article.get("title"),
+                    "description": article.get("description") or "",
+                    "source": (article.get("source") or {}).get("name", "Unknown"),
+                    "publishedAt": article.get("publishedAt") or "",
+                    "country": country,
+                    "category": category,
+                    "ingested_at": now,
+                }
+                tokens = self._remember(doc)
+                doc_id = len(self.docs) - 1
+                feed_ids.append(doc_id)
+                new_docs.append((doc_id, tokens))
+                lines.append(json.dumps(doc) + "\n")
+
+            if new_docs:
+                with open(self._path("docs.jsonl"), "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+                self._write_segment(new_docs)
+
+            self.feeds[f"{country}|{category or ''}"] = {"doc_ids": feed_ids, "fetched_at": now}
+            self._write_json("feeds.json", self.feeds)
+            self.loaded_version = self.version()
+
+            if len(self.segments) > self.max_segments:
+                self.compact()
+            return len(new_docs)
+
+    def compact(self):
+        """Merge all segments into one and drop articles past the retention window"""
+        with self._lock:
+            cutoff = time.time() - self.max_age
+            keep = [doc for doc in self.docs if doc["ingested_at"] >= cutoff]
+            remap = {}
+            old_docs, old_segments = self.docs, self.segments
+
+            self.docs, self.doc_lens, self.total_len, self.urls = [], [], 0, {}
+            new_docs = []
+            for doc in keep:
+                remap[doc["url"]] = len(self.docs)
+                new_docs.append((len(self.docs), self._remember(doc)))
+
+            with open(self._path("docs.jsonl.tmp"), "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(doc) + "\n" for doc in keep)
+            os.replace(self._path("docs.jsonl.tmp"), self._path("docs.jsonl"))
+
+            # Point the feeds at the new doc ids, forgetting articles that aged out
+            for feed in self.feeds.values():
+                urls = [old_docs[doc_id]["url"] for doc_id in feed["doc_ids"]]
+                feed["doc_ids"] = [remap[url] for url in urls if url in remap]
+            self._write_json("feeds.json", self.feeds)
+
+            # Manifest last, readers treat it as the commit point
+            self._write_segment(new_docs, replace=True)
+            self.loaded_version = self.version()
+
+            for segment in old_segments:
+                segment.close()
+                for path in (segment.post_path, segment.terms_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    # ---------------- queries ----------------
+    def _fresh(self, doc, now):
+        return now - (published_ts(doc["publishedAt"]) or doc["ingested_at"]) <= self.max_age
+
+    def search(self, query, limit=5, min_match=0.5):
+        """BM25 search over title and description, newest wins ties"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            num_docs = len(self.docs)
+            if not num_docs:
+                return []
+            avg_len = self.total_len / num_docs
+            scores, matched = {}, {}
+            for term in terms:
+                postings = [p for segment in self.segments for p in segment.postings(term)]
+                if not postings:
+                    continue
+                idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings:
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lens[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+
+            # Require a share of the query terms so single common words don't match
+            needed = max(1, math.ceil(len(terms) * min_match))
+            now = time.time()
+            hits = [
+                (score, published_ts(self.docs[doc_id]["publishedAt"]), doc_id)
+                for doc_id, score in scores.items()
+                if matched[doc_id] >= needed and self._fresh(self.docs[doc_id], now)
+            ]
+            hits.sort(reverse=True)
+            return [self.docs[doc_id] for _, _, doc_id in hits[:limit]]
+
+    def headlines(self, country, category=None, max_age=3600):
+        """Latest ingested headlines for a feed, or None when it is missing or stale"""
+        with self._lock:
+            feed = self.feeds.get(f"{country}|{category or ''}")
+            if not feed or time.time() - feed["fetched_at"] > max_age:
+                return None
+            # A reader may have loaded a feed written just after its manifest
+            return [self.docs[doc_id] for doc_id in feed["doc_ids"] if doc_id < len(self.docs)]
+
+    def stats(self):
+        return {
+            "documents": len(self.docs),
+            "segments": len(self.segments),
+            "feeds": len(self.feeds),
+        }
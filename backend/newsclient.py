@@ -0,0 +1,68 @@
+#---------------DESCRIPTION📡-----------------------------
+# Async News API client used by the FastAPI backend (main.py)
+# Mirrors the get_top_headlines / get_everything calls of newsapi-python,
+# but runs on httpx so a slow NewsAPI response never blocks the event loop
+
+import httpx
+
+NEWS_API_URL = "https://newsapi.org/v2"
+
+
+class NewsAPIError(Exception):
+    """Raised when News API answers with an error status"""
+
+    def __init__(self, payload):
+        self.payload = payload
+        super().__init__(payload.get("message") or payload.get("code") or "News API error")
+
+    @property
+    def code(self):
+        return self.payload.get("code")
+
+
+class AsyncNewsApiClient:
+    """Minimal async client for the News API v2 endpoints the chatbot uses"""
+
+    def __init__(self, api_key, base_url=NEWS_API_URL, timeout=10.0, http=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        # Shared http_pool.HttpPool; without one every call opens its own connection
+        self.http = http
+
+    async def _get(self, path, params):
+        # Drop unset parameters so News API applies its own defaults
+        params = {k: v for k, v in params.items() if v is not None}
+        headers = {"X-Api-Key": self.api_key or ""}
+
+        url = f"{self.base_url}/{path}"
+        if self.http is not None:
+            response = await self.http.client.get(url, params=params, headers=headers, timeout=self.timeout)
+        else:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.get(url, params=params, headers=headers)
+
+        payload = response.json()
+        if response.status_code != 200 or payload.get("status") != "ok":
+            raise NewsAPIError(payload)
+        return payload
+
+    async def get_top_headlines(self, country=None, category=None, q=None, page_size=None, page=None):
+        """Get breaking headlines for a country and/or category"""
+        return await self._get("top-headlines", {
+            "country": country,
+            "category": category,
+            "q": q,
+            "pageSize": page_size,
+            "page": page,
+        })
+
+    async def get_everything(self, q=None, language=None, sort_by=None, page_size=None, page=None):
+        """Search every article News API has indexed for a keyword or phrase"""
+        return await self._get("everything", {
+            "q": q,
+            "language": language,
+            "sortBy": sort_by,
+            "pageSize": page_size,
+            "page": page,
+        })
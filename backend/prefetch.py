@@ -0,0 +1,99 @@
+#---------------DESCRIPTION🔮-----------------------------
+# Speculative article summaries for /api/summarize (main.py)
+# When /api/chat returns articles, the top ones are queued here and a few
+# background workers scrape and summarize them before the user clicks.
+#  - one summary per URL at a time: a click on an article that is already
+#    being summarized waits for that run instead of starting another one
+#  - the queue is a PriorityQueue: higher-ranked articles from newer chat
+#    turns go first
+#  - speculation backs off when busy: new articles are dropped while the
+#    queue is full and queued ones are skipped while too many summaries run
+
+import asyncio
+import itertools
+
+
+class SummaryPrefetcher:
+    """Single-flight summaries per URL plus an optional background prefetch queue"""
+
+    def __init__(self, summarize, enabled=False, workers=2, max_queue=20, max_inflight=8):
+        self.summarize_fn = summarize
+        self.enabled = enabled
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_inflight = max_inflight
+        self.queue = asyncio.PriorityQueue(maxsize=max_queue)
+        self.inflight = {}
+        self._order = itertools.count()
+        self._tasks = []
+        self.counters = {"queued": 0, "prefetched": 0, "dropped": 0, "skipped": 0, "joined": 0, "errors": 0}
+
+    async def summarize(self, article, background=False):
+        """Summary payload for `article`, sharing any run already in progress for its URL"""
+        url = article.get("url")
+        if not url:
+            # Nothing to share a run by, articles without a URL would all join the first one
+            return await self.summarize_fn(article, background=background)
+        task = self.inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self.summarize_fn(article, background=background))
+            self.inflight[url] = task
+            task.add_done_callback(lambda done: self._finished(url, done))
+        else:
+            self.counters["joined"] += 1
+        # A cancelled request must not cancel the run other requests are waiting on
+        return await asyncio.shield(task)
+
+    def _finished(self, url, task):
+        if self.inflight.get(url) is task:
+            del self.inflight[url]
+        # Mark the error as seen when every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def schedule(self, articles):
+        """Queue articles for speculative summaries, highest ranked first"""
+        if not self.enabled:
+            return
+        turn = next(self._order)
+        for rank, article in enumerate(articles):
+            if not article.get("url") or article["url"] in self.inflight:
+                continue
+            try:
+                # Newer turns sort before older ones with the same rank
+                self.queue.put_nowait((rank, -turn, next(self._order), article))
+                self.counters["queued"] += 1
+            except asyncio.QueueFull:
+                self.counters["dropped"] += len(articles) - rank
+                return
+
+    async def _worker(self):
+        while True:
+            _, _, _, article = await self.queue.get()
+            try:
+                if len(self.inflight) >= self.max_inflight:
+                    # Leave the capacity to requests users are waiting on
+                    self.counters["skipped"] += 1
+                    continue
+                await self.summarize(article, background=True)
+                self.counters["prefetched"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["errors"] += 1
+                print(f"Prefetch error for {article.get('url')}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def start(self):
+        if self.enabled and not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self):
+        return {**self.counters, "queue": self.queue.qsize(), "inflight": len(self.inflight)}
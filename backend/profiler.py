@@ -0,0 +1,231 @@
+#---------------DESCRIPTION🔬-----------------------------
+# Slow-request traces and an on-demand sampling profiler (main.py, /admin/*)
+#  - SlowRequestMiddleware traces every request: its shape (JSON keys and
+#    sizes, never the text), the stage timings from metrics.py and every
+#    upstream call recorded with record_call() (model, NewsAPI, scraping with
+#    parse vs network time). Requests slower than the threshold are kept in a
+#    ring buffer, the rest are dropped when they finish.
+#  - SamplingProfiler samples the stack of every thread at a fixed wall-clock
+#    interval from a background thread and returns the counts as collapsed
+#    stacks ("frame;frame;frame count" lines), which flamegraph.pl, speedscope
+#    and inferno read as is. The event loop waiting in select() shows up too,
+#    so idle time is visible next to the hot spots.
+# Both are per worker: with --workers N each call lands on one of them.
+
+import json
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+# Upstream calls kept per trace, a runaway loop must not grow it without bound
+MAX_CALLS = 200
+# Request bodies are read up to this size to describe their shape
+MAX_BODY_BYTES = 65536
+
+_trace = ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    __slots__ = ("started", "calls")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.calls = []
+
+
+def record_call(upstream, seconds, **fields):
+    """Add one upstream call to the current request's trace, does nothing outside a traced request"""
+    trace = _trace.get()
+    if trace is None or len(trace.calls) >= MAX_CALLS:
+        return
+    started = time.perf_counter() - seconds - trace.started
+    trace.calls.append({"upstream": upstream, "start_ms": round(started * 1000, 1),
+                        "ms": round(seconds * 1000, 1), **fields})
+
+
+def tracing():
+    """Whether the current request is being traced, to skip measuring payloads nobody will read"""
+    return _trace.get() is not None
+
+
+def shape(value, depth=0):
+    """Structure of a JSON value without its content: {"message": "str[42]", "conversation_history": "list[6]"}"""
+    if isinstance(value, dict):
+        if depth >= 2:
+            return f"dict[{len(value)}]"
+        return {key: shape(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, list):
+        return f"list[{len(value)}]"
+    if isinstance(value, str):
+        return f"str[{len(value)}]"
+    return type(value).__name__
+
+
+class SlowRequestLog:
+    """The last `capacity` requests that took at least `threshold_ms`"""
+
+    def __init__(self, threshold_ms=2000, capacity=100):
+        self.threshold_ms = threshold_ms
+        self.entries = deque(maxlen=capacity)
+        self.counters = {"traced": 0, "captured": 0}
+
+    def add(self, entry):
+        self.entries.append(entry)
+        self.counters["captured"] += 1
+
+    def recent(self, limit=None):
+        """Newest first"""
+        entries = list(reversed(self.entries))
+        return entries if limit is None else entries[:limit]
+
+    def stats(self):
+        return {**self.counters, "kept": len(self.entries), "threshold_ms": self.threshold_ms}
+
+
+class SlowRequestMiddleware:
+    """Trace every HTTP request and keep the slow ones in a SlowRequestLog
+
+    Plain ASGI like main.TimingMiddleware. Install it inside TimingMiddleware so
+    the stage timings of the request are visible here.
+    """
+
+    def __init__(self, app, log, timings=None, skip_prefixes=("/admin",)):
+        self.app = app
+        self.log = log
+        # Returns the (stage, ms) list of the current request, metrics.request_timings
+        self.timings = timings
+        self.skip_prefixes = skip_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send)
+            return
+        trace = RequestTrace()
+        token = _trace.set(trace)
+        self.log.counters["traced"] += 1
+        body = bytearray()
+        body_size = 0
+        response = {"status": None, "ttfb_ms": None, "bytes": 0}
+
+        async def receive_and_keep():
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                body_size += len(chunk)
+                body.extend(chunk[:MAX_BODY_BYTES - len(body)])
+            return message
+
+        async def send_and_measure(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["ttfb_ms"] = round((time.perf_counter() - trace.started) * 1000, 1)
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive_and_keep, send_and_measure)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _trace.reset(token)
+            elapsed_ms = (time.perf_counter() - trace.started) * 1000
+            if elapsed_ms >= self.log.threshold_ms:
+                self.log.add(self._entry(scope, trace, elapsed_ms, bytes(body), body_size, response, error))
+
+    def _entry(self, scope, trace, elapsed_ms, body, body_size, response, error):
+        if body_size > len(body):
+            request_shape = "truncated"
+        else:
+            try:
+                request_shape = shape(json.loads(body)) if body else None
+            except ValueError:
+                request_shape = "not json"
+        scrapes = [call for call in trace.calls if call["upstream"] == "scrape"]
+        timings = self.timings() if self.timings is not None else None
+        return {
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": response["status"],
+            "duration_ms": round(elapsed_ms, 1),
+            "ttfb_ms": response["ttfb_ms"],
+            "request": {"bytes": body_size, "shape": request_shape},
+            "response_bytes": response["bytes"],
+            "stages": [{"stage": name, "ms": round(ms, 1)} for name, ms in timings or []],
+            "upstream_calls": trace.calls,
+            # Where scraping time went: lxml parsing on the event loop vs waiting on the site
+            "scrape_parse_ms": round(sum(call.get("parse_ms", 0) for call in scrapes), 1),
+            "scrape_network_ms": round(sum(call.get("network_ms", 0) for call in scrapes), 1),
+            "error": error,
+        }
+
+
+def _frame_label(code):
+    """'rank (extractive.py:90)'; libraries relative to their folder: 'send (httpx/_client.py:879)'"""
+    path = code.co_filename.replace("\\", "/")
+    lowered = path.lower()
+    if "site-packages/" in lowered:
+        filename = path[lowered.rindex("site-packages/") + len("site-packages/"):]
+    elif "/lib/" in lowered:
+        filename = path[lowered.rindex("/lib/") + len("/lib/"):]
+        if filename.lower().startswith("python"):
+            filename = filename.split("/", 1)[-1]
+    else:
+        filename = path.rsplit("/", 1)[-1]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Wall-clock sampling of every thread's stack, aggregated as collapsed stacks"""
+
+    def __init__(self, interval=0.01, max_depth=80):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self.sample_count = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        started = time.perf_counter()
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if frames.keys() - names.keys():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                # Code objects only while sampling, they are turned into text once at the end
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                self.samples[(names.get(ident, str(ident)), tuple(stack))] += 1
+            self.sample_count += 1
+        self.elapsed = time.perf_counter() - started
+
+    def collapsed(self):
+        """Collapsed stack lines, root frame first, e.g. 'MainThread;run (base_events.py:1);... 12'"""
+        lines = Counter()
+        for (thread, stack), count in self.samples.items():
+            lines[";".join([thread, *(_frame_label(code) for code in reversed(stack))])] += count
+        return "".join(f"{line} {count}\n" for line, count in lines.most_common())
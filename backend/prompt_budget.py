@@ -0,0 +1,126 @@
+#---------------DESCRIPTION✂️-----------------------------
+# Token-aware prompt building for the chat endpoints (main.py)
+#  - counts tokens with tiktoken when it is installed, otherwise estimates
+#    them from the text length (about 4 characters per token)
+#  - projects news tool results down to the fields the model reads
+#  - fits conversation history into a token budget: the newest turns are
+#    kept verbatim, older ones are folded into one short recap message
+
+import json
+
+try:
+    import tiktoken
+except ImportError:  # Optional, the estimate is close enough for budgeting
+    tiktoken = None
+
+# Fixed cost the chat format adds to every message (role, separators)
+MESSAGE_OVERHEAD = 4
+# Fields of a get_top_news article the model needs to answer about it
+ARTICLE_FIELDS = ("title", "source", "description")
+
+_encoding = None
+
+
+def count_tokens(text):
+    """Number of tokens in `text`"""
+    global _encoding
+    if not text:
+        return 0
+    if tiktoken is not None:
+        if _encoding is None:
+            try:
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def token_counter():
+    """Which counter count_tokens uses, logged on startup"""
+    if tiktoken is None:
+        return "length estimate (about 4 characters per token, pip install tiktoken for exact counts)"
+    return "tiktoken"
+
+
+def message_tokens(message):
+    tokens = MESSAGE_OVERHEAD + count_tokens(message.get("content") or "")
+    for call in message.get("tool_calls") or []:
+        function = call.get("function") or {}
+        tokens += count_tokens(function.get("name", "")) + count_tokens(function.get("arguments", ""))
+    return tokens
+
+
+def messages_tokens(messages):
+    return sum(message_tokens(m) for m in messages)
+
+
+def clip(text, max_chars):
+    """Shorten `text` to about `max_chars`, cutting at a word boundary"""
+    text = " ".join((text or "").split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + "…"
+
+
+def project_articles(articles, description_chars=200):
+    """Compact JSON of the article fields the model needs, without ids, urls or dates"""
+    projected = []
+    for article in articles:
+        item = {}
+        for field in ARTICLE_FIELDS:
+            value = article.get(field)
+            if field == "source" and isinstance(value, dict):
+                value = value.get("name")
+            if field == "source" and len(article.get("sources") or ()) > 1:
+                # Collapsed duplicates: the model can say how widely a story is covered
+                sources = article["sources"]
+                value = ", ".join(sources[:3]) + (f" +{len(sources) - 3} more" if len(sources) > 3 else "")
+            if field == "description":
+                value = clip(value, description_chars)
+            if value:
+                item[field] = value
+        projected.append(item)
+    return json.dumps(projected, ensure_ascii=False, separators=(",", ":"))
+
+
+def recap(turns, max_chars=400):
+    """One-message recap of dropped turns: what the user asked about, oldest first"""
+    asked = [clip(t["content"], 80) for t in turns if t["role"] == "user"]
+    if not asked:
+        return None
+    text = "Earlier in this conversation the user asked: " + "; ".join(asked)
+    return {"role": "system", "content": clip(text, max_chars)}
+
+
+def fit_history(history, budget):
+    """Keep the newest turns that fit in `budget` tokens, returns (messages, dropped turns)
+
+    Dropped turns are replaced by a recap when the recap itself still fits.
+    """
+    kept, used = [], 0
+    for index in range(len(history) - 1, -1, -1):
+        tokens = message_tokens(history[index])
+        if used + tokens > budget:
+            dropped = history[:index + 1]
+            summary = recap(dropped)
+            if summary and used + message_tokens(summary) <= budget:
+                kept.append(summary)
+            return kept[::-1], len(dropped)
+        kept.append(history[index])
+        used += tokens
+    return kept[::-1], 0
+
+
+def fit_messages(messages, budget):
+    """Fit the history between the system prompt and the current user turn into `budget` tokens
+
+    `messages` is [system, *history, current user message, *tool turns]; the
+    system prompt and everything from the current user message on are kept.
+    Returns (messages, number of dropped history turns).
+    """
+    current = max((i for i, m in enumerate(messages) if m["role"] == "user"), default=len(messages))
+    head, history, tail = messages[:1], messages[1:current], messages[current:]
+    remaining = budget - messages_tokens(head) - messages_tokens(tail)
+    history, dropped = fit_history(history, max(remaining, 0))
+    return head + history + tail, dropped
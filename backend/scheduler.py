@@ -0,0 +1,193 @@
+#---------------DESCRIPTION🚦-----------------------------
+# Rate and quota scheduler for outbound calls (main.py)
+# Every call to NewsAPI and Azure OpenAI first takes permits from its
+# upstream's token buckets, e.g. requests/day for NewsAPI or requests and
+# tokens/minute for Azure.
+#  - callers wait in a priority queue: interactive chat first, then summaries,
+#    then background work (ingest, prefetch)
+#  - each priority has a longest acceptable wait; when the buckets can't
+#    refill in time the call is shed with RateLimited (-> 429 + Retry-After)
+#    instead of failing deep inside the request
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+
+PRIORITIES = {"interactive": 0, "summary": 1, "background": 2}
+
+
+class RateLimited(Exception):
+    """An upstream has no capacity left within the caller's deadline"""
+
+    def __init__(self, upstream, retry_after):
+        self.upstream = upstream
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"{upstream} rate limit reached, retry in {self.retry_after}s")
+
+
+class TokenBucket:
+    """`capacity` permits, refilled continuously at `rate` permits per second"""
+
+    def __init__(self, capacity, rate):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` permits are available"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+    def available(self, now):
+        self._refill(now)
+        return self.tokens
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _Upstream:
+    def __init__(self, name):
+        self.name = name
+        self.buckets = {}
+        self.waiters = []
+        self.timer = None
+        self.counters = {"granted": 0, "waited": 0, "shed": 0}
+
+
+class Scheduler:
+    """Token buckets per upstream with a priority queue of waiting calls"""
+
+    def __init__(self, max_wait=None):
+        # Longest wait per priority class before a call is shed
+        self.max_wait = {"interactive": 3.0, "summary": 10.0, "background": 60.0, **(max_wait or {})}
+        self.upstreams = {}
+        self._order = itertools.count()
+
+    def register(self, upstream, resource, capacity, per_seconds, burst=None):
+        """Allow `capacity` units of `resource` per `per_seconds`, e.g. ("newsapi", "requests", 100, 86400)
+
+        `burst` caps how many can be used at once (defaults to the whole allowance).
+        """
+        if not capacity:
+            return
+        state = self.upstreams.setdefault(upstream, _Upstream(upstream))
+        state.buckets[resource] = TokenBucket(burst or capacity, capacity / per_seconds)
+
+    def _wait_time(self, state, cost, now):
+        return max((state.buckets[r].wait_time(n, now) for r, n in cost.items() if r in state.buckets), default=0.0)
+
+    def _take(self, state, cost):
+        for resource, amount in cost.items():
+            if resource in state.buckets:
+                state.buckets[resource].take(amount)
+
+    async def acquire(self, upstream, priority="interactive", **cost):
+        """Wait for permits, e.g. acquire("azure_openai", requests=1, tokens=900)
+
+        Raises RateLimited when they can't be granted within the priority's max wait.
+        """
+        state = self.upstreams.get(upstream)
+        if state is None:
+            return
+        now = time.monotonic()
+        # Go straight through when nobody is queued ahead and the buckets have room
+        if not state.waiters and self._wait_time(state, cost, now) == 0:
+            self._take(state, cost)
+            state.counters["granted"] += 1
+            return
+
+        # Calls of the same or higher priority already queued go first
+        deadline = self.max_wait[priority]
+        ahead = dict(cost)
+        for rank, _, queued, future in state.waiters:
+            if rank <= PRIORITIES[priority] and not future.done():
+                for resource, amount in queued.items():
+                    ahead[resource] = ahead.get(resource, 0) + amount
+        estimate = self._wait_time(state, ahead, now)
+        if estimate > deadline:
+            state.counters["shed"] += 1
+            raise RateLimited(upstream, estimate)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [PRIORITIES[priority], next(self._order), cost, future]
+        heapq.heappush(state.waiters, entry)
+        state.counters["waited"] += 1
+        self._dispatch(state)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=deadline)
+        except asyncio.TimeoutError:
+            self._remove(state, entry)
+            state.counters["shed"] += 1
+            raise RateLimited(upstream, self._wait_time(state, cost, time.monotonic()) or 1)
+        except asyncio.CancelledError:
+            self._remove(state, entry)
+            raise
+
+    def _remove(self, state, entry):
+        future = entry[3]
+        if future.done() and not future.cancelled():
+            # Granted just as the caller gave up, return the permits
+            for resource, amount in entry[2].items():
+                if resource in state.buckets:
+                    state.buckets[resource].give_back(amount)
+            return
+        future.cancel()
+        if entry in state.waiters:
+            state.waiters.remove(entry)
+            heapq.heapify(state.waiters)
+        self._dispatch(state)
+
+    def _dispatch(self, state):
+        """Grant permits to waiters in priority order, then sleep until the head can go"""
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        while state.waiters:
+            _, _, cost, future = state.waiters[0]
+            if future.done():
+                heapq.heappop(state.waiters)
+                continue
+            wait = self._wait_time(state, cost, time.monotonic())
+            if wait > 0:
+                if math.isfinite(wait):
+                    state.timer = asyncio.get_running_loop().call_later(wait, self._dispatch, state)
+                return
+            heapq.heappop(state.waiters)
+            self._take(state, cost)
+            state.counters["granted"] += 1
+            future.set_result(None)
+
+    def settle(self, upstream, resource, estimated, actual):
+        """Correct a reservation once the real usage is known (e.g. tokens from response.usage)"""
+        state = self.upstreams.get(upstream)
+        if state is None or resource not in state.buckets:
+            return
+        bucket = state.buckets[resource]
+        if actual < estimated:
+            bucket.give_back(estimated - actual)
+        else:
+            bucket.tokens -= actual - estimated
+
+    def stats(self):
+        return {
+            name: {
+                **state.counters,
+                "queued": len(state.waiters),
+                "available": {r: round(b.available(time.monotonic()), 1) for r, b in state.buckets.items()},
+            }
+            for name, state in self.upstreams.items()
+        }
@@ -0,0 +1,184 @@
+#---------------DESCRIPTION💬-----------------------------
+# Server-side chat sessions for /api/chat (main.py)
+# The client sends a session id and only its new message; the history is kept
+# here as ready-to-send model messages, so request bodies and the work per
+# request stay the same size however long the conversation gets.
+#  - bounded by number of sessions and total bytes, least recently used first
+#  - sessions idle for longer than idle_ttl are evicted
+#  - evicted sessions are optionally spilled to disk and reloaded on next use
+#  - shared=True writes every turn to the spill folder, so with several
+#    uvicorn workers a session continues on whichever worker gets the request
+
+import json
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+
+# Session ids are generated here; anything else is rejected before touching the disk
+SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class Session:
+    def __init__(self, session_id, messages=None, last_used=None):
+        self.id = session_id
+        self.messages = messages or []
+        self.last_used = last_used or time.time()
+        self.size = sum(len(m["content"]) for m in self.messages)
+        self.synced = None  # mtime of the spill file this copy matches
+
+    def append(self, role, content, max_messages):
+        """Add one turn, keeping at most `max_messages` turns"""
+        self.messages.append({"role": role, "content": content})
+        self.size += len(content)
+        while len(self.messages) > max_messages:
+            self.size -= len(self.messages.pop(0)["content"])
+
+
+class SessionStore:
+    """LRU of chat sessions with idle eviction and an optional disk spill"""
+
+    def __init__(self, max_sessions=1000, max_bytes=20_000_000, idle_ttl=3600, max_messages=20,
+                 spill_dir=None, spill_max_age=7 * 86400, shared=False):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.max_messages = max_messages
+        self.spill_dir = spill_dir
+        self.spill_max_age = spill_max_age
+        # Sharing goes through the spill folder
+        self.shared = shared and bool(spill_dir)
+        self.total_bytes = 0
+        self._sessions = OrderedDict()
+        self.counters = {"created": 0, "hits": 0, "restored": 0, "evictions": 0, "spilled": 0}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def get(self, session_id=None):
+        """Return the session for `session_id`, or a new one when it is missing or unknown"""
+        now = time.time()
+        self._evict_idle(now)
+
+        session = None
+        if session_id and SESSION_ID.match(session_id):
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self.total_bytes -= session.size
+                if self.shared and self._changed_on_disk(session):
+                    # Another worker took a turn since, its copy wins
+                    session = self._restore(session_id) or session
+                else:
+                    self.counters["hits"] += 1
+            else:
+                session = self._restore(session_id)
+        if session is None:
+            session = Session(uuid.uuid4().hex)
+            self.counters["created"] += 1
+
+        session.last_used = now
+        self._sessions[session.id] = session
+        self.total_bytes += session.size
+        return session
+
+    def record(self, session, user_message, assistant_message):
+        """Append a finished turn to the session"""
+        self.total_bytes -= session.size
+        session.append("user", user_message, self.max_messages)
+        if assistant_message:
+            session.append("assistant", assistant_message, self.max_messages)
+        self.total_bytes += session.size
+        session.last_used = time.time()
+        if self.shared:
+            self._spill(session)
+        if session.id in self._sessions:
+            self._sessions.move_to_end(session.id)
+            self._evict_over_limit()
+
+    def _evict_idle(self, now):
+        # Oldest first, so stop at the first session that is still active
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used < self.idle_ttl:
+                break
+            self._evict(session.id)
+
+    def _evict_over_limit(self):
+        # Never evict the session that was just used
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or self.total_bytes > self.max_bytes):
+            self._evict(next(iter(self._sessions)))
+
+    def _evict(self, session_id):
+        session = self._sessions.pop(session_id)
+        self.total_bytes -= session.size
+        self.counters["evictions"] += 1
+        if not self.shared:
+            self._spill(session)
+
+    # ---------------- disk spill ----------------
+    def _path(self, session_id):
+        return os.path.join(self.spill_dir, f"{session_id}.json")
+
+    def _spill(self, session):
+        if not self.spill_dir or not session.messages:
+            return
+        try:
+            tmp = self._path(session.id) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"messages": session.messages, "last_used": session.last_used}, f)
+            os.replace(tmp, self._path(session.id))
+            session.synced = os.stat(self._path(session.id)).st_mtime_ns
+            self.counters["spilled"] += 1
+        except OSError as e:
+            print(f"Session spill error: {e}")
+
+    def _restore(self, session_id):
+        if not self.spill_dir:
+            return None
+        path = self._path(session_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                synced = os.fstat(f.fileno()).st_mtime_ns
+                data = json.load(f)
+            # Shared files stay for the other workers
+            if not self.shared:
+                os.remove(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Session restore error: {e}")
+            return None
+        if time.time() - data.get("last_used", 0) > self.spill_max_age:
+            return None
+        self.counters["restored"] += 1
+        session = Session(session_id, data["messages"][-self.max_messages:], data.get("last_used"))
+        session.synced = synced
+        return session
+
+    def _changed_on_disk(self, session):
+        try:
+            return os.stat(self._path(session.id)).st_mtime_ns != session.synced
+        except OSError:
+            return False
+
+    def prune_spill(self):
+        """Delete spilled sessions older than spill_max_age"""
+        if not self.spill_dir:
+            return 0
+        removed, cutoff = 0, time.time() - self.spill_max_age
+        for name in os.listdir(self.spill_dir):
+            path = os.path.join(self.spill_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def stats(self):
+        return {
+            **self.counters,
+            "sessions": len(self._sessions),
+            "bytes": self.total_bytes,
+        }
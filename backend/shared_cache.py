@@ -0,0 +1,177 @@
+#---------------DESCRIPTION🤝-----------------------------
+# Cross-process cache for uvicorn workers on one host (main.py)
+# Each worker keeps its own in-memory caches; this SQLite file (WAL mode) sits
+# behind them so N workers still make one upstream call per miss:
+#  - entries: JSON values with an expiry, e.g. NewsAPI results
+#  - leases: "I'm fetching this" / "I'm the ingest leader" markers that expire
+#    on their own if the worker holding them dies
+#  - counters: shared tallies such as today's NewsAPI quota usage
+# Times are wall-clock (time.time()) because monotonic clocks differ per process.
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def worker_id():
+    """Identifies this process as a lease owner"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SharedCache:
+    """Small SQLite key/value store with TTLs, leases and counters"""
+
+    def __init__(self, path="shared_cache.db", stale_max_age=86400, prune_every=200):
+        self.path = path
+        self.stale_max_age = stale_max_age
+        self.prune_every = prune_every
+        self.owner = worker_id()
+
+        self._local = threading.local()
+        self._puts = 0
+        self.counters = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    def _conn(self):
+        # sqlite3 connections can't hop threads, keep one per worker thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # ---------------- entries ----------------
+    def get(self, key):
+        """(value, stored_at, expires_at) for `key`, expired entries included; None when missing"""
+        try:
+            row = self._conn().execute(
+                "SELECT value, stored_at, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            print(f"Shared cache read error: {e}")
+            return None
+        if row is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits" if row[2] > time.time() else "misses"] += 1
+        return json.loads(row[0]), row[1], row[2]
+
+    def put(self, key, value, ttl):
+        try:
+            now = time.time()
+            self._conn().execute(
+                "INSERT OR REPLACE INTO entries (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now + ttl),
+            )
+            self.counters["writes"] += 1
+            self._puts += 1
+            if self._puts % self.prune_every == 0:
+                self.prune()
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            print(f"Shared cache write error: {e}")
+
+    # ---------------- leases ----------------
+    def claim(self, name, ttl, owner=None):
+        """Take (or renew) the lease `name` for `ttl` seconds; False while another owner holds it"""
+        owner = owner or self.owner
+        conn = self._conn()
+        try:
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+                if row is not None and row[0] != owner and row[1] > now:
+                    return False
+                conn.execute("INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)",
+                             (name, owner, now + ttl))
+                return True
+            finally:
+                conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            print(f"Shared cache lease error: {e}")
+            # Without the shared file every worker just does the work itself
+            return True
+
+    def release(self, name, owner=None):
+        try:
+            self._conn().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner or self.owner))
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            print(f"Shared cache lease error: {e}")
+
+    # ---------------- counters ----------------
+    def incr(self, name, amount=1, ttl=2 * 86400):
+        """Add `amount` to a shared counter and return the new value"""
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("INSERT OR IGNORE INTO counters (name, value, expires_at) VALUES (?, 0, ?)",
+                             (name, time.time() + ttl))
+                conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (amount, name))
+                return conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()[0]
+            finally:
+                conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            print(f"Shared cache counter error: {e}")
+            return None
+
+    def prune(self):
+        """Drop entries too old to serve even as stale, and expired leases and counters"""
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM entries WHERE expires_at < ?", (now - self.stale_max_age,))
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            conn.execute("DELETE FROM counters WHERE expires_at < ?", (now,))
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            print(f"Shared cache prune error: {e}")
+
+    def stats(self):
+        return {**self.counters, "path": self.path}
+
+    # ---------------- async wrappers ----------------
+    async def aget(self, key):
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key, value, ttl):
+        await asyncio.to_thread(self.put, key, value, ttl)
+
+    async def aclaim(self, name, ttl, owner=None):
+        return await asyncio.to_thread(self.claim, name, ttl, owner)
+
+    async def arelease(self, name, owner=None):
+        await asyncio.to_thread(self.release, name, owner)
+
+    async def aincr(self, name, amount=1, ttl=2 * 86400):
+        return await asyncio.to_thread(self.incr, name, amount, ttl)
@@ -0,0 +1,177 @@
+#---------------DESCRIPTION💾-----------------------------
+# Persistent summary cache for /api/summarize (main.py)
+# Summaries live in a SQLite file on local disk so they survive restarts.
+# WAL mode lets several uvicorn workers read and write the same file.
+#  - key = sha256(url + prompt variant + hash of the text sent to the model)
+#  - a fresh summary for the same URL is served without re-scraping
+#  - entries are evicted by age, then least recently used by count/size
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    used_full_content INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_summaries_url ON summaries (url, created_at);
+CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries (accessed_at);
+"""
+
+# Don't rewrite accessed_at on every hit, a minute of precision is plenty for LRU
+TOUCH_INTERVAL = 60
+
+
+class SummaryStore:
+    """SQLite-backed summary cache shared by every worker on the host"""
+
+    def __init__(self, path="summary_cache.db", max_entries=5000, max_bytes=50_000_000,
+                 max_age=7 * 86400, url_fresh_seconds=3600, prune_every=50):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.url_fresh_seconds = url_fresh_seconds
+        self.prune_every = prune_every
+
+        self._local = threading.local()
+        self._puts = 0
+        self.counters = {"hits": 0, "url_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(url, content, variant):
+        """Hash the URL, prompt variant and summarized text into one key"""
+        content_hash = hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{url}\n{variant}\n{content_hash}".encode("utf-8")).hexdigest()
+
+    def _conn(self):
+        # sqlite3 connections can't hop threads, keep one per worker thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _row_to_result(self, row, now):
+        if now - row["accessed_at"] > TOUCH_INTERVAL:
+            self._conn().execute("UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, row["key"]))
+        return {"summary": row["summary"], "used_full_content": bool(row["used_full_content"])}
+
+    def get(self, key):
+        """Look up a summary by its full key"""
+        try:
+            now = time.time()
+            row = self._conn().execute(
+                "SELECT * FROM summaries WHERE key = ? AND created_at >= ?",
+                (key, now - self.max_age),
+            ).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            return self._row_to_result(row, now)
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            print(f"Summary cache error: {e}")
+            return None
+
+    def get_fresh_for_url(self, url):
+        """Return the newest summary for `url` if it is recent enough to skip scraping"""
+        if not url or url == "#":
+            return None
+        try:
+            now = time.time()
+            row = self._conn().execute(
+                "SELECT * FROM summaries WHERE url = ? AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (url, now - min(self.url_fresh_seconds, self.max_age)),
+            ).fetchone()
+            if row is None:
+                return None
+            self.counters["url_hits"] += 1
+            return self._row_to_result(row, now)
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            print(f"Summary cache error: {e}")
+            return None
+
+    def put(self, key, url, variant, summary, used_full_content):
+        """Store a summary, pruning old entries every few writes"""
+        try:
+            now = time.time()
+            self._conn().execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url or "", variant, summary, int(used_full_content),
+                 len(summary.encode("utf-8")), now, now),
+            )
+            self.counters["writes"] += 1
+            self._puts += 1
+            if self._puts % self.prune_every == 0:
+                self.prune()
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            print(f"Summary cache error: {e}")
+
+    def prune(self):
+        """Drop expired entries, then the least recently used ones over the count/size limits"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            removed = conn.execute(
+                "DELETE FROM summaries WHERE created_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries").fetchone()
+            if count > self.max_entries or total > self.max_bytes:
+                # Walk from the least recently used end until both limits hold
+                drop = []
+                for row in conn.execute("SELECT key, size FROM summaries ORDER BY accessed_at"):
+                    if count <= self.max_entries and total <= self.max_bytes:
+                        break
+                    drop.append((row["key"],))
+                    count -= 1
+                    total -= row["size"]
+                conn.executemany("DELETE FROM summaries WHERE key = ?", drop)
+                removed += len(drop)
+            conn.execute("COMMIT")
+            self.counters["evictions"] += removed
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self):
+        count, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries"
+        ).fetchone()
+        lookups = self.counters["hits"] + self.counters["url_hits"] + self.counters["misses"]
+        served = self.counters["hits"] + self.counters["url_hits"]
+        return {
+            **self.counters,
+            "entries": count,
+            "bytes": total,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+        }
+
+    # Async wrappers so disk access never blocks the event loop
+    async def aget(self, key):
+        return await asyncio.to_thread(self.get, key)
+
+    async def aget_fresh_for_url(self, url):
+        return await asyncio.to_thread(self.get_fresh_for_url, url)
+
+    async def aput(self, key, url, variant, summary, used_full_content):
+        await asyncio.to_thread(self.put, key, url, variant, summary, used_full_content)
+
+    async def astats(self):
+        return await asyncio.to_thread(self.stats)
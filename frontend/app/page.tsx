@@ -17,8 +17,10 @@ interface Article {
   description: string;
   url: string;
   source: string;
+  sources?: string[]; // Other outlets carrying the same story
   publishedAt: string;
   aiSummary?: string; // Add this for AI-generated summaries
+  preview?: string[]; // Key sentences shown while the AI summary is generated
 }
 
 export default function Home() {
@@ -27,6 +29,8 @@ export default function Home() {
   const [isLoading, setIsLoading] = useState(false);
   const [selectedArticle, setSelectedArticle] = useState<Article | null>(null);
   const [showSummaryModal, setShowSummaryModal] = useState(false);
+  // Server-side conversation session, so only the new message is sent each turn
+  const [sessionId, setSessionId] = useState<string | null>(null);
 
   const determinePromptType = (input: string, hasExistingArticles: boolean) => {
     const newsKeywords = [
@@ -100,7 +104,7 @@ export default function Home() {
         },
         body: JSON.stringify({
           message: currentInput,
-          conversation_history: messages.slice(-10),
+          session_id: sessionId,
         }),
       });
 
@@ -110,6 +114,9 @@ export default function Home() {
 
       const data = await response.json();
       console.log("API Response:", data); // Debug log
+      if (data.session_id) {
+        setSessionId(data.session_id);
+      }
       
       // Use AI-generated message but clean it if it contains article details
       let cleanMessage = data.message;
@@ -178,8 +185,29 @@ export default function Home() {
 
   const handleArticleClick = async (article: Article) => {
     setSelectedArticle(article);
+    setShowSummaryModal(true);
     setIsLoading(true);
 
+    // The preview is picked without a model call, so it shows up well before the summary
+    fetch("http://localhost:8000/api/summarize/preview", {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({
+        article: article,
+      }),
+    })
+      .then((response) => response.json())
+      .then((data) =>
+        setSelectedArticle((current) =>
+          current && current.url === article.url && !current.aiSummary
+            ? { ...current, preview: data.sentences }
+            : current
+        )
+      )
+      .catch((error) => console.error("Error getting preview:", error));
+
     try {
       const response = await fetch("http://localhost:8000/api/summarize", {
         method: "POST",
@@ -193,21 +221,25 @@ export default function Home() {
 
       const data = await response.json();
 
-      // Update selected article with AI summary
-      setSelectedArticle({
-        ...article,
-        aiSummary: data.summary,
-      });
+      // Update selected article with AI summary (unless the modal was closed meanwhile)
+      setSelectedArticle((current) =>
+        current && current.url === article.url
+          ? { ...current, aiSummary: data.summary }
+          : current
+      );
     } catch (error) {
       console.error("Error getting summary:", error);
-      setSelectedArticle({
-        ...article,
-        aiSummary:
-          "Sorry, I couldn't generate a summary for this article right now.",
-      });
+      setSelectedArticle((current) =>
+        current && current.url === article.url
+          ? {
+              ...current,
+              aiSummary:
+                "Sorry, I couldn't generate a summary for this article right now.",
+            }
+          : current
+      );
     }
 
-    setShowSummaryModal(true);
     setIsLoading(false);
   };
 
@@ -282,6 +314,9 @@ export default function Home() {
                             <div className="flex items-start justify-between mb-2">
                               <span className="text-xs text-[#00bcd4] font-medium">
                                 {article.source}
+                                {article.sources && article.sources.length > 1 && (
+                                  <span className="text-[#8e8e8e]"> +{article.sources.length - 1} more</span>
+                                )}
                               </span>
                               <span className="text-xs text-[#8e8e8e]">
                                 {new Date(article.publishedAt).toLocaleDateString()}
@@ -356,7 +391,9 @@ export default function Home() {
             <div className="flex items-center justify-between p-6 border-b border-[#404040]">
               <div className="flex items-center gap-3">
                 <span className="text-sm text-[#00bcd4] font-medium">
-                  {selectedArticle.source}
+                  {selectedArticle.sources && selectedArticle.sources.length > 1
+                    ? selectedArticle.sources.join(", ")
+                    : selectedArticle.source}
                 </span>
                 <span className="text-sm text-[#8e8e8e]">
                   {new Date(selectedArticle.publishedAt).toLocaleDateString()}
@@ -386,10 +423,19 @@ export default function Home() {
                       {selectedArticle.aiSummary}
                     </p>
                   ) : (
-                    <div className="flex items-center gap-2">
-                      <div className="w-4 h-4 border-2 border-[#00bcd4] border-t-transparent rounded-full animate-spin"></div>
-                      <span className="text-[#b4b4b4]">Generating AI summary...</span>
-                    </div>
+                    <>
+                      {selectedArticle.preview && selectedArticle.preview.length > 0 && (
+                        <ul className="list-disc pl-5 space-y-1 mb-3 text-[#b4b4b4] leading-relaxed">
+                          {selectedArticle.preview.map((sentence, i) => (
+                            <li key={i}>{sentence}</li>
+                          ))}
+                        </ul>
+                      )}
+                      <div className="flex items-center gap-2">
+                        <div className="w-4 h-4 border-2 border-[#00bcd4] border-t-transparent rounded-full animate-spin"></div>
+                        <span className="text-[#b4b4b4]">Generating AI summary...</span>
+                      </div>
+                    </>
                   )}
                 </div>
 